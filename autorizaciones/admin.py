@@ -1,3 +1,12 @@
 from django.contrib import admin
+from autorizaciones.models import Autorizacion
 
-# Register your models here.
+
+@admin.register(Autorizacion)
+class AutorizacionAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'autorizado_por', 'fecha', 'estado')
+    list_filter = ('tipo_autorizacion', 'estado')
+    list_select_related = ('barco', 'autorizado_por')
+    raw_id_fields = ('barco', 'autorizado_por')
+    search_fields = ('barco__nombre',)
+    date_hierarchy = 'fecha'
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("autorizaciones", "0002_initial"),
+        ("barcos", "0002_indices_busqueda"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=models.Index(fields=["fecha"], name="autoriz_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=models.Index(fields=["barco", "fecha"], name="autoriz_barco_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=models.Index(fields=["autorizado_por", "fecha"], name="autoriz_autorizador_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=models.Index(fields=["tipo_autorizacion", "fecha"], name="autoriz_tipo_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=models.Index(fields=["estado", "fecha"], name="autoriz_estado_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("tipo_autorizacion"), name="gin_trgm_ops"), name="autoriz_tipo_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("estado"), name="gin_trgm_ops"), name="autoriz_estado_trgm"),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+# El vector se recalcula en la base de datos en cada INSERT y en cada UPDATE de
+# las columnas que lo componen, así que también lo mantienen bulk_create(),
+# bulk_update() y las cargas con COPY. Asignar busqueda = NULL lo recalcula.
+# Un trigger en barcos recalcula los vectores al cambiar el nombre del barco.
+TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION autorizaciones_busqueda_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT nombre FROM barcos WHERE id = NEW.barco_id), ''
+            )), 'A') ||
+            setweight(to_tsvector('simple', concat_ws(' ', NEW.tipo_autorizacion, NEW.estado)), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER autorizaciones_busqueda
+        BEFORE INSERT OR UPDATE OF barco_id, tipo_autorizacion, estado, busqueda ON autorizaciones
+        FOR EACH ROW EXECUTE FUNCTION autorizaciones_busqueda_actualizar()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION autorizaciones_busqueda_propagar() RETURNS trigger AS $$
+    BEGIN
+        UPDATE autorizaciones SET busqueda = NULL WHERE barco_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER autorizaciones_busqueda_barcos
+        AFTER UPDATE OF nombre ON barcos
+        FOR EACH ROW WHEN (OLD.nombre IS DISTINCT FROM NEW.nombre)
+        EXECUTE FUNCTION autorizaciones_busqueda_propagar()
+    """,
+]
+
+ELIMINAR_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS autorizaciones_busqueda_barcos ON barcos",
+    "DROP FUNCTION IF EXISTS autorizaciones_busqueda_propagar()",
+    "DROP TRIGGER IF EXISTS autorizaciones_busqueda ON autorizaciones",
+    "DROP FUNCTION IF EXISTS autorizaciones_busqueda_actualizar()",
+]
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("autorizaciones", "0003_indices_busqueda"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="autorizacion",
+            name="busqueda",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(TRIGGERS, ELIMINAR_TRIGGERS),
+        # Calcula el vector de las filas existentes
+        migrations.RunSQL(
+            "UPDATE autorizaciones SET busqueda = NULL", migrations.RunSQL.noop
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["busqueda"], name="autoriz_busqueda_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.utils.timezone
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("autorizaciones", "0004_autorizacion_busqueda"),
+    ]
+
+    operations = [
+        # Las filas existentes toman la fecha de la migración
+        migrations.AddField(
+            model_name="autorizacion",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        AddIndexConcurrently(
+            model_name="autorizacion",
+            index=models.Index(
+                fields=["fecha_actualizacion"], name="autoriz_actualizacion_idx"
+            ),
+        ),
+    ]
@@ -1,8 +1,20 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 from barcos.models import Barco
 from personal.models import Personal
 
+class AutorizacionQuerySet(models.QuerySet):
+    def con_relaciones(self):
+        """
+        Carga en la misma consulta el barco y quien autorizó, que usan __str__,
+        el admin y las representaciones expandidas. Omite los vectores de búsqueda.
+        """
+        return self.select_related('barco', 'autorizado_por').defer('busqueda', 'barco__busqueda')
+
+
 class Autorizacion(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     barco = models.ForeignKey(Barco, on_delete=models.CASCADE, related_name='autorizaciones')
@@ -10,9 +22,31 @@ class Autorizacion(models.Model):
     fecha = models.DateField()
     tipo_autorizacion = models.CharField(max_length=100)  # entrada, salida, carga, descarga, etc.
     estado = models.CharField(max_length=50)  # aprobada, rechazada, pendiente
+    # Vector de búsqueda de texto completo, mantenido por un trigger (migración 0004)
+    busqueda = SearchVectorField(null=True, editable=False)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = AutorizacionQuerySet.as_manager()
 
     class Meta:
         db_table = "autorizaciones"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='autoriz_actualizacion_idx'),
+            # Orden de los listados
+            models.Index(fields=['fecha'], name='autoriz_fecha_idx'),
+            # Filtros combinados con el orden por defecto
+            models.Index(fields=['barco', 'fecha'], name='autoriz_barco_fecha_idx'),
+            models.Index(fields=['autorizado_por', 'fecha'], name='autoriz_autorizador_fecha_idx'),
+            models.Index(fields=['tipo_autorizacion', 'fecha'], name='autoriz_tipo_fecha_idx'),
+            models.Index(fields=['estado', 'fecha'], name='autoriz_estado_fecha_idx'),
+            # Búsqueda de texto completo
+            GinIndex(fields=['busqueda'], name='autoriz_busqueda_gin'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('tipo_autorizacion'), name='gin_trgm_ops'), name='autoriz_tipo_trgm'),
+            GinIndex(OpClass(Upper('estado'), name='gin_trgm_ops'), name='autoriz_estado_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.tipo_autorizacion} - {self.barco.nombre}"
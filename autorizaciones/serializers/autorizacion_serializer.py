@@ -1,7 +1,15 @@
 from rest_framework import serializers
 from autorizaciones.models import Autorizacion
+from barcos.serializers import BarcoSerializer
+from personal.serializers import PersonalMinimalSerializer
+from port_control.expansion import ExpandibleMixin
+
+class AutorizacionSerializer(ExpandibleMixin, serializers.ModelSerializer):
+    campos_expandibles = {
+        'barco': BarcoSerializer,
+        'autorizado_por': PersonalMinimalSerializer,
+    }
 
-class AutorizacionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Autorizacion
-        fields = '__all__'
+        exclude = ['busqueda']
@@ -1,25 +1,33 @@
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from autorizaciones.models import Autorizacion
 from autorizaciones.serializers import AutorizacionSerializer
+from port_control.busqueda import BusquedaTextoCompleto
+from port_control.condicional import RespuestaCondicionalMixin
+from port_control.expansion import ExpandirMixin
 from port_control.permissions import AutorizacionPermission
+from port_control.serializacion import ListadoRapidoMixin
 
 
-class AutorizacionViewSet(viewsets.ModelViewSet):
+class AutorizacionViewSet(RespuestaCondicionalMixin, ExpandirMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Autorizaciones
     
     Permisos:
     - CRUD: ADMIN, CAPITAN_PUERTO
     - Leer: OPERADOR_TERMINAL, INSPECTOR, AGENTE_NAVIERO, VIGILANTE
+    
+    Expandibles con ?expand=: barco, autorizado_por
     """
-    queryset = Autorizacion.objects.all()
+    queryset = Autorizacion.objects.con_relaciones()
     serializer_class = AutorizacionSerializer
+    # Listado desde values_list() y orjson (ver benchmark_listados)
+    listado_rapido = True
     permission_classes = [AutorizacionPermission]
     
     # Filtros y búsqueda
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BusquedaTextoCompleto]
     filterset_fields = ['barco', 'autorizado_por', 'tipo_autorizacion', 'estado', 'fecha']
     search_fields = ['tipo_autorizacion', 'estado', 'barco__nombre']
     ordering_fields = ['fecha', 'estado', 'tipo_autorizacion']
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from barcos.models import Barco
 
-# Register your models here.
+
+@admin.register(Barco)
+class BarcoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'bandera', 'tipo', 'empresa_operadora', 'fecha_llegada', 'fecha_salida')
+    list_filter = ('tipo', 'bandera')
+    search_fields = ('nombre', 'empresa_operadora')
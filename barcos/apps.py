@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class BarcosConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "barcos"
+
+    def ready(self):
+        """Versiona la caché de respuestas del listado con cada cambio."""
+        from barcos.models import Barco
+        from port_control.cache_respuestas import registrar_modelo
+
+        registrar_modelo(Barco)
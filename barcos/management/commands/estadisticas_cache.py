@@ -0,0 +1,30 @@
+"""
+Comando para ver los aciertos y fallos de la caché de respuestas de los listados.
+Los contadores se guardan en la caché de Django (API_CACHE_ALIAS), por lo que
+reflejan a todos los procesos solo si la caché es compartida.
+Ejecutar: python manage.py estadisticas_cache
+"""
+from django.core.management.base import BaseCommand
+from port_control.cache_respuestas import estadisticas
+from barcos.views import BarcoViewSet
+from tripulacion.views import TripulanteViewSet
+from zonas_puerto.views import ZonaPuertoViewSet
+
+
+# Listados con CacheListadoMixin
+LISTADOS = {
+    'barcos': BarcoViewSet,
+    'tripulacion': TripulanteViewSet,
+    'zonas': ZonaPuertoViewSet,
+}
+
+
+class Command(BaseCommand):
+    help = 'Muestra los aciertos y fallos de la caché de respuestas de cada listado'
+
+    def handle(self, *args, **options):
+        for nombre, viewset in LISTADOS.items():
+            aciertos, fallos = estadisticas(viewset.queryset.model)
+            total = aciertos + fallos
+            tasa = f'{100 * aciertos / total:.1f}%' if total else '-'
+            self.stdout.write(f'{nombre}: {aciertos} aciertos, {fallos} fallos (tasa de aciertos {tasa})')
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("barcos", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=models.Index(fields=["fecha_llegada"], name="barcos_llegada_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=models.Index(fields=["fecha_salida"], name="barcos_salida_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=models.Index(fields=["nombre"], name="barcos_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=models.Index(fields=["tipo", "fecha_llegada"], name="barcos_tipo_llegada_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=models.Index(fields=["bandera", "fecha_llegada"], name="barcos_bandera_llegada_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=models.Index(fields=["empresa_operadora", "fecha_llegada"], name="barcos_empresa_llegada_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("nombre"), name="gin_trgm_ops"), name="barcos_nombre_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("bandera"), name="gin_trgm_ops"), name="barcos_bandera_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("tipo"), name="gin_trgm_ops"), name="barcos_tipo_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("empresa_operadora"), name="gin_trgm_ops"), name="barcos_empresa_trgm"),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+# El vector se recalcula en la base de datos en cada INSERT y en cada UPDATE de
+# las columnas que lo componen, así que también lo mantienen bulk_create(),
+# bulk_update() y las cargas con COPY. Asignar busqueda = NULL lo recalcula.
+TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION barcos_busqueda_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('simple', coalesce(NEW.nombre, '')), 'A') ||
+            setweight(to_tsvector('simple', concat_ws(' ', NEW.bandera, NEW.tipo, NEW.empresa_operadora)), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER barcos_busqueda
+        BEFORE INSERT OR UPDATE OF nombre, bandera, tipo, empresa_operadora, busqueda ON barcos
+        FOR EACH ROW EXECUTE FUNCTION barcos_busqueda_actualizar()
+    """,
+]
+
+ELIMINAR_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS barcos_busqueda ON barcos",
+    "DROP FUNCTION IF EXISTS barcos_busqueda_actualizar()",
+]
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("barcos", "0002_indices_busqueda"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="barco",
+            name="busqueda",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(TRIGGERS, ELIMINAR_TRIGGERS),
+        # Calcula el vector de las filas existentes
+        migrations.RunSQL(
+            "UPDATE barcos SET busqueda = NULL", migrations.RunSQL.noop
+        ),
+        AddIndexConcurrently(
+            model_name="barco",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["busqueda"], name="barcos_busqueda_gin"
+            ),
+        ),
+    ]
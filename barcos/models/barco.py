@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 
 class Barco(models.Model):
@@ -9,9 +12,32 @@ class Barco(models.Model):
     empresa_operadora = models.CharField(max_length=100)
     fecha_llegada = models.DateField(null=True, blank=True)
     fecha_salida = models.DateField(null=True, blank=True)
+    # Vector de búsqueda de texto completo, mantenido por un trigger (migración 0003)
+    busqueda = SearchVectorField(null=True, editable=False)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "barcos"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='barcos_actualizacion_idx'),
+            # Orden de los listados
+            models.Index(fields=['fecha_llegada'], name='barcos_llegada_idx'),
+            models.Index(fields=['fecha_salida'], name='barcos_salida_idx'),
+            models.Index(fields=['nombre'], name='barcos_nombre_idx'),
+            # Filtros combinados con el orden por defecto
+            models.Index(fields=['tipo', 'fecha_llegada'], name='barcos_tipo_llegada_idx'),
+            models.Index(fields=['bandera', 'fecha_llegada'], name='barcos_bandera_llegada_idx'),
+            models.Index(fields=['empresa_operadora', 'fecha_llegada'], name='barcos_empresa_llegada_idx'),
+            # Búsqueda de texto completo
+            GinIndex(fields=['busqueda'], name='barcos_busqueda_gin'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('nombre'), name='gin_trgm_ops'), name='barcos_nombre_trgm'),
+            GinIndex(OpClass(Upper('bandera'), name='gin_trgm_ops'), name='barcos_bandera_trgm'),
+            GinIndex(OpClass(Upper('tipo'), name='gin_trgm_ops'), name='barcos_tipo_trgm'),
+            GinIndex(OpClass(Upper('empresa_operadora'), name='gin_trgm_ops'), name='barcos_empresa_trgm'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -4,4 +4,4 @@ from barcos.models import Barco
 class BarcoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Barco
-        fields = '__all__'
+        exclude = ['busqueda']
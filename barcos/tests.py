@@ -1,3 +1,101 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from barcos.models import Barco
+from personal.models import Personal
+from port_control.cache_respuestas import estadisticas
+
+
+@override_settings(API_CACHE_RESPUESTAS=True)
+class CacheListadoBarcosTests(TestCase):
+    """Caché de respuestas del listado de barcos (CacheListadoMixin)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.capitan = Personal.objects.create_user('capitan', password='x', rol=Personal.Roles.CAPITAN_PUERTO)
+        cls.inspector = Personal.objects.create_user('inspector', password='x', rol=Personal.Roles.INSPECTOR)
+        cls.barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, usuario, ruta='/api/barcos/'):
+        client = APIClient()
+        client.force_authenticate(usuario)
+        return client.get(ruta)
+
+    def _nombres(self, response):
+        return [fila['nombre'] for fila in response.json()['results']]
+
+    def test_acierto_sin_consultas(self):
+        self.assertEqual(self._get(self.capitan)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self._get(self.capitan)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(self._nombres(response), ['Andes'])
+
+    def test_parametros_distintos_no_comparten_pagina(self):
+        self._get(self.capitan, '/api/barcos/?ordering=nombre')
+        self.assertEqual(self._get(self.capitan, '/api/barcos/?ordering=-nombre')['X-Cache'], 'MISS')
+        self.assertEqual(self._get(self.capitan, '/api/barcos/?ordering=nombre')['X-Cache'], 'HIT')
+
+    def test_escritura_invalida_el_listado(self):
+        self._get(self.capitan)
+        client = APIClient()
+        client.force_authenticate(self.capitan)
+        response = client.patch(f'/api/barcos/{self.barco.pk}/', {'nombre': 'Atacama'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self._get(self.capitan)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self._nombres(response), ['Atacama'])
+
+        Barco.objects.create(nombre='Biobio', bandera='CL', tipo='Granelero', empresa_operadora='CSAV')
+        self.assertEqual(len(self._nombres(self._get(self.capitan))), 2)
+
+        self.barco.delete()
+        response = self._get(self.capitan)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self._nombres(response), ['Biobio'])
+
+    def test_roles_no_comparten_cuerpo(self):
+        self._get(self.capitan)
+        # update() no emite post_save: la versión del modelo no cambia
+        Barco.objects.filter(pk=self.barco.pk).update(nombre='Atacama')
+
+        response = self._get(self.inspector)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self._nombres(response), ['Atacama'])
+        response = self._get(self.capitan)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(self._nombres(response), ['Andes'])
+
+    def test_contadores(self):
+        self.assertEqual(estadisticas(Barco), (0, 0))
+        self._get(self.capitan)
+        self._get(self.capitan)
+        self._get(self.capitan)
+        self._get(self.inspector)
+        self.assertEqual(estadisticas(Barco), (2, 2))
+        # El detalle no pasa por la caché
+        self._get(self.capitan, f'/api/barcos/{self.barco.pk}/')
+        self.assertEqual(estadisticas(Barco), (2, 2))
+
+    @override_settings(API_CACHE_RESPUESTAS=False)
+    def test_desactivada(self):
+        self._get(self.capitan)
+        response = self._get(self.capitan)
+        self.assertNotIn('X-Cache', response)
+        self.assertEqual(estadisticas(Barco), (0, 0))
+
+    def test_comando_estadisticas(self):
+        self._get(self.capitan)
+        self._get(self.capitan)
+        salida = io.StringIO()
+        call_command('estadisticas_cache', stdout=salida)
+        self.assertIn('barcos: 1 aciertos, 1 fallos (tasa de aciertos 50.0%)', salida.getvalue())
+        self.assertIn('zonas: 0 aciertos, 0 fallos (tasa de aciertos -)', salida.getvalue())
@@ -1,12 +1,15 @@
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from barcos.models import Barco
 from barcos.serializers import BarcoSerializer
+from port_control.busqueda import BusquedaTextoCompleto
+from port_control.cache_respuestas import CacheListadoMixin
+from port_control.condicional import RespuestaCondicionalMixin
 from port_control.permissions import BarcoPermission
 
 
-class BarcoViewSet(viewsets.ModelViewSet):
+class BarcoViewSet(CacheListadoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Barcos
     
@@ -14,12 +17,12 @@ class BarcoViewSet(viewsets.ModelViewSet):
     - CRUD: ADMIN, CAPITAN_PUERTO, AGENTE_NAVIERO
     - Leer: OPERADOR_TERMINAL, INSPECTOR, VIGILANTE
     """
-    queryset = Barco.objects.all()
+    queryset = Barco.objects.defer('busqueda')
     serializer_class = BarcoSerializer
     permission_classes = [BarcoPermission]
     
     # Filtros y búsqueda
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BusquedaTextoCompleto]
     filterset_fields = ['tipo', 'bandera', 'empresa_operadora']
     search_fields = ['nombre', 'bandera', 'tipo', 'empresa_operadora']
     ordering_fields = ['nombre', 'fecha_llegada', 'fecha_salida']
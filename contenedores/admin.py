@@ -1,3 +1,13 @@
 from django.contrib import admin
+from contenedores.models import Contenedor
 
-# Register your models here.
+
+@admin.register(Contenedor)
+class ContenedorAdmin(admin.ModelAdmin):
+    list_display = ('codigo_contenedor', 'barco', 'tipo', 'peso', 'estado')
+    list_filter = ('tipo', 'estado')
+    list_select_related = ('barco',)
+    raw_id_fields = ('barco',)
+    search_fields = ('codigo_contenedor',)
+    # Evita el COUNT(*) sin filtros sobre la tabla completa
+    show_full_result_count = False
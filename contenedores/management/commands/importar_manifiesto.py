@@ -0,0 +1,98 @@
+"""
+Comando para importar un manifiesto CSV de contenedores con COPY de PostgreSQL.
+Ejecutar: python manage.py importar_manifiesto manifiesto.csv --barco <id>
+"""
+import csv
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from barcos.models import Barco
+from contenedores.manifiesto import EXISTENTES, ManifiestoInvalido, importar_manifiesto
+from personal.models import Personal
+from zonas_puerto.models import ZonaPuerto
+
+
+def _obtener(modelo, pk, nombre):
+    try:
+        return modelo.objects.get(pk=pk)
+    except (modelo.DoesNotExist, ValidationError):
+        raise CommandError(f'No existe {nombre} con id {pk}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa un manifiesto CSV (codigo_contenedor, tipo, peso, estado) en contenedores, '
+        'creando o actualizando por codigo_contenedor (requiere PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV, o - para leer de la entrada estándar')
+        parser.add_argument('--barco', required=True, help='Id del barco del manifiesto')
+        parser.add_argument(
+            '--existentes',
+            choices=EXISTENTES,
+            default='actualizar',
+            help='Qué hacer con los contenedores ya registrados (default: actualizar)',
+        )
+        parser.add_argument(
+            '--registrar-ingreso',
+            action='store_true',
+            help='Crea un movimiento de ingreso por cada contenedor creado o actualizado',
+        )
+        parser.add_argument('--zona-destino', help='Id de la zona de destino del ingreso')
+        parser.add_argument('--operador', help='Username del operador del ingreso')
+        parser.add_argument('--conflictos', help='Ruta de un CSV donde escribir todos los conflictos')
+
+    def handle(self, *args, **options):
+        barco = _obtener(Barco, options['barco'], 'barco')
+        zona_destino = operador = None
+        if options['zona_destino']:
+            zona_destino = _obtener(ZonaPuerto, options['zona_destino'], 'zona')
+        if options['operador']:
+            try:
+                operador = Personal.objects.get(username=options['operador'])
+            except Personal.DoesNotExist:
+                raise CommandError(f'No existe el usuario {options["operador"]}')
+
+        inicio = time.perf_counter()
+        try:
+            if options['archivo'] == '-':
+                resumen = self._importar(sys.stdin, barco, zona_destino, operador, options)
+            else:
+                with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+                    resumen = self._importar(archivo, barco, zona_destino, operador, options)
+        except (ManifiestoInvalido, OSError, UnicodeDecodeError) as error:
+            raise CommandError(str(error))
+        segundos = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resumen["filas"]} filas en {segundos:.2f} s: {resumen["creados"]} creados, '
+            f'{resumen["actualizados"]} actualizados, {resumen["sin_cambios"]} sin cambios, '
+            f'{resumen["movimientos"]} movimientos de ingreso'
+        ))
+        if resumen['total_conflictos']:
+            self.stdout.write(self.style.WARNING(f'{resumen["total_conflictos"]} filas con conflictos'))
+            if options['conflictos']:
+                with open(options['conflictos'], 'w', encoding='utf-8', newline='') as salida:
+                    writer = csv.DictWriter(salida, fieldnames=['fila', 'codigo_contenedor', 'motivo'])
+                    writer.writeheader()
+                    writer.writerows(resumen['conflictos'])
+            else:
+                for conflicto in resumen['conflictos'][:20]:
+                    self.stdout.write(
+                        f'  fila {conflicto["fila"]}: {conflicto["codigo_contenedor"] or "-"} ({conflicto["motivo"]})'
+                    )
+                if resumen['total_conflictos'] > 20:
+                    self.stdout.write('  ... (usar --conflictos para guardarlos todos)')
+
+    def _importar(self, archivo, barco, zona_destino, operador, options):
+        return importar_manifiesto(
+            archivo,
+            barco,
+            existentes=options['existentes'],
+            registrar_ingreso=options['registrar_ingreso'],
+            zona_destino=zona_destino,
+            operador=operador,
+        )
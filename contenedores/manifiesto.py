@@ -0,0 +1,268 @@
+"""
+Importación de manifiestos de contenedores (CSV) con COPY de PostgreSQL.
+
+El archivo se carga con `COPY ... FROM STDIN` en una tabla temporal y desde
+ahí se valida y se escribe en `contenedores` con sentencias sobre todo el
+conjunto: un INSERT ... ON CONFLICT (codigo_contenedor) para crear o
+actualizar y, opcionalmente, un INSERT del movimiento de `ingreso` de cada
+contenedor escrito. No se instancian modelos ni se escribe fila por fila, así
+que cien mil contenedores se importan en segundos.
+
+Las filas que no se pueden importar (datos inválidos, código repetido en el
+manifiesto o contenedor existente con `existentes='omitir'`) se informan como
+conflictos con su número de fila en el CSV (el encabezado es la fila 1); el
+resto del manifiesto se importa igual.
+
+Las tablas temporales se eliminan al terminar, así que se puede importar más
+de un manifiesto dentro de la misma transacción externa.
+
+Al no pasar por save(), estas escrituras no emiten post_save.
+"""
+import csv
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+COLUMNAS = ('codigo_contenedor', 'tipo', 'peso', 'estado')
+
+EXISTENTES = ('actualizar', 'omitir')
+
+_NUMERO = r'^[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?$'
+
+
+class ManifiestoInvalido(Exception):
+    """El manifiesto no se puede importar (encabezado, formato CSV o base de datos)."""
+
+
+def _leer_encabezado(archivo):
+    """Lee la primera línea del CSV y retorna los nombres de columna normalizados."""
+    linea = archivo.readline()
+    if not linea.strip():
+        raise ManifiestoInvalido('El manifiesto está vacío')
+    encabezado = [nombre.strip().lower() for nombre in next(csv.reader([linea]))]
+    faltantes = [columna for columna in COLUMNAS if columna not in encabezado]
+    if faltantes:
+        raise ManifiestoInvalido(f'Faltan columnas en el encabezado: {", ".join(faltantes)}')
+    repetidas = sorted({nombre for nombre in encabezado if encabezado.count(nombre) > 1})
+    if repetidas:
+        raise ManifiestoInvalido(f'Columnas repetidas en el encabezado: {", ".join(repetidas)}')
+    return encabezado
+
+
+def _cargar(cursor, archivo, encabezado):
+    """
+    COPY del archivo a la tabla temporal `manifiesto_carga` (una columna de
+    texto por columna del CSV; las desconocidas se ignoran) y normalización en
+    `manifiesto_filas` con el error de validación de cada fila.
+    """
+    columnas = [f'c{indice}' for indice in range(len(encabezado))]
+    campo = {nombre: f'trim(c{indice})' for indice, nombre in enumerate(encabezado)}
+
+    cursor.execute(
+        'CREATE TEMP TABLE manifiesto_carga (fila bigserial, {}) ON COMMIT DROP'.format(
+            ', '.join(f'{columna} text' for columna in columnas)
+        )
+    )
+    try:
+        cursor.copy_expert(
+            'COPY manifiesto_carga ({}) FROM STDIN WITH (FORMAT csv)'.format(', '.join(columnas)),
+            archivo,
+        )
+    except connection.Database.Error as error:
+        # copy_expert es del cursor de psycopg2: sus errores no pasan por los de Django
+        raise ManifiestoInvalido(f'El archivo no es un CSV válido: {error}'.strip())
+
+    cursor.execute(
+        f"""
+        CREATE TEMP TABLE manifiesto_filas ON COMMIT DROP AS
+        SELECT fila, codigo_contenedor, tipo, peso, estado,
+            CASE
+                WHEN codigo_contenedor IS NULL OR codigo_contenedor = '' THEN 'codigo_contenedor vacío'
+                WHEN length(codigo_contenedor) > 50 THEN 'codigo_contenedor supera 50 caracteres'
+                WHEN tipo IS NULL OR tipo = '' THEN 'tipo vacío'
+                WHEN length(tipo) > 50 THEN 'tipo supera 50 caracteres'
+                WHEN estado IS NULL OR estado = '' THEN 'estado vacío'
+                WHEN length(estado) > 50 THEN 'estado supera 50 caracteres'
+                WHEN peso IS NULL OR peso !~ %s THEN 'peso no es un número'
+            END AS error
+        FROM (
+            -- El encabezado no se copia: la primera fila de datos es la fila 2 del CSV
+            SELECT fila + 1 AS fila,
+                {campo['codigo_contenedor']} AS codigo_contenedor,
+                {campo['tipo']} AS tipo,
+                {campo['peso']} AS peso,
+                {campo['estado']} AS estado
+            FROM manifiesto_carga
+        ) AS carga
+        """,
+        [_NUMERO],
+    )
+    cursor.execute('CREATE INDEX ON manifiesto_filas (codigo_contenedor)')
+    cursor.execute('ANALYZE manifiesto_filas')
+
+
+def _marcar_conflictos(cursor, existentes):
+    """Marca las filas válidas que no se importan: códigos repetidos y, si corresponde, existentes."""
+    cursor.execute(
+        """
+        UPDATE manifiesto_filas SET error = 'codigo_contenedor repetido en el manifiesto'
+        WHERE error IS NULL AND codigo_contenedor IN (
+            SELECT codigo_contenedor FROM manifiesto_filas
+            WHERE error IS NULL
+            GROUP BY codigo_contenedor HAVING count(*) > 1
+        )
+        """
+    )
+    if existentes == 'omitir':
+        cursor.execute(
+            """
+            UPDATE manifiesto_filas AS m SET error = 'el contenedor ya existe'
+            FROM contenedores AS c
+            WHERE m.error IS NULL AND c.codigo_contenedor = m.codigo_contenedor
+            """
+        )
+
+
+def _escribir(cursor, barco_id, existentes):
+    """
+    Crea o actualiza los contenedores de las filas válidas y guarda en
+    `manifiesto_escritos` el id de cada contenedor escrito y si fue creado.
+    Las filas iguales a las existentes no se reescriben.
+    """
+    if existentes == 'omitir':
+        # Un contenedor creado por otra transacción durante la importación se omite
+        conflicto = 'DO NOTHING'
+    else:
+        conflicto = """
+            DO UPDATE SET
+                barco_id = EXCLUDED.barco_id,
+                tipo = EXCLUDED.tipo,
+                peso = EXCLUDED.peso,
+                estado = EXCLUDED.estado,
+                fecha_actualizacion = EXCLUDED.fecha_actualizacion
+            WHERE (contenedores.barco_id, contenedores.tipo, contenedores.peso, contenedores.estado)
+                IS DISTINCT FROM (EXCLUDED.barco_id, EXCLUDED.tipo, EXCLUDED.peso, EXCLUDED.estado)
+        """
+    cursor.execute(
+        'CREATE TEMP TABLE manifiesto_escritos '
+        '(id uuid, codigo_contenedor varchar(50), creado boolean) ON COMMIT DROP'
+    )
+    cursor.execute(
+        f"""
+        WITH escritos AS (
+            INSERT INTO contenedores (id, barco_id, codigo_contenedor, tipo, peso, estado, fecha_actualizacion)
+            SELECT gen_random_uuid(), %s, codigo_contenedor, tipo, peso::double precision, estado, now()
+            FROM manifiesto_filas
+            WHERE error IS NULL
+            ON CONFLICT (codigo_contenedor) {conflicto}
+            -- xmax = 0 solo en las filas insertadas (no en las actualizadas)
+            RETURNING id, codigo_contenedor, (xmax = 0) AS creado
+        )
+        INSERT INTO manifiesto_escritos SELECT id, codigo_contenedor, creado FROM escritos
+        """,
+        [barco_id],
+    )
+    if existentes == 'omitir':
+        cursor.execute(
+            """
+            UPDATE manifiesto_filas AS m SET error = 'el contenedor ya existe'
+            WHERE m.error IS NULL AND NOT EXISTS (
+                SELECT 1 FROM manifiesto_escritos AS e WHERE e.codigo_contenedor = m.codigo_contenedor
+            )
+            """
+        )
+
+
+def _registrar_ingresos(cursor, zona_destino_id, operador_id, fecha_hora):
+    """Un movimiento de ingreso por cada contenedor creado o actualizado."""
+    cursor.execute(
+        """
+        INSERT INTO movimientos
+            (id, contenedor_id, tipo_movimiento, zona_origen_id, zona_destino_id, fecha_hora, operador_id, fecha_actualizacion)
+        SELECT gen_random_uuid(), id, 'ingreso', NULL, %s, %s, %s, now()
+        FROM manifiesto_escritos
+        """,
+        [zona_destino_id, fecha_hora, operador_id],
+    )
+    return cursor.rowcount
+
+
+def importar_manifiesto(
+    archivo,
+    barco,
+    existentes='actualizar',
+    registrar_ingreso=False,
+    zona_destino=None,
+    operador=None,
+    fecha_hora=None,
+    limite_conflictos=None,
+):
+    """
+    Importa un manifiesto CSV de contenedores del `barco`.
+
+    `archivo` es un archivo de texto cuya primera línea es el encabezado, con
+    las columnas codigo_contenedor, tipo, peso y estado en cualquier orden.
+    Con `existentes='actualizar'` los contenedores ya registrados (por
+    codigo_contenedor) pasan al barco y toman los datos del manifiesto; con
+    `'omitir'` quedan como están y se informan como conflictos. Con
+    `registrar_ingreso` se crea un movimiento de ingreso (hacia `zona_destino`,
+    a `fecha_hora`, default ahora) por cada contenedor creado o actualizado.
+
+    Todo ocurre en una transacción. Retorna un resumen con los totales y hasta
+    `limite_conflictos` conflictos (todos si es None), ordenados por fila del
+    CSV (la fila 1 es el encabezado).
+    """
+    if connection.vendor != 'postgresql':
+        raise ManifiestoInvalido('La importación de manifiestos requiere PostgreSQL')
+    if existentes not in EXISTENTES:
+        raise ManifiestoInvalido(f'existentes debe ser uno de: {", ".join(EXISTENTES)}')
+
+    encabezado = _leer_encabezado(archivo)
+    with transaction.atomic(), connection.cursor() as cursor:
+        _cargar(cursor, archivo, encabezado)
+        _marcar_conflictos(cursor, existentes)
+        _escribir(cursor, barco.pk, existentes)
+
+        movimientos = 0
+        if registrar_ingreso:
+            movimientos = _registrar_ingresos(
+                cursor,
+                zona_destino.pk if zona_destino is not None else None,
+                operador.pk if operador is not None else None,
+                fecha_hora or timezone.now(),
+            )
+
+        cursor.execute(
+            """
+            SELECT
+                (SELECT count(*) FROM manifiesto_filas),
+                (SELECT count(*) FROM manifiesto_filas WHERE error IS NOT NULL),
+                count(*) FILTER (WHERE creado),
+                count(*) FILTER (WHERE NOT creado)
+            FROM manifiesto_escritos
+            """
+        )
+        filas, total_conflictos, creados, actualizados = cursor.fetchone()
+
+        cursor.execute(
+            'SELECT fila, codigo_contenedor, error FROM manifiesto_filas '
+            'WHERE error IS NOT NULL ORDER BY fila' + (' LIMIT %s' if limite_conflictos is not None else ''),
+            [limite_conflictos] if limite_conflictos is not None else [],
+        )
+        conflictos = [
+            {'fila': fila, 'codigo_contenedor': codigo, 'motivo': motivo}
+            for fila, codigo, motivo in cursor.fetchall()
+        ]
+        # ON COMMIT DROP no alcanza si la importación es parte de una transacción mayor
+        cursor.execute('DROP TABLE manifiesto_escritos, manifiesto_filas, manifiesto_carga')
+
+    return {
+        'filas': filas,
+        'creados': creados,
+        'actualizados': actualizados,
+        'sin_cambios': filas - total_conflictos - creados - actualizados,
+        'movimientos': movimientos,
+        'total_conflictos': total_conflictos,
+        'conflictos': conflictos,
+    }
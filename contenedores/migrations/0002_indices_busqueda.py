@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("barcos", "0002_indices_busqueda"),
+        ("contenedores", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=models.Index(fields=["peso"], name="contened_peso_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=models.Index(fields=["barco", "codigo_contenedor"], name="contened_barco_codigo_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=models.Index(fields=["tipo", "codigo_contenedor"], name="contened_tipo_codigo_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=models.Index(fields=["estado", "codigo_contenedor"], name="contened_estado_codigo_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("codigo_contenedor"), name="gin_trgm_ops"), name="contened_codigo_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("tipo"), name="gin_trgm_ops"), name="contened_tipo_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("estado"), name="gin_trgm_ops"), name="contened_estado_trgm"),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+# El vector se recalcula en la base de datos en cada INSERT y en cada UPDATE de
+# las columnas que lo componen, así que también lo mantienen bulk_create(),
+# bulk_update() y las cargas con COPY. Asignar busqueda = NULL lo recalcula.
+TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION contenedores_busqueda_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('simple', coalesce(NEW.codigo_contenedor, '')), 'A') ||
+            setweight(to_tsvector('simple', concat_ws(' ', NEW.tipo, NEW.estado)), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER contenedores_busqueda
+        BEFORE INSERT OR UPDATE OF codigo_contenedor, tipo, estado, busqueda ON contenedores
+        FOR EACH ROW EXECUTE FUNCTION contenedores_busqueda_actualizar()
+    """,
+]
+
+ELIMINAR_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS contenedores_busqueda ON contenedores",
+    "DROP FUNCTION IF EXISTS contenedores_busqueda_actualizar()",
+]
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("contenedores", "0002_indices_busqueda"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contenedor",
+            name="busqueda",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(TRIGGERS, ELIMINAR_TRIGGERS),
+        # Calcula el vector de las filas existentes
+        migrations.RunSQL(
+            "UPDATE contenedores SET busqueda = NULL", migrations.RunSQL.noop
+        ),
+        AddIndexConcurrently(
+            model_name="contenedor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["busqueda"], name="contened_busqueda_gin"
+            ),
+        ),
+    ]
@@ -1,7 +1,19 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 from barcos.models import Barco
 
+class ContenedorQuerySet(models.QuerySet):
+    def con_relaciones(self):
+        """
+        Carga en la misma consulta el barco, que usan __str__,
+        el admin y las representaciones expandidas. Omite los vectores de búsqueda.
+        """
+        return self.select_related('barco').defer('busqueda', 'barco__busqueda')
+
+
 class Contenedor(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     barco = models.ForeignKey(Barco, on_delete=models.CASCADE, related_name='contenedores')
@@ -9,9 +21,31 @@ class Contenedor(models.Model):
     tipo = models.CharField(max_length=50)
     peso = models.FloatField()
     estado = models.CharField(max_length=50)
+    # Vector de búsqueda de texto completo, mantenido por un trigger (migración 0003)
+    busqueda = SearchVectorField(null=True, editable=False)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = ContenedorQuerySet.as_manager()
 
     class Meta:
         db_table = "contenedores"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='contened_actualizacion_idx'),
+            # Orden de los listados (codigo_contenedor ya tiene índice único)
+            models.Index(fields=['peso'], name='contened_peso_idx'),
+            # Filtros combinados con el orden por defecto
+            models.Index(fields=['barco', 'codigo_contenedor'], name='contened_barco_codigo_idx'),
+            models.Index(fields=['tipo', 'codigo_contenedor'], name='contened_tipo_codigo_idx'),
+            models.Index(fields=['estado', 'codigo_contenedor'], name='contened_estado_codigo_idx'),
+            # Búsqueda de texto completo
+            GinIndex(fields=['busqueda'], name='contened_busqueda_gin'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('codigo_contenedor'), name='gin_trgm_ops'), name='contened_codigo_trgm'),
+            GinIndex(OpClass(Upper('tipo'), name='gin_trgm_ops'), name='contened_tipo_trgm'),
+            GinIndex(OpClass(Upper('estado'), name='gin_trgm_ops'), name='contened_estado_trgm'),
+        ]
 
     def __str__(self):
         return self.codigo_contenedor
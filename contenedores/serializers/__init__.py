@@ -1 +1,2 @@
 from .contenedor_serializer import ContenedorSerializer
+from .manifiesto_serializer import ImportacionManifiestoSerializer
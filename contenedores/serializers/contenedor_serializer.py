@@ -1,7 +1,13 @@
 from rest_framework import serializers
+from barcos.serializers import BarcoSerializer
 from contenedores.models import Contenedor
+from port_control.expansion import ExpandibleMixin
+
+class ContenedorSerializer(ExpandibleMixin, serializers.ModelSerializer):
+    campos_expandibles = {
+        'barco': BarcoSerializer,
+    }
 
-class ContenedorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contenedor
-        fields = '__all__'
+        exclude = ['busqueda']
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from barcos.models import Barco
+from contenedores.manifiesto import EXISTENTES
+from zonas_puerto.models import ZonaPuerto
+
+
+class ImportacionManifiestoSerializer(serializers.Serializer):
+    """Parámetros de POST /api/contenedores/manifiesto/ (multipart)."""
+    archivo = serializers.FileField(help_text='CSV con columnas codigo_contenedor, tipo, peso y estado')
+    barco = serializers.PrimaryKeyRelatedField(queryset=Barco.objects.all())
+    existentes = serializers.ChoiceField(choices=EXISTENTES, default='actualizar')
+    registrar_ingreso = serializers.BooleanField(default=False)
+    zona_destino = serializers.PrimaryKeyRelatedField(
+        queryset=ZonaPuerto.objects.all(), required=False, allow_null=True
+    )
+    fecha_hora = serializers.DateTimeField(required=False, allow_null=True)
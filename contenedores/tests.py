@@ -1,3 +1,549 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.postgres.search import SearchQuery
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from barcos.models import Barco
+from contenedores.manifiesto import ManifiestoInvalido, _leer_encabezado, importar_manifiesto
+from contenedores.models import Contenedor
+from contenedores.views import ContenedorViewSet
+from movimientos.models import Movimiento
+from personal.models import Personal
+from port_control.busqueda import construir_consulta
+from zonas_puerto.models import ZonaPuerto
+
+
+class OperacionesMasivasTests(TestCase):
+    """POST, PATCH y DELETE por lotes en /api/contenedores/bulk/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Personal.objects.create_user('operador', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+        cls.barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        cls.existente = Contenedor.objects.create(
+            barco=cls.barco, codigo_contenedor='MSCU0000001', tipo='Dry', peso=1000, estado='en_patio'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def _fila(self, codigo, **extra):
+        return {'barco': str(self.barco.pk), 'codigo_contenedor': codigo, 'tipo': 'Dry', 'peso': 1500, 'estado': 'en_patio', **extra}
+
+    def _detalles(self, response):
+        return response.json()['error']['details']
+
+    def test_crear_lote(self):
+        response = self.client.post('/api/contenedores/bulk/', [self._fila('MSCU0000002'), self._fila('MSCU0000003')], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([fila['codigo_contenedor'] for fila in response.json()], ['MSCU0000002', 'MSCU0000003'])
+        self.assertEqual(Contenedor.objects.count(), 3)
+
+    def test_lote_con_filas_invalidas_no_escribe_nada(self):
+        lote = [
+            self._fila('MSCU0000002'),
+            self._fila('MSCU0000003', peso='pesado'),
+            self._fila('MSCU0000004', barco='00000000-0000-0000-0000-000000000000'),
+            self._fila('MSCU0000005'),
+        ]
+        response = self.client.post('/api/contenedores/bulk/', lote, format='json')
+        self.assertEqual(response.status_code, 400)
+        errores = self._detalles(response)
+        # Un error por fila, en la misma posición que en la petición
+        self.assertEqual(len(errores), 4)
+        self.assertEqual(errores[0], {})
+        self.assertIn('peso', errores[1])
+        self.assertIn('barco', errores[2])
+        self.assertEqual(errores[3], {})
+        self.assertEqual(Contenedor.objects.count(), 1)
+
+    def test_codigo_repetido(self):
+        for lote, indices in (
+            ([self._fila('MSCU0000002'), self._fila('MSCU0000002')], [1]),
+            ([self._fila('MSCU0000002'), self._fila('MSCU0000001')], [1]),
+        ):
+            with self.subTest(lote=[fila['codigo_contenedor'] for fila in lote]):
+                response = self.client.post('/api/contenedores/bulk/', lote, format='json')
+                self.assertEqual(response.status_code, 400)
+                errores = self._detalles(response)
+                self.assertEqual([indice for indice, error in enumerate(errores) if 'codigo_contenedor' in error], indices)
+                self.assertEqual(Contenedor.objects.count(), 1)
+
+    def test_post_del_listado_igual_que_bulk(self):
+        invalido = [self._fila('MSCU0000002'), self._fila('MSCU0000002')]
+        respuestas = [self.client.post(url, invalido, format='json') for url in ('/api/contenedores/', '/api/contenedores/bulk/')]
+        self.assertEqual([response.status_code for response in respuestas], [400, 400])
+        self.assertEqual(self._detalles(respuestas[0]), self._detalles(respuestas[1]))
+
+        response = self.client.post('/api/contenedores/', [self._fila('MSCU0000002'), self._fila('MSCU0000003')], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(Contenedor.objects.count(), 3)
+
+        # Un objeto suelto sigue usando la creación individual
+        response = self.client.post('/api/contenedores/', self._fila('MSCU0000004'), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['codigo_contenedor'], 'MSCU0000004')
+
+    def test_actualizar_lote(self):
+        otro = Contenedor.objects.create(barco=self.barco, codigo_contenedor='MSCU0000002', tipo='Dry', peso=1000, estado='en_patio')
+        antes = self.existente.fecha_actualizacion
+        response = self.client.patch('/api/contenedores/bulk/', [
+            {'id': str(self.existente.pk), 'estado': 'embarcado'},
+            {'id': str(otro.pk), 'peso': 2000},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.existente.refresh_from_db()
+        otro.refresh_from_db()
+        self.assertEqual((self.existente.estado, otro.peso), ('embarcado', 2000))
+        self.assertGreater(self.existente.fecha_actualizacion, antes)
+
+    def test_actualizar_lote_invalido_no_escribe_nada(self):
+        otro = Contenedor.objects.create(barco=self.barco, codigo_contenedor='MSCU0000002', tipo='Dry', peso=1000, estado='en_patio')
+        response = self.client.patch('/api/contenedores/bulk/', [
+            {'id': str(self.existente.pk), 'estado': 'embarcado'},
+            {'id': str(otro.pk), 'codigo_contenedor': 'MSCU0000001'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('codigo_contenedor', self._detalles(response)[1])
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.estado, 'en_patio')
+
+    def test_eliminar_lote(self):
+        otro = Contenedor.objects.create(barco=self.barco, codigo_contenedor='MSCU0000002', tipo='Dry', peso=1000, estado='en_patio')
+        ausente = '00000000-0000-0000-0000-000000000000'
+        response = self.client.delete('/api/contenedores/bulk/', {'ids': [str(otro.pk), ausente]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Contenedor.objects.count(), 2)
+
+        response = self.client.delete('/api/contenedores/bulk/', {'ids': [str(otro.pk), str(self.existente.pk)]}, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Contenedor.objects.exists())
+
+
+class RespuestaCondicionalTests(TestCase):
+    """ETag, Last-Modified y respuestas 304 del listado y el detalle de contenedores."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Personal.objects.create_user('operador', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+        cls.barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        cls.antiguo, cls.reciente = [
+            Contenedor.objects.create(barco=cls.barco, codigo_contenedor=codigo, tipo='Dry', peso=1000, estado='en_patio')
+            for codigo in ('MSCU0000001', 'MSCU0000002')
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def _etag(self, ruta='/api/contenedores/'):
+        response = self.client.get(ruta)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def _agregado(self):
+        return Contenedor.objects.aggregate(total=Count('pk'), ultima=Max('fecha_actualizacion'))
+
+    def test_if_none_match(self):
+        etag = self._etag()
+        self.assertTrue(etag.startswith('W/"'))
+        response = self.client.get('/api/contenedores/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get('/api/contenedores/', HTTP_IF_NONE_MATCH='W/"otro"').status_code, 200)
+
+    def test_etag_depende_de_la_consulta(self):
+        etags = {self._etag(ruta) for ruta in (
+            '/api/contenedores/', '/api/contenedores/?estado=en_patio', '/api/contenedores/?expand=barco',
+        )}
+        self.assertEqual(len(etags), 3)
+
+    def test_creacion_cambia_el_etag(self):
+        etag = self._etag()
+        Contenedor.objects.create(barco=self.barco, codigo_contenedor='MSCU0000003', tipo='Dry', peso=1000, estado='en_patio')
+        self.assertNotEqual(self._etag(), etag)
+
+    def test_actualizacion_cambia_solo_la_ultima_modificacion(self):
+        etag, antes = self._etag(), self._agregado()
+        self.antiguo.estado = 'embarcado'
+        self.antiguo.save()
+        despues = self._agregado()
+        self.assertEqual(despues['total'], antes['total'])
+        self.assertGreater(despues['ultima'], antes['ultima'])
+        self.assertNotEqual(self._etag(), etag)
+
+    def test_eliminacion_cambia_solo_el_total(self):
+        etag, antes = self._etag(), self._agregado()
+        # El eliminado no es el último modificado: MAX(fecha_actualizacion) no cambia
+        self.antiguo.delete()
+        despues = self._agregado()
+        self.assertEqual(despues['ultima'], antes['ultima'])
+        self.assertEqual(despues['total'], antes['total'] - 1)
+        self.assertNotEqual(self._etag(), etag)
+
+    def test_expand_considera_la_relacion(self):
+        ruta = '/api/contenedores/?expand=barco'
+        etag, etag_sin_expand = self._etag(ruta), self._etag()
+        self.barco.nombre = 'Atacama'
+        self.barco.save()
+        self.assertNotEqual(self._etag(ruta), etag)
+        self.assertEqual(self._etag(), etag_sin_expand)
+
+    def test_detalle(self):
+        ruta = f'/api/contenedores/{self.antiguo.pk}/'
+        response = self.client.get(ruta)
+        etag, ultima = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(ruta, HTTP_IF_MODIFIED_SINCE=ultima)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Last-Modified'], ultima)
+        # Otro contenedor modificado no afecta el detalle
+        self.reciente.save()
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.antiguo.estado = 'embarcado'
+        self.antiguo.save()
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detalle_inexistente(self):
+        for pk in ('00000000-0000-0000-0000-000000000000', 'no-es-uuid'):
+            with self.subTest(pk=pk):
+                self.assertEqual(self.client.get(f'/api/contenedores/{pk}/').status_code, 404)
+
+
+class EncabezadoManifiestoTests(SimpleTestCase):
+
+    def test_columnas_en_cualquier_orden(self):
+        archivo = io.StringIO(' Peso ,codigo_contenedor,extra,ESTADO,tipo\nresto\n')
+        self.assertEqual(_leer_encabezado(archivo), ['peso', 'codigo_contenedor', 'extra', 'estado', 'tipo'])
+        # Queda posicionado en la primera fila de datos, que es la que lee COPY
+        self.assertEqual(archivo.read(), 'resto\n')
+
+    def test_encabezados_invalidos(self):
+        for contenido, mensaje in (
+            ('', 'vacío'),
+            ('\n', 'vacío'),
+            ('codigo_contenedor,tipo\n', 'Faltan columnas en el encabezado: peso, estado'),
+            ('codigo_contenedor,tipo,peso,estado,tipo\n', 'Columnas repetidas en el encabezado: tipo'),
+        ):
+            with self.subTest(contenido=contenido):
+                with self.assertRaisesMessage(ManifiestoInvalido, mensaje):
+                    _leer_encabezado(io.StringIO(contenido))
+
+    @skipIf(connection.vendor == 'postgresql', 'Solo sin PostgreSQL')
+    def test_requiere_postgresql(self):
+        with self.assertRaisesMessage(ManifiestoInvalido, 'requiere PostgreSQL'):
+            importar_manifiesto(io.StringIO('codigo_contenedor,tipo,peso,estado\n'), Barco(nombre='Andes'))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY de PostgreSQL')
+class ImportarManifiestoTests(TestCase):
+    """Importación con COPY, validación en SQL e INSERT ... ON CONFLICT."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.operador = Personal.objects.create_user('operador', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+        cls.barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        otro = Barco.objects.create(nombre='Atacama', bandera='CL', tipo='Granelero', empresa_operadora='CSAV')
+        cls.existente = Contenedor.objects.create(
+            barco=otro, codigo_contenedor='MSCU0000001', tipo='Dry', peso=500, estado='en_transito'
+        )
+        # bulk_create no emite post_save: evita sincronizar geocercas con MongoDB
+        cls.zona, = ZonaPuerto.objects.bulk_create([ZonaPuerto(nombre='Patio 1', tipo='patio')])
+
+    def _importar(self, lineas, **opciones):
+        contenido = 'codigo_contenedor,tipo,peso,estado\n' + ''.join(f'{linea}\n' for linea in lineas)
+        return importar_manifiesto(io.StringIO(contenido), self.barco, **opciones)
+
+    def test_crea_actualiza_e_informa_conflictos(self):
+        resumen = self._importar([
+            'MSCU0000002,Dry,1200,en_patio',
+            ' MSCU0000001 ,Reefer,2500.5,en_patio',
+            'MSCU0000003,Dry,pesado,en_patio',
+            ',Dry,1000,en_patio',
+            'MSCU0000004,Dry,1000,en_patio',
+            'MSCU0000004,Dry,1100,en_patio',
+            'MSCU0000005,,1000,en_patio',
+        ])
+        self.assertEqual(
+            {clave: valor for clave, valor in resumen.items() if clave != 'conflictos'},
+            {'filas': 7, 'creados': 1, 'actualizados': 1, 'sin_cambios': 0, 'movimientos': 0, 'total_conflictos': 5},
+        )
+        # fila es la fila del CSV: el encabezado es la fila 1
+        self.assertEqual(resumen['conflictos'], [
+            {'fila': 4, 'codigo_contenedor': 'MSCU0000003', 'motivo': 'peso no es un número'},
+            # COPY lee como NULL un campo vacío sin comillas
+            {'fila': 5, 'codigo_contenedor': None, 'motivo': 'codigo_contenedor vacío'},
+            {'fila': 6, 'codigo_contenedor': 'MSCU0000004', 'motivo': 'codigo_contenedor repetido en el manifiesto'},
+            {'fila': 7, 'codigo_contenedor': 'MSCU0000004', 'motivo': 'codigo_contenedor repetido en el manifiesto'},
+            {'fila': 8, 'codigo_contenedor': 'MSCU0000005', 'motivo': 'tipo vacío'},
+        ])
+        self.existente.refresh_from_db()
+        self.assertEqual(
+            (self.existente.barco_id, self.existente.tipo, self.existente.peso, self.existente.estado),
+            (self.barco.pk, 'Reefer', 2500.5, 'en_patio'),
+        )
+        self.assertEqual(
+            set(Contenedor.objects.values_list('codigo_contenedor', flat=True)), {'MSCU0000001', 'MSCU0000002'}
+        )
+
+    def test_sin_cambios(self):
+        lineas = ['MSCU0000001,Dry,500,en_transito', 'MSCU0000002,Dry,1200,en_patio']
+        self._importar(lineas)
+        antes = Contenedor.objects.get(codigo_contenedor='MSCU0000002').fecha_actualizacion
+        resumen = self._importar(lineas)
+        self.assertEqual((resumen['creados'], resumen['actualizados'], resumen['sin_cambios']), (0, 0, 2))
+        self.assertEqual(Contenedor.objects.get(codigo_contenedor='MSCU0000002').fecha_actualizacion, antes)
+
+    def test_omitir_existentes(self):
+        resumen = self._importar(['MSCU0000001,Reefer,900,en_patio', 'MSCU0000002,Dry,1200,en_patio'], existentes='omitir')
+        self.assertEqual((resumen['creados'], resumen['actualizados'], resumen['total_conflictos']), (1, 0, 1))
+        self.assertEqual(resumen['conflictos'], [
+            {'fila': 2, 'codigo_contenedor': 'MSCU0000001', 'motivo': 'el contenedor ya existe'},
+        ])
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.tipo, 'Dry')
+
+    def test_registrar_ingreso(self):
+        resumen = self._importar(
+            ['MSCU0000001,Reefer,900,en_patio', 'MSCU0000002,Dry,1200,en_patio', 'MSCU0000003,Dry,x,en_patio'],
+            registrar_ingreso=True, zona_destino=self.zona, operador=self.operador,
+        )
+        self.assertEqual(resumen['movimientos'], 2)
+        self.assertEqual(
+            set(Movimiento.objects.values_list('contenedor__codigo_contenedor', 'tipo_movimiento', 'zona_destino', 'operador')),
+            {('MSCU0000001', 'ingreso', self.zona.pk, self.operador.pk),
+             ('MSCU0000002', 'ingreso', self.zona.pk, self.operador.pk)},
+        )
+
+    def test_limite_de_conflictos(self):
+        resumen = self._importar([f'MSCU{indice:07d},Dry,x,en_patio' for indice in range(10)], limite_conflictos=3)
+        self.assertEqual(resumen['total_conflictos'], 10)
+        self.assertEqual([conflicto['fila'] for conflicto in resumen['conflictos']], [2, 3, 4])
+
+    def test_varias_importaciones_en_una_transaccion(self):
+        with transaction.atomic():
+            self._importar(['MSCU0000002,Dry,1200,en_patio'])
+            # Un CSV inválido revierte solo su propia importación
+            with self.assertRaises(ManifiestoInvalido):
+                self._importar(['MSCU0000003,Dry,1200,"en_patio'])
+            resumen = self._importar(['MSCU0000003,Dry,1200,en_patio'])
+        self.assertEqual(resumen['creados'], 1)
+        self.assertEqual(
+            set(Contenedor.objects.values_list('codigo_contenedor', flat=True)),
+            {'MSCU0000001', 'MSCU0000002', 'MSCU0000003'},
+        )
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.operador)
+        archivo = SimpleUploadedFile(
+            'manifiesto.csv', '\ufeffcodigo_contenedor,tipo,peso,estado\nMSCU0000002,Dry,1200,en_patio\n'.encode(),
+            content_type='text/csv',
+        )
+        response = client.post('/api/contenedores/manifiesto/', {
+            'archivo': archivo, 'barco': str(self.barco.pk), 'registrar_ingreso': 'true',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['creados'], response.json()['movimientos']), (1, 1))
+        self.assertEqual(Movimiento.objects.get().operador, self.operador)
+
+
+class ConstruirConsultaTests(SimpleTestCase):
+    """Consulta de texto completo de ?search= (sin base de datos)."""
+
+    @staticmethod
+    def _texto(consulta):
+        return consulta.get_source_expressions()[-1].value
+
+    def test_sin_palabras(self):
+        self.assertIsNone(construir_consulta('-- "" *'))
+
+    def test_prefijos(self):
+        consulta = construir_consulta('"sello roto" MSCU12 or Dry -vacio')
+        self.assertEqual(self._texto(consulta.rhs), 'sello:* & roto:* & MSCU12:* & Dry:*')
+
+    def test_solo_exclusiones(self):
+        consulta = construir_consulta('-vacio')
+        self.assertIsInstance(consulta, SearchQuery)
+        self.assertEqual(self._texto(consulta), '-vacio')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'texto completo de PostgreSQL')
+class BusquedaTextoCompletoTests(TestCase):
+    """?search= sobre la columna busqueda: prefijos, subcadenas del código, relevancia y triggers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Personal.objects.create_user('operador', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+        cls.barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        # 'reefer' coincide con el código (peso A) del segundo y con el tipo (peso B) del primero
+        cls.tipo_reefer = Contenedor.objects.create(
+            barco=cls.barco, codigo_contenedor='AAAU1234567', tipo='Reefer', peso=1000, estado='en_patio'
+        )
+        cls.codigo_reefer = Contenedor.objects.create(
+            barco=cls.barco, codigo_contenedor='REEFER00001', tipo='Dry', peso=1000, estado='en_patio'
+        )
+        cls.movimiento = Movimiento.objects.create(
+            contenedor=cls.tipo_reefer, tipo_movimiento='descarga', fecha_hora=timezone.now(), operador=cls.usuario
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def _codigos(self, ruta):
+        response = self.client.get(ruta)
+        self.assertEqual(response.status_code, 200)
+        return [fila['codigo_contenedor'] for fila in response.json()['results']]
+
+    def test_prefijo(self):
+        self.assertEqual(self._codigos('/api/contenedores/?search=AAAU12'), ['AAAU1234567'])
+
+    def test_subcadena_del_codigo(self):
+        self.assertEqual(self._codigos('/api/contenedores/?search=1234'), ['AAAU1234567'])
+        response = self.client.get('/api/movimientos/?search=1234')
+        self.assertEqual([fila['id'] for fila in response.json()['results']], [str(self.movimiento.pk)])
+
+    def test_orden_por_relevancia(self):
+        self.assertEqual(self._codigos('/api/contenedores/?search=reefer'), ['REEFER00001', 'AAAU1234567'])
+        self.assertEqual(
+            self._codigos('/api/contenedores/?search=reefer&ordering=codigo_contenedor'),
+            ['AAAU1234567', 'REEFER00001'],
+        )
+
+    def test_cambio_de_codigo_se_propaga(self):
+        self.tipo_reefer.codigo_contenedor = 'ZZZU7654321'
+        self.tipo_reefer.save()
+        consulta = construir_consulta('ZZZU76')
+        self.assertTrue(Movimiento.objects.filter(pk=self.movimiento.pk, busqueda=consulta).exists())
+        self.assertFalse(Movimiento.objects.filter(busqueda=construir_consulta('AAAU12')).exists())
+
+
+@override_settings(API_EXPORTACION_TROZO=5)
+class ExportacionTests(TestCase):
+    """GET /api/contenedores/exportar/: CSV o NDJSON sin paginar, con los filtros del listado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Personal.objects.create_user('operador', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+        barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        # Más filas que una página del listado y que un trozo de la exportación
+        Contenedor.objects.bulk_create([
+            Contenedor(
+                barco=barco, codigo_contenedor=f'MSCU{indice:07d}', tipo='Dry' if indice % 3 else 'Reefer',
+                peso=1000 + indice * 10.5, estado='en_patio',
+            )
+            for indice in range(12)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def _exportar(self, parametros=''):
+        response = self.client.get('/api/contenedores/exportar/?' + parametros)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def _listado(self, parametros=''):
+        filas, ruta = [], '/api/contenedores/?' + parametros
+        while ruta:
+            datos = self.client.get(ruta).json()
+            filas.extend(datos['results'])
+            ruta = datos['next']
+        return filas
+
+    def test_csv_con_las_columnas_del_listado(self):
+        response, contenido = self._exportar()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="contenedores.csv"')
+
+        filas = list(csv.reader(io.StringIO(contenido.decode())))
+        listado = self._listado()
+        self.assertEqual(len(listado), 12)
+        self.assertEqual(filas[0], list(listado[0]))
+        self.assertEqual(filas[1:], [['' if valor is None else str(valor) for valor in fila.values()] for fila in listado])
+
+    def test_ndjson(self):
+        response, contenido = self._exportar('formato=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(contenido.endswith(b'\n'))
+        self.assertEqual([json.loads(linea) for linea in contenido.splitlines()], self._listado())
+
+    def test_gzip(self):
+        _, plano = self._exportar('formato=ndjson')
+        response, contenido = self._exportar('formato=ndjson&gzip=true')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="contenedores.ndjson.gz"')
+        self.assertEqual(gzip.decompress(contenido), plano)
+
+    def test_filtros_y_orden(self):
+        parametros = 'formato=ndjson&tipo=Reefer&ordering=-peso'
+        _, contenido = self._exportar(parametros)
+        filas = [json.loads(linea) for linea in contenido.splitlines()]
+        self.assertEqual([fila['codigo_contenedor'] for fila in filas], ['MSCU0000009', 'MSCU0000006', 'MSCU0000003', 'MSCU0000000'])
+        self.assertEqual(filas, self._listado(parametros))
+
+    def test_sin_serializador_compilado(self):
+        # Serializers que SerializadorValores no admite se representan fila por fila
+        _, esperado = self._exportar('formato=ndjson')
+        with mock.patch('port_control.exportacion.SerializadorValores.compilar', return_value=None):
+            _, contenido = self._exportar('formato=ndjson')
+        self.assertEqual(contenido, esperado)
+
+    def test_acepta_cualquier_accept(self):
+        response = self.client.get('/api/contenedores/exportar/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+
+    def test_formato_invalido(self):
+        response = self.client.get('/api/contenedores/exportar/?formato=xml')
+        self.assertEqual(response.status_code, 400)
+        cuerpo = response.json()
+        self.assertFalse(cuerpo['success'])
+        self.assertIn('formato', cuerpo['error']['details'])
+
+
+class ExportacionAsgiTests(TestCase):
+    """Con ASGI la exportación se transmite con un generador asíncrono, sin consumirla entera antes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Personal.objects.create_user('operador', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+        barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        Contenedor.objects.bulk_create([
+            Contenedor(barco=barco, codigo_contenedor=f'MSCU{indice:07d}', tipo='Dry', peso=1000, estado='en_patio')
+            for indice in range(5)
+        ])
+
+    def _exportar(self, fabrica):
+        request = fabrica.get('/api/contenedores/exportar/')
+        force_authenticate(request, user=self.usuario)
+        return ContenedorViewSet.as_view({'get': 'exportar'})(request)
+
+    @override_settings(API_EXPORTACION_TROZO=2)
+    def test_mismo_contenido_que_wsgi(self):
+        esperado = b''.join(self._exportar(APIRequestFactory()).streaming_content)
+        response = self._exportar(AsyncRequestFactory())
+        self.assertTrue(response.is_async)
+
+        async def leer():
+            return [parte async for parte in response]
+
+        # async_to_sync: las partes se generan en este hilo, con su conexión a la base
+        partes = async_to_sync(leer)()
+        self.assertGreater(len(partes), 1)
+        self.assertEqual(b''.join(partes), esperado)
@@ -1,26 +1,72 @@
+import io
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from contenedores.manifiesto import ManifiestoInvalido, importar_manifiesto
 from contenedores.models import Contenedor
-from contenedores.serializers import ContenedorSerializer
+from contenedores.serializers import ContenedorSerializer, ImportacionManifiestoSerializer
+from port_control.busqueda import BusquedaTextoCompleto
+from port_control.condicional import RespuestaCondicionalMixin
+from port_control.expansion import ExpandirMixin
+from port_control.exportacion import ExportacionMixin
+from port_control.masivo import OperacionesMasivasMixin
 from port_control.permissions import ContenedorPermission
+from port_control.serializacion import ListadoRapidoMixin
 
 
-class ContenedorViewSet(viewsets.ModelViewSet):
+class ContenedorViewSet(OperacionesMasivasMixin, RespuestaCondicionalMixin, ExportacionMixin, ExpandirMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Contenedores
     
     Permisos:
     - CRUD: ADMIN, CAPITAN_PUERTO, OPERADOR_TERMINAL
     - Leer: INSPECTOR, AGENTE_NAVIERO, VIGILANTE
+    
+    Operaciones masivas en bulk/: POST (lista), PATCH (lista con id), DELETE ({"ids": [...]})
+    Expandibles con ?expand=: barco
+    Importación de manifiestos CSV en manifiesto/ (POST multipart, COPY de PostgreSQL)
     """
-    queryset = Contenedor.objects.all()
+    queryset = Contenedor.objects.con_relaciones()
     serializer_class = ContenedorSerializer
+    # Listado desde values_list() y orjson (ver benchmark_listados)
+    listado_rapido = True
     permission_classes = [ContenedorPermission]
     
     # Filtros y búsqueda
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BusquedaTextoCompleto]
     filterset_fields = ['barco', 'tipo', 'estado']
     search_fields = ['codigo_contenedor', 'tipo', 'estado']
+    # Además del texto completo, el código se busca como subcadena (icontains)
+    campos_subcadena = ['codigo_contenedor']
     ordering_fields = ['codigo_contenedor', 'peso', 'tipo']
     ordering = ['codigo_contenedor']
+
+    # Conflictos incluidos en la respuesta de manifiesto/ (el total siempre se informa)
+    conflictos_en_respuesta = 1000
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def manifiesto(self, request):
+        parametros = ImportacionManifiestoSerializer(data=request.data)
+        parametros.is_valid(raise_exception=True)
+        datos = parametros.validated_data
+        archivo = io.TextIOWrapper(datos['archivo'].file, encoding='utf-8-sig', newline='')
+        try:
+            resumen = importar_manifiesto(
+                archivo,
+                datos['barco'],
+                existentes=datos['existentes'],
+                registrar_ingreso=datos['registrar_ingreso'],
+                zona_destino=datos.get('zona_destino'),
+                operador=request.user,
+                fecha_hora=datos.get('fecha_hora'),
+                limite_conflictos=self.conflictos_en_respuesta,
+            )
+        except ManifiestoInvalido as error:
+            raise ValidationError({'archivo': [str(error)]})
+        except UnicodeDecodeError:
+            raise ValidationError({'archivo': ['El archivo debe estar codificado en UTF-8']})
+        return Response(resumen)
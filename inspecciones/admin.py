@@ -1,3 +1,14 @@
 from django.contrib import admin
+from inspecciones.models import Inspeccion
 
-# Register your models here.
+
+@admin.register(Inspeccion)
+class InspeccionAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'inspector', 'fecha', 'resultado')
+    list_filter = ('resultado',)
+    list_select_related = ('contenedor', 'inspector')
+    raw_id_fields = ('contenedor', 'inspector')
+    search_fields = ('contenedor__codigo_contenedor',)
+    date_hierarchy = 'fecha'
+    # Evita el COUNT(*) sin filtros sobre la tabla completa
+    show_full_result_count = False
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("inspecciones", "0002_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=models.Index(
+                fields=["fecha", "id"], name="inspecciones_fecha_id_idx"
+            ),
+        ),
+    ]
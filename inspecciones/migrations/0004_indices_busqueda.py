@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("contenedores", "0002_indices_busqueda"),
+        ("inspecciones", "0003_inspeccion_fecha_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=models.Index(fields=["contenedor", "fecha", "id"], name="inspec_contenedor_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=models.Index(fields=["inspector", "fecha", "id"], name="inspec_inspector_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=models.Index(fields=["resultado", "fecha", "id"], name="inspec_resultado_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("resultado"), name="gin_trgm_ops"), name="inspec_resultado_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("observaciones"), name="gin_trgm_ops"), name="inspec_obs_trgm"),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+# El vector se recalcula en la base de datos en cada INSERT y en cada UPDATE de
+# las columnas que lo componen, así que también lo mantienen bulk_create(),
+# bulk_update() y las cargas con COPY. Asignar busqueda = NULL lo recalcula.
+# Un trigger en contenedores recalcula los vectores al cambiar codigo_contenedor.
+TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION inspecciones_busqueda_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT codigo_contenedor FROM contenedores WHERE id = NEW.contenedor_id), ''
+            )), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.resultado, '')), 'B') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.observaciones, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER inspecciones_busqueda
+        BEFORE INSERT OR UPDATE OF contenedor_id, resultado, observaciones, busqueda ON inspecciones
+        FOR EACH ROW EXECUTE FUNCTION inspecciones_busqueda_actualizar()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION inspecciones_busqueda_propagar() RETURNS trigger AS $$
+    BEGIN
+        UPDATE inspecciones SET busqueda = NULL WHERE contenedor_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER inspecciones_busqueda_contenedores
+        AFTER UPDATE OF codigo_contenedor ON contenedores
+        FOR EACH ROW WHEN (OLD.codigo_contenedor IS DISTINCT FROM NEW.codigo_contenedor)
+        EXECUTE FUNCTION inspecciones_busqueda_propagar()
+    """,
+]
+
+ELIMINAR_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS inspecciones_busqueda_contenedores ON contenedores",
+    "DROP FUNCTION IF EXISTS inspecciones_busqueda_propagar()",
+    "DROP TRIGGER IF EXISTS inspecciones_busqueda ON inspecciones",
+    "DROP FUNCTION IF EXISTS inspecciones_busqueda_actualizar()",
+]
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("inspecciones", "0004_indices_busqueda"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inspeccion",
+            name="busqueda",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(TRIGGERS, ELIMINAR_TRIGGERS),
+        # Calcula el vector de las filas existentes
+        migrations.RunSQL(
+            "UPDATE inspecciones SET busqueda = NULL", migrations.RunSQL.noop
+        ),
+        AddIndexConcurrently(
+            model_name="inspeccion",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["busqueda"], name="inspec_busqueda_gin"
+            ),
+        ),
+    ]
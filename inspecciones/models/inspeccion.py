@@ -1,8 +1,20 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 from contenedores.models import Contenedor
 from personal.models import Personal
 
+class InspeccionQuerySet(models.QuerySet):
+    def con_relaciones(self):
+        """
+        Carga en la misma consulta el contenedor y el inspector, que usan __str__,
+        el admin y las representaciones expandidas. Omite los vectores de búsqueda.
+        """
+        return self.select_related('contenedor', 'inspector').defer('busqueda', 'contenedor__busqueda')
+
+
 class Inspeccion(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     contenedor = models.ForeignKey(Contenedor, on_delete=models.CASCADE, related_name='inspecciones')
@@ -10,9 +22,30 @@ class Inspeccion(models.Model):
     fecha = models.DateField()
     resultado = models.CharField(max_length=50)  # aprobado, rechazado, observado…
     observaciones = models.TextField(null=True, blank=True)
+    # Vector de búsqueda de texto completo, mantenido por un trigger (migración 0005)
+    busqueda = SearchVectorField(null=True, editable=False)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = InspeccionQuerySet.as_manager()
 
     class Meta:
         db_table = "inspecciones"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='inspec_actualizacion_idx'),
+            # Clave de la paginación por cursor (fecha, id)
+            models.Index(fields=['fecha', 'id'], name='inspecciones_fecha_id_idx'),
+            # Filtros combinados con la clave de paginación
+            models.Index(fields=['contenedor', 'fecha', 'id'], name='inspec_contenedor_fecha_idx'),
+            models.Index(fields=['inspector', 'fecha', 'id'], name='inspec_inspector_fecha_idx'),
+            models.Index(fields=['resultado', 'fecha', 'id'], name='inspec_resultado_fecha_idx'),
+            # Búsqueda de texto completo
+            GinIndex(fields=['busqueda'], name='inspec_busqueda_gin'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('resultado'), name='gin_trgm_ops'), name='inspec_resultado_trgm'),
+            GinIndex(OpClass(Upper('observaciones'), name='gin_trgm_ops'), name='inspec_obs_trgm'),
+        ]
 
     def __str__(self):
         return f"Inspección {self.id} - {self.contenedor.codigo_contenedor}"
@@ -1,7 +1,15 @@
 from rest_framework import serializers
+from contenedores.serializers import ContenedorSerializer
 from inspecciones.models import Inspeccion
+from personal.serializers import PersonalMinimalSerializer
+from port_control.expansion import ExpandibleMixin
+
+class InspeccionSerializer(ExpandibleMixin, serializers.ModelSerializer):
+    campos_expandibles = {
+        'contenedor': ContenedorSerializer,
+        'inspector': PersonalMinimalSerializer,
+    }
 
-class InspeccionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Inspeccion
-        fields = '__all__'
+        exclude = ['busqueda']
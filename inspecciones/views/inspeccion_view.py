@@ -1,12 +1,18 @@
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from inspecciones.models import Inspeccion
 from inspecciones.serializers import InspeccionSerializer
+from port_control.busqueda import BusquedaTextoCompleto
+from port_control.condicional import RespuestaCondicionalMixin
+from port_control.expansion import ExpandirMixin
+from port_control.exportacion import ExportacionMixin
+from port_control.paginacion import PaginacionCursor
 from port_control.permissions import InspeccionPermission
+from port_control.serializacion import ListadoRapidoMixin
 
 
-class InspeccionViewSet(viewsets.ModelViewSet):
+class InspeccionViewSet(RespuestaCondicionalMixin, ExportacionMixin, ExpandirMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Inspecciones
     
@@ -14,14 +20,22 @@ class InspeccionViewSet(viewsets.ModelViewSet):
     - CRUD: ADMIN, INSPECTOR
     - Leer: CAPITAN_PUERTO, OPERADOR_TERMINAL, VIGILANTE
     - Sin acceso: AGENTE_NAVIERO
+    
+    Exportación en exportar/: ?formato=csv|ndjson, ?gzip=true
+    Expandibles con ?expand=: contenedor, inspector
     """
-    queryset = Inspeccion.objects.all()
+    queryset = Inspeccion.objects.con_relaciones()
     serializer_class = InspeccionSerializer
+    # Listado desde values_list() y orjson (ver benchmark_listados)
+    listado_rapido = True
     permission_classes = [InspeccionPermission]
+    pagination_class = PaginacionCursor
     
     # Filtros y búsqueda
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BusquedaTextoCompleto]
     filterset_fields = ['contenedor', 'inspector', 'resultado', 'fecha']
     search_fields = ['resultado', 'observaciones', 'contenedor__codigo_contenedor']
+    # Además del texto completo, el código se busca como subcadena (icontains)
+    campos_subcadena = ['contenedor__codigo_contenedor']
     ordering_fields = ['fecha', 'resultado']
     ordering = ['-fecha']
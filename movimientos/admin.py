@@ -1,3 +1,14 @@
 from django.contrib import admin
+from movimientos.models import Movimiento
 
-# Register your models here.
+
+@admin.register(Movimiento)
+class MovimientoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'zona_origen', 'zona_destino', 'operador', 'fecha_hora')
+    list_filter = ('tipo_movimiento',)
+    list_select_related = ('contenedor', 'zona_origen', 'zona_destino', 'operador')
+    raw_id_fields = ('contenedor', 'operador')
+    search_fields = ('contenedor__codigo_contenedor',)
+    date_hierarchy = 'fecha_hora'
+    # Evita el COUNT(*) sin filtros sobre la tabla completa
+    show_full_result_count = False
@@ -0,0 +1,113 @@
+"""
+Comando para medir el rendimiento de serialización de los listados de la API.
+Compara filas/segundo del camino normal de DRF (ModelSerializer + JSONRenderer)
+con el listado rápido (values_list() precompilado + orjson).
+Ejecutar: python manage.py benchmark_listados --recurso movimientos --filas 5000
+"""
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from autorizaciones.views import AutorizacionViewSet
+from barcos.views import BarcoViewSet
+from contenedores.views import ContenedorViewSet
+from inspecciones.views import InspeccionViewSet
+from movimientos.views import MovimientoViewSet
+from tripulacion.views import TripulanteViewSet
+from zonas_puerto.views import ZonaPuertoViewSet
+from port_control.renderers import ORJSONRenderer, orjson
+from port_control.serializacion import SerializadorValores
+import json
+import time
+
+
+RECURSOS = {
+    'autorizaciones': AutorizacionViewSet,
+    'barcos': BarcoViewSet,
+    'contenedores': ContenedorViewSet,
+    'inspecciones': InspeccionViewSet,
+    'movimientos': MovimientoViewSet,
+    'tripulacion': TripulanteViewSet,
+    'zonas': ZonaPuertoViewSet,
+}
+
+
+class Command(BaseCommand):
+    help = 'Mide filas/segundo de los listados con el serializer de DRF y con el listado rápido'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recurso',
+            choices=sorted(RECURSOS),
+            action='append',
+            help='Recurso a medir; repetir para varios (default: todos)',
+        )
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=1000,
+            help='Filas por listado (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=5,
+            help='Repeticiones de cada medición; se reporta la mejor (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(
+                self.style.WARNING('⚠️  orjson no está instalado: el listado rápido usará el encoder de DRF')
+            )
+
+        for nombre in options['recurso'] or sorted(RECURSOS):
+            self._medir(nombre, RECURSOS[nombre], options['filas'], options['repeticiones'])
+
+    def _medir(self, nombre, viewset, filas, repeticiones):
+        queryset = viewset.queryset.order_by(*viewset.ordering)[:filas]
+        serializer_class = viewset.serializer_class
+        compilado = SerializadorValores.compilar(serializer_class)
+
+        if compilado is None:
+            self.stdout.write(
+                self.style.WARNING(f'⚠️  {nombre}: el serializer no admite el listado rápido')
+            )
+            return
+
+        def drf():
+            return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+        def rapido():
+            return ORJSONRenderer().render(compilado.serializar(compilado.consulta(queryset.all())))
+
+        salida_drf = drf()
+        total = len(json.loads(salida_drf))
+        if total == 0:
+            self.stdout.write(self.style.WARNING(f'⚠️  {nombre}: no hay filas para medir'))
+            return
+
+        if json.loads(rapido()) != json.loads(salida_drf):
+            self.stdout.write(
+                self.style.ERROR(f'❌ {nombre}: la salida del listado rápido difiere de la de DRF')
+            )
+            return
+
+        tasa_drf = total / self._mejor_tiempo(drf, repeticiones)
+        tasa_rapido = total / self._mejor_tiempo(rapido, repeticiones)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {nombre} ({total} filas): '
+                f'DRF {tasa_drf:,.0f} filas/s, rápido {tasa_rapido:,.0f} filas/s '
+                f'(x{tasa_rapido / tasa_drf:.1f})'
+            )
+        )
+
+    @staticmethod
+    def _mejor_tiempo(funcion, repeticiones):
+        mejor = None
+        for _ in range(max(repeticiones, 1)):
+            inicio = time.perf_counter()
+            funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor
@@ -0,0 +1,99 @@
+"""
+Comando para verificar cuántas consultas SQL hace cada listado de la API.
+Detecta consultas N+1: el listado, el detalle (también con todas las
+relaciones expandidas con ?expand=) y la representación de texto (__str__,
+usada por el admin) deben costar un número fijo de consultas sin importar
+cuántas filas se devuelven.
+Ejecutar: python manage.py verificar_consultas
+"""
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from personal.models import Personal
+from port_control.condicional import RespuestaCondicionalMixin
+from port_control.consultas import ContadorConsultas
+from port_control.paginacion import PaginacionCursor
+from movimientos.management.commands.benchmark_listados import RECURSOS
+
+
+class Command(BaseCommand):
+    help = 'Verifica que los listados, detalles y __str__ usen un número fijo de consultas SQL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recurso',
+            choices=sorted(RECURSOS),
+            action='append',
+            help='Recurso a verificar; repetir para varios (default: todos)',
+        )
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=50,
+            help='Filas por página en las verificaciones (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        # Usuario en memoria: la autenticación forzada no consulta la base
+        self.usuario = Personal(username='verificar_consultas', rol=Personal.Roles.ADMIN, is_superuser=True)
+        self.fabrica = APIRequestFactory()
+        self.filas = options['filas']
+
+        fallidas = 0
+        for nombre in options['recurso'] or sorted(RECURSOS):
+            viewset = RECURSOS[nombre]
+            if not viewset.queryset.exists():
+                self.stdout.write(self.style.WARNING(f'⚠️  {nombre}: no hay filas para verificar'))
+                continue
+
+            for descripcion, funcion, maximo in self._verificaciones(viewset):
+                with ContadorConsultas() as contador:
+                    funcion()
+                if contador.total <= maximo:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ {nombre}: {descripcion} en {contador.total} consultas'
+                    ))
+                else:
+                    fallidas += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'❌ {nombre}: {descripcion} en {contador.total} consultas (máximo {maximo})'
+                    ))
+                    if options['verbosity'] > 1:
+                        for sql in contador.consultas:
+                            self.stdout.write(f'   {sql}')
+
+        if fallidas:
+            raise CommandError(f'{fallidas} verificaciones superan su número de consultas')
+
+    def _verificaciones(self, viewset):
+        """Verificaciones (descripción, función, máximo de consultas) del ViewSet."""
+        # Paginación numerada: COUNT(*) + página. Por cursor: solo la página.
+        maximo_lista = 1 if viewset.pagination_class is PaginacionCursor else 2
+        maximo_detalle = 1
+        # Las peticiones condicionales calculan antes MAX(fecha_actualizacion) y COUNT(*)
+        if issubclass(viewset, RespuestaCondicionalMixin):
+            maximo_lista += 1
+            maximo_detalle += 1
+        pk = viewset.queryset.values_list('pk', flat=True).first()
+        params = {'page_size': self.filas}
+
+        yield 'listado', lambda: self._get(viewset, 'list', params), maximo_lista
+        yield 'detalle', lambda: self._get(viewset, 'retrieve', {}, pk=pk), maximo_detalle
+
+        expandibles = getattr(viewset.serializer_class, 'campos_expandibles', {})
+        if expandibles:
+            expand = {'expand': ','.join(expandibles)}
+            yield 'listado expandido', lambda: self._get(viewset, 'list', {**params, **expand}), maximo_lista
+            yield 'detalle expandido', lambda: self._get(viewset, 'retrieve', expand, pk=pk), maximo_detalle
+
+        yield '__str__', lambda: [str(obj) for obj in viewset.queryset.all()[:self.filas]], 1
+
+    def _get(self, viewset, accion, params, **kwargs):
+        request = self.fabrica.get('/', params)
+        force_authenticate(request, user=self.usuario)
+        response = viewset.as_view({'get': accion})(request, **kwargs)
+        # Las páginas servidas desde la caché de respuestas ya vienen renderizadas
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            raise CommandError(f'{viewset.__name__}.{accion} respondió {response.status_code}')
+        return response
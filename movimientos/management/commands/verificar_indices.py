@@ -0,0 +1,120 @@
+"""
+Comando para verificar con EXPLAIN que las consultas habituales de los listados
+usan índices: orden por defecto, cada campo de ordenamiento, cada filtro y cada
+campo de búsqueda declarados en los ViewSets, y la búsqueda de texto completo.
+Ejecutar: python manage.py verificar_indices
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from port_control.busqueda import BusquedaTextoCompleto, construir_consulta
+from port_control.paginacion import PaginacionCursor
+from port_control.serializacion import SerializadorValores
+from movimientos.management.commands.benchmark_listados import RECURSOS
+import re
+import uuid
+
+
+_INDICE = re.compile(r'Index (?:Only )?Scan(?: Backward)? using (\w+)|Bitmap Index Scan on (\w+)')
+_ORDENAMIENTO = re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b', re.MULTILINE)
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta EXPLAIN sobre las consultas de filtros, búsqueda y orden de los listados '
+        'y falla si alguna no usa un índice (requiere PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recurso',
+            choices=sorted(RECURSOS),
+            action='append',
+            help='Recurso a verificar; repetir para varios (default: todos)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('La verificación de índices requiere PostgreSQL')
+
+        fallidas = 0
+        for nombre in options['recurso'] or sorted(RECURSOS):
+            for descripcion, queryset in self._consultas(RECURSOS[nombre]):
+                plan = self._plan(queryset)
+                if self._usa_indice(plan, ordenada=queryset.ordered):
+                    self.stdout.write(self.style.SUCCESS(f'✅ {nombre}: {descripcion}'))
+                else:
+                    fallidas += 1
+                    self.stdout.write(self.style.ERROR(f'❌ {nombre}: {descripcion} no usa índice'))
+                if options['verbosity'] > 1:
+                    self.stdout.write(plan)
+
+        if fallidas:
+            raise CommandError(f'{fallidas} consultas no usan índice')
+
+    def _consultas(self, viewset):
+        """Consultas (descripción, queryset) que genera el listado del ViewSet."""
+        modelo = viewset.queryset.model
+        base = viewset.queryset.all()
+        # El listado rápido lee solo las columnas del serializer, sin JOIN
+        compilado = SerializadorValores.compilar(viewset.serializer_class) if getattr(viewset, 'listado_rapido', False) else None
+        if compilado is not None:
+            base = compilado.consulta(base)
+        orden = list(viewset.ordering)
+        # La paginación por cursor desempata por id en la dirección del primer campo
+        if viewset.pagination_class is PaginacionCursor:
+            orden.append('-id' if orden[0].startswith('-') else 'id')
+        limite = PaginacionCursor.page_size
+
+        yield f'orden {",".join(orden)}', base.order_by(*orden)[:limite]
+
+        for campo in viewset.ordering_fields:
+            yield f'orden {campo}', base.order_by(campo)[:limite]
+
+        for campo in viewset.filterset_fields:
+            valor = self._muestra(modelo._meta.get_field(campo))
+            yield f'filtro {campo}', base.filter(**{campo: valor}).order_by(*orden)[:limite]
+
+        # SearchFilter combina con OR un icontains por campo; cada uno debe usar su índice.
+        # Los campos de modelos relacionados se verifican en su propio recurso.
+        for campo in viewset.search_fields:
+            if '__' not in campo:
+                yield f'búsqueda {campo}', base.filter(**{f'{campo}__icontains': 'abc'})[:limite]
+
+        if BusquedaTextoCompleto in viewset.filter_backends:
+            consulta = construir_consulta('abc')
+            yield 'búsqueda de texto completo', base.filter(busqueda=consulta)[:limite]
+
+    @staticmethod
+    def _muestra(campo):
+        """Valor de ejemplo para filtrar por el campo."""
+        tipo = campo.get_internal_type()
+        if tipo == 'ForeignKey':
+            return uuid.uuid4()
+        if tipo == 'DateField':
+            return timezone.localdate()
+        if tipo == 'DateTimeField':
+            return timezone.now()
+        if tipo == 'BooleanField':
+            return True
+        return 'abc'
+
+    @staticmethod
+    def _plan(queryset):
+        # Con tablas pequeñas el planificador prefiere recorridos secuenciales;
+        # se desactivan para comprobar que existe un índice utilizable.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+
+    @staticmethod
+    def _usa_indice(plan, ordenada):
+        """
+        La consulta usa un índice distinto de la clave primaria (recorrerla
+        entera también evita el seq scan) y, si está ordenada, el índice ya
+        entrega las filas en orden, sin un nodo Sort.
+        """
+        indices = [a or b for a, b in _INDICE.findall(plan)]
+        if not any(not nombre.endswith('_pkey') for nombre in indices):
+            return False
+        return not (ordenada and _ORDENAMIENTO.search(plan))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("movimientos", "0002_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=models.Index(
+                fields=["fecha_hora", "id"], name="movimientos_fecha_id_idx"
+            ),
+        ),
+    ]
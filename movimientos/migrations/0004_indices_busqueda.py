@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("contenedores", "0002_indices_busqueda"),
+        ("movimientos", "0003_movimiento_fecha_id_idx"),
+        ("zonas_puerto", "0003_indices_busqueda"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=models.Index(fields=["contenedor", "fecha_hora", "id"], name="movim_contenedor_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=models.Index(fields=["tipo_movimiento", "fecha_hora", "id"], name="movim_tipo_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=models.Index(fields=["zona_origen", "fecha_hora", "id"], name="movim_origen_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=models.Index(fields=["zona_destino", "fecha_hora", "id"], name="movim_destino_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=models.Index(fields=["operador", "fecha_hora", "id"], name="movim_operador_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="movimiento",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("tipo_movimiento"), name="gin_trgm_ops"), name="movim_tipo_trgm"),
+        ),
+    ]
@@ -1,9 +1,23 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 from contenedores.models import Contenedor
 from zonas_puerto.models import ZonaPuerto
 from personal.models import Personal
 
+class MovimientoQuerySet(models.QuerySet):
+    def con_relaciones(self):
+        """
+        Carga en la misma consulta el contenedor, las zonas y el operador, que usan __str__,
+        el admin y las representaciones expandidas. Omite los vectores de búsqueda.
+        """
+        return self.select_related(
+            'contenedor', 'zona_origen', 'zona_destino', 'operador'
+        ).defer('busqueda', 'contenedor__busqueda')
+
+
 class Movimiento(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     contenedor = models.ForeignKey(Contenedor, on_delete=models.CASCADE, related_name='movimientos')
@@ -12,9 +26,31 @@ class Movimiento(models.Model):
     zona_destino = models.ForeignKey(ZonaPuerto, on_delete=models.SET_NULL, null=True, blank=True, related_name='movimientos_destino')
     fecha_hora = models.DateTimeField()
     operador = models.ForeignKey(Personal, on_delete=models.SET_NULL, null=True, related_name='movimientos')
+    # Vector de búsqueda de texto completo, mantenido por un trigger (migración 0005)
+    busqueda = SearchVectorField(null=True, editable=False)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = MovimientoQuerySet.as_manager()
 
     class Meta:
         db_table = "movimientos"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='movim_actualizacion_idx'),
+            # Clave de la paginación por cursor (fecha_hora, id)
+            models.Index(fields=['fecha_hora', 'id'], name='movimientos_fecha_id_idx'),
+            # Filtros combinados con la clave de paginación
+            models.Index(fields=['contenedor', 'fecha_hora', 'id'], name='movim_contenedor_fecha_idx'),
+            models.Index(fields=['tipo_movimiento', 'fecha_hora', 'id'], name='movim_tipo_fecha_idx'),
+            models.Index(fields=['zona_origen', 'fecha_hora', 'id'], name='movim_origen_fecha_idx'),
+            models.Index(fields=['zona_destino', 'fecha_hora', 'id'], name='movim_destino_fecha_idx'),
+            models.Index(fields=['operador', 'fecha_hora', 'id'], name='movim_operador_fecha_idx'),
+            # Búsqueda de texto completo
+            GinIndex(fields=['busqueda'], name='movim_busqueda_gin'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('tipo_movimiento'), name='gin_trgm_ops'), name='movim_tipo_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.tipo_movimiento} - {self.contenedor.codigo_contenedor}"
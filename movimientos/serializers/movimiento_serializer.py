@@ -1,7 +1,18 @@
 from rest_framework import serializers
+from contenedores.serializers import ContenedorSerializer
 from movimientos.models import Movimiento
+from personal.serializers import PersonalMinimalSerializer
+from port_control.expansion import ExpandibleMixin
+from zonas_puerto.serializers import ZonaPuertoSerializer
+
+class MovimientoSerializer(ExpandibleMixin, serializers.ModelSerializer):
+    campos_expandibles = {
+        'contenedor': ContenedorSerializer,
+        'zona_origen': ZonaPuertoSerializer,
+        'zona_destino': ZonaPuertoSerializer,
+        'operador': PersonalMinimalSerializer,
+    }
 
-class MovimientoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Movimiento
-        fields = '__all__'
+        exclude = ['busqueda']
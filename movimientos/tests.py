@@ -1,3 +1,338 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+from rest_framework import serializers
+from rest_framework.filters import OrderingFilter
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from autorizaciones.models import Autorizacion
+from barcos.models import Barco
+from contenedores.models import Contenedor
+from inspecciones.models import Inspeccion
+from movimientos.management.commands import verificar_consultas, verificar_indices
+from movimientos.management.commands.benchmark_listados import RECURSOS
+from movimientos.models import Movimiento
+from personal.models import Personal
+from port_control.busqueda import construir_consulta
+from port_control.paginacion import PaginacionCursor
+from port_control.renderers import ORJSONRenderer
+from port_control.serializacion import ListadoRapidoMixin, SerializadorValores
+from tripulacion.models import Tripulante
+from zonas_puerto.models import ZonaPuerto
+
+
+class PaginacionCursorTests(TestCase):
+    """Paginación por clave (fecha_hora, id) del listado de movimientos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Personal.objects.create_user('inspector', password='x', rol=Personal.Roles.INSPECTOR)
+        barco = Barco.objects.create(nombre='Andes', bandera='CL', tipo='Portacontenedores', empresa_operadora='CSAV')
+        contenedor = Contenedor.objects.create(
+            barco=barco, codigo_contenedor='MSCU0000001', tipo='Dry', peso=1000, estado='en_patio'
+        )
+        inicio = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        # Tres fechas repetidas: el id desempata
+        Movimiento.objects.bulk_create([
+            Movimiento(
+                contenedor=contenedor,
+                tipo_movimiento='ingreso',
+                fecha_hora=inicio + timedelta(hours=indice % 3),
+            )
+            for indice in range(7)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def _recorrer(self, url):
+        """Sigue los enlaces next y retorna (ids en orden, URLs de las páginas)."""
+        ids, paginas = [], []
+        while url:
+            paginas.append(url)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(fila['id'] for fila in response.json()['results'])
+            url = response.json()['next']
+        return ids, paginas
+
+    def _esperados(self, *orden):
+        return [str(pk) for pk in Movimiento.objects.order_by(*orden).values_list('id', flat=True)]
+
+    def test_recorrido_ascendente_con_empates(self):
+        ids, paginas = self._recorrer('/api/movimientos/?ordering=fecha_hora&page_size=2')
+        self.assertEqual(ids, self._esperados('fecha_hora', 'id'))
+        self.assertEqual(len(paginas), 4)
+
+    def test_recorrido_descendente(self):
+        # Orden por defecto del ViewSet: -fecha_hora
+        ids, _ = self._recorrer('/api/movimientos/?page_size=3')
+        self.assertEqual(ids, self._esperados('-fecha_hora', '-id'))
+
+    def test_recorrido_con_instancias(self):
+        # Con ?expand= el listado pagina instancias en lugar de tuplas de values_list()
+        ids, _ = self._recorrer('/api/movimientos/?ordering=fecha_hora&page_size=2&expand=contenedor')
+        self.assertEqual(ids, self._esperados('fecha_hora', 'id'))
+
+    def test_pagina_anterior(self):
+        primera = self.client.get('/api/movimientos/?ordering=fecha_hora&page_size=2').json()
+        segunda = self.client.get(primera['next']).json()
+        tercera = self.client.get(segunda['next']).json()
+        self.assertIsNone(primera['previous'])
+        self.assertEqual(self.client.get(tercera['previous']).json()['results'], segunda['results'])
+        self.assertEqual(self.client.get(segunda['previous']).json()['results'], primera['results'])
+
+    def test_cursor_invalido(self):
+        adulterado = base64.urlsafe_b64encode(b'no-es-fecha|no-es-uuid|0').decode()
+        for cursor in ('%%%', 'YWJj', adulterado):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(f'/api/movimientos/?cursor={cursor}')
+                self.assertEqual(response.status_code, 404)
+
+    def test_validador_de_la_pagina(self):
+        # El ETag se calcula con las filas de la página (LIMIT), sin COUNT(*) sobre la tabla
+        segunda = self.client.get('/api/movimientos/?page_size=2').json()['next']
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(segunda)
+        self.assertEqual(len(consultas), 2)
+        for consulta in consultas:
+            self.assertIn('LIMIT 3', consulta['sql'])
+            self.assertNotIn('COUNT(', consulta['sql'].upper())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(segunda, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_etag_cambia_solo_con_la_pagina(self):
+        ruta = '/api/movimientos/?page_size=2'
+        etag = self.client.get(ruta)['ETag']
+        ids = self._esperados('-fecha_hora', '-id')
+        # Fuera de la página (y de la fila extra que indica si hay otra)
+        Movimiento.objects.filter(pk=ids[-1]).delete()
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Movimiento.objects.filter(pk=ids[1]).delete()
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(ruta)['ETag']
+        Movimiento.objects.get(pk=ids[0]).save()
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def _paginar(self, queryset, ruta, ordering=('fecha_hora',)):
+        view = SimpleNamespace(filter_backends=[OrderingFilter], ordering=list(ordering), ordering_fields=['fecha_hora'])
+        request = Request(APIRequestFactory().get(ruta))
+        paginador = PaginacionCursor()
+        return paginador, paginador.paginate_queryset(queryset, request, view)
+
+    def test_tuplas_de_values_list(self):
+        queryset = Movimiento.objects.values_list('tipo_movimiento', 'id', 'fecha_hora')
+        paginador, pagina = self._paginar(queryset, '/?page_size=4')
+        self.assertEqual([fila[1] for fila in pagina], [fila[1] for fila in queryset.order_by('fecha_hora', 'id')[:4]])
+        # La posición se lee de las columnas por nombre, no por posición fija
+        self.assertEqual(paginador.siguiente, (pagina[-1][2], pagina[-1][1]))
+
+        cursor = paginador.codificar_cursor(paginador.siguiente, False)
+        _, resto = self._paginar(queryset, f'/?page_size=4&cursor={cursor}')
+        self.assertEqual([fila[1] for fila in pagina + resto], list(queryset.order_by('fecha_hora', 'id').values_list('id', flat=True)))
+
+    def test_cursor_adulterado_directo(self):
+        cursor = base64.urlsafe_b64encode(b'2025-01-01T00:00:00+00:00|0').decode()
+        with self.assertRaises(NotFound):
+            self._paginar(Movimiento.objects.all(), f'/?cursor={cursor}')
+
+    def test_orden_por_relacion(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self._paginar(Movimiento.objects.all(), '/', ordering=('contenedor__codigo_contenedor',))
+
+
+class ConsultasListadosTests(TestCase):
+    """
+    Listados, detalles (con y sin ?expand=) y changelists del admin cuestan un
+    número fijo de consultas: con_relaciones(), list_select_related y ExpandirMixin.
+    """
+    filas = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Personal.objects.create_superuser('admin', password='x', rol=Personal.Roles.ADMIN)
+        cls.agregar(0)
+
+    @classmethod
+    def agregar(cls, inicio):
+        """Crea `filas` registros de cada recurso, cada uno con sus propias relaciones."""
+        fecha = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for indice in range(inicio, inicio + cls.filas):
+            operador = Personal.objects.create_user(f'operador{indice}', password='x', rol=Personal.Roles.OPERADOR_TERMINAL)
+            barco = Barco.objects.create(nombre=f'Barco {indice}', bandera='CL', tipo='Granelero', empresa_operadora='CSAV')
+            # bulk_create no emite post_save: evita sincronizar geocercas con MongoDB
+            origen, destino = ZonaPuerto.objects.bulk_create([
+                ZonaPuerto(nombre=f'Patio {indice}', tipo='patio'),
+                ZonaPuerto(nombre=f'Muelle {indice}', tipo='muelle'),
+            ])
+            contenedor = Contenedor.objects.create(
+                barco=barco, codigo_contenedor=f'MSCU{indice:07d}', tipo='Dry', peso=1000, estado='en_patio'
+            )
+            Tripulante.objects.create(barco=barco, nombre=f'Tripulante {indice}', rol='cocinero', nacionalidad='CL', identificacion=str(indice))
+            Movimiento.objects.create(
+                contenedor=contenedor, tipo_movimiento='ingreso', zona_origen=origen, zona_destino=destino,
+                operador=operador, fecha_hora=fecha + timedelta(hours=indice),
+            )
+            Inspeccion.objects.create(contenedor=contenedor, inspector=operador, fecha=fecha.date(), resultado='aprobado')
+            Autorizacion.objects.create(barco=barco, autorizado_por=operador, fecha=fecha.date(), tipo_autorizacion='entrada', estado='aprobada')
+
+    def setUp(self):
+        # Una página servida desde la caché de respuestas no consulta la base
+        cache.clear()
+        self.comando = verificar_consultas.Command()
+        self.comando.usuario = self.admin
+        self.comando.fabrica = APIRequestFactory()
+        self.comando.filas = 50
+
+    def test_listados_y_detalles(self):
+        for nombre, viewset in RECURSOS.items():
+            for descripcion, funcion, maximo in self.comando._verificaciones(viewset):
+                with self.subTest(recurso=nombre, verificacion=descripcion):
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as consultas:
+                        funcion()
+                    self.assertLessEqual(len(consultas), maximo, [consulta['sql'] for consulta in consultas])
+
+    def test_no_crece_con_las_filas(self):
+        def contar():
+            totales = {}
+            for nombre, viewset in RECURSOS.items():
+                for descripcion, funcion, _ in self.comando._verificaciones(viewset):
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as consultas:
+                        funcion()
+                    totales[nombre, descripcion] = len(consultas)
+            return totales
+
+        antes = contar()
+        self.agregar(self.filas)
+        self.assertEqual(contar(), antes)
+
+    def test_changelist_del_admin(self):
+        self.client.force_login(self.admin)
+        urls = [f'/admin/{modelo._meta.app_label}/{modelo._meta.model_name}/' for modelo in
+                (Autorizacion, Contenedor, Inspeccion, Movimiento, Tripulante)]
+
+        def contar(url):
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(consultas)
+
+        antes = {url: contar(url) for url in urls}
+        self.agregar(self.filas)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(contar(url), antes[url])
+
+
+class PersonalValoresSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Personal
+        fields = ['id', 'username', 'rol', 'turno', 'is_active', 'date_joined', 'last_login']
+
+
+class ListadoRapidoTests(TestCase):
+    """La salida de SerializadorValores es la misma que la del ModelSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        ConsultasListadosTests.agregar(0)
+        ZonaPuerto.objects.update(geometria={'type': 'Polygon', 'coordinates': [[[-70, -33], [-70.1, -33], [-70, -33.1], [-70, -33]]]})
+        cls.admin = Personal.objects.create_superuser('admin', password='x', rol=Personal.Roles.ADMIN)
+
+    def _comparar(self, serializer_class, queryset):
+        compilado = SerializadorValores.compilar(serializer_class)
+        self.assertIsNotNone(compilado)
+        queryset = queryset.order_by('pk')
+        drf = json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data))
+        rapido = json.loads(ORJSONRenderer().render(compilado.serializar(compilado.consulta(queryset))))
+        self.assertTrue(drf)
+        self.assertEqual(rapido, drf)
+
+    def test_serializers_de_los_recursos(self):
+        # FK como id, UUID, fechas, fechas con hora, JSON y valores nulos
+        for nombre, viewset in RECURSOS.items():
+            with self.subTest(recurso=nombre):
+                self._comparar(viewset.serializer_class, viewset.queryset.all())
+
+    def test_choices_y_nulos(self):
+        self._comparar(PersonalValoresSerializer, Personal.objects.all())
+
+    def test_respuesta_del_listado(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        for nombre, viewset in RECURSOS.items():
+            if not getattr(viewset, 'listado_rapido', False):
+                continue
+            with self.subTest(recurso=nombre):
+                ruta = f'/api/{nombre}/?page_size=50'
+                rapido = client.get(ruta)
+                with mock.patch.object(viewset, 'listado_rapido', False):
+                    drf = client.get(ruta)
+                self.assertEqual(rapido.json(), drf.json())
+
+    def test_opcional_y_solo_en_el_listado(self):
+        self.assertFalse(ListadoRapidoMixin.listado_rapido)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        contenedor = Contenedor.objects.first()
+        # El detalle y la API navegable siguen con los renderers de DRF
+        response = client.get(f'/api/contenedores/{contenedor.pk}/')
+        self.assertIsInstance(response.accepted_renderer, JSONRenderer)
+        self.assertNotIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertIsInstance(client.get('/api/contenedores/').accepted_renderer, ORJSONRenderer)
+        self.assertEqual(client.get('/api/contenedores/', HTTP_ACCEPT='text/html').status_code, 200)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN de índices de PostgreSQL')
+class IndicesListadosTests(TestCase):
+    """Los listados filtrados y ordenados usan los índices de los modelos (mismo criterio que verificar_indices)."""
+
+    def setUp(self):
+        self.comando = verificar_indices.Command()
+
+    def _indices(self, queryset):
+        plan = self.comando._plan(queryset)
+        return plan, [a or b for a, b in verificar_indices._INDICE.findall(plan)]
+
+    def test_consultas_de_los_listados(self):
+        for nombre, viewset in RECURSOS.items():
+            for descripcion, queryset in self.comando._consultas(viewset):
+                with self.subTest(recurso=nombre, consulta=descripcion):
+                    plan = self.comando._plan(queryset)
+                    self.assertTrue(self.comando._usa_indice(plan, ordenada=queryset.ordered), plan)
 
-# Create your tests here.
+    def test_indices_esperados(self):
+        orden = ('-fecha_hora', '-id')
+        casos = [
+            (Movimiento.objects.order_by(*orden), 'movimientos_fecha_id_idx'),
+            (Movimiento.objects.filter(contenedor=uuid.uuid4()).order_by(*orden), 'movim_contenedor_fecha_idx'),
+            (Movimiento.objects.filter(tipo_movimiento='ingreso').order_by(*orden), 'movim_tipo_fecha_idx'),
+            (Movimiento.objects.filter(zona_destino=uuid.uuid4()).order_by(*orden), 'movim_destino_fecha_idx'),
+            (Movimiento.objects.filter(operador=uuid.uuid4()).order_by(*orden), 'movim_operador_fecha_idx'),
+            (Movimiento.objects.filter(busqueda=construir_consulta('MSCU')), 'movim_busqueda_gin'),
+            (Contenedor.objects.filter(barco=uuid.uuid4()).order_by('codigo_contenedor'), 'contened_barco_codigo_idx'),
+            (Contenedor.objects.filter(estado='en_patio').order_by('codigo_contenedor'), 'contened_estado_codigo_idx'),
+            (Contenedor.objects.order_by('peso'), 'contened_peso_idx'),
+            (Contenedor.objects.filter(busqueda=construir_consulta('MSCU')), 'contened_busqueda_gin'),
+        ]
+        for queryset, indice in casos:
+            with self.subTest(indice=indice):
+                plan, indices = self._indices(queryset[:PaginacionCursor.page_size])
+                self.assertIn(indice, indices, plan)
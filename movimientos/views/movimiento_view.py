@@ -1,26 +1,41 @@
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from movimientos.models import Movimiento
 from movimientos.serializers import MovimientoSerializer
+from port_control.busqueda import BusquedaTextoCompleto
+from port_control.condicional import RespuestaCondicionalMixin
+from port_control.expansion import ExpandirMixin
+from port_control.exportacion import ExportacionMixin
+from port_control.masivo import OperacionesMasivasMixin
+from port_control.paginacion import PaginacionCursor
 from port_control.permissions import MovimientoPermission
+from port_control.serializacion import ListadoRapidoMixin
 
 
-class MovimientoViewSet(viewsets.ModelViewSet):
+class MovimientoViewSet(OperacionesMasivasMixin, RespuestaCondicionalMixin, ExportacionMixin, ExpandirMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Movimientos de Contenedores
     
     Permisos:
     - CRUD: ADMIN, CAPITAN_PUERTO, OPERADOR_TERMINAL
     - Leer: INSPECTOR, AGENTE_NAVIERO, VIGILANTE
+    
+    Operaciones masivas en bulk/: POST (lista), PATCH (lista con id), DELETE ({"ids": [...]})
+    Expandibles con ?expand=: contenedor, zona_origen, zona_destino, operador
     """
-    queryset = Movimiento.objects.all()
+    queryset = Movimiento.objects.con_relaciones()
     serializer_class = MovimientoSerializer
+    # Listado desde values_list() y orjson (ver benchmark_listados)
+    listado_rapido = True
     permission_classes = [MovimientoPermission]
+    pagination_class = PaginacionCursor
     
     # Filtros y búsqueda
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BusquedaTextoCompleto]
     filterset_fields = ['contenedor', 'tipo_movimiento', 'zona_origen', 'zona_destino', 'operador']
     search_fields = ['tipo_movimiento', 'contenedor__codigo_contenedor']
+    # Además del texto completo, el código se busca como subcadena (icontains)
+    campos_subcadena = ['contenedor__codigo_contenedor']
     ordering_fields = ['fecha_hora', 'tipo_movimiento']
     ordering = ['-fecha_hora']
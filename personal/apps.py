@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class PersonalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "personal"
+
+    def ready(self):
+        """Descarta el estado en caché de los tokens al modificar o eliminar Personal."""
+        from django.db.models.signals import post_save, post_delete
+        from personal.models import Personal
+        from port_control.autenticacion import invalidar_estado_personal
+
+        post_save.connect(invalidar_estado_personal, sender=Personal, dispatch_uid='personal_invalidar_estado_jwt')
+        post_delete.connect(invalidar_estado_personal, sender=Personal, dispatch_uid='personal_invalidar_estado_jwt')
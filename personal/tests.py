@@ -1,3 +1,104 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 
-# Create your tests here.
+from personal.models import Personal
+from port_control.autenticacion import JWTSinEstadoAuthentication, TokenConRol, UsuarioToken
+
+
+@override_settings(JWT_ESTADO_TTL=300)
+class JWTSinEstadoTests(TestCase):
+    """
+    Autenticación con los claims del token: el estado en caché se descarta al
+    guardar o eliminar Personal, así que el cambio vale antes de JWT_ESTADO_TTL.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.usuario = Personal.objects.create_user('capitan', password='x', rol=Personal.Roles.CAPITAN_PUERTO)
+        self.token = TokenConRol.for_user(self.usuario).access_token
+
+    def _autenticar(self, token=None):
+        request = APIRequestFactory().get('/api/barcos/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+        return JWTSinEstadoAuthentication().authenticate(request)[0]
+
+    def test_usuario_desde_los_claims(self):
+        usuario = self._autenticar()
+        self.assertIsInstance(usuario, UsuarioToken)
+        self.assertEqual((usuario.rol, usuario.is_capitan_puerto, usuario.is_admin), (Personal.Roles.CAPITAN_PUERTO, True, False))
+        # Con el estado en caché las peticiones siguientes no leen Personal
+        with self.assertNumQueries(0):
+            self._autenticar()
+
+    def test_usuario_desactivado(self):
+        self._autenticar()
+        self.usuario.is_active = False
+        self.usuario.save()
+        with self.assertRaises(AuthenticationFailed) as contexto:
+            self._autenticar()
+        self.assertEqual(contexto.exception.detail['code'], 'user_inactive')
+
+    def test_usuario_eliminado(self):
+        self._autenticar()
+        self.usuario.delete()
+        with self.assertRaises(AuthenticationFailed) as contexto:
+            self._autenticar()
+        self.assertEqual(contexto.exception.detail['code'], 'user_not_found')
+
+    def test_cambio_de_rol(self):
+        refresh = TokenConRol.for_user(self.usuario)
+        self._autenticar()
+        self.usuario.rol = Personal.Roles.INSPECTOR
+        self.usuario.save()
+        with self.assertRaises(InvalidToken):
+            self._autenticar()
+        # El token renovado lleva el rol nuevo
+        usuario = self._autenticar(TokenConRol(str(refresh)).access_token)
+        self.assertEqual(usuario.rol, Personal.Roles.INSPECTOR)
+
+    def test_cambio_sin_senales_espera_el_ttl(self):
+        self._autenticar()
+        # update() no emite post_save: el estado en caché sigue vigente hasta su TTL
+        Personal.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self._autenticar()
+        caches['default'].clear()
+        with self.assertRaises(AuthenticationFailed):
+            self._autenticar()
+
+    def test_token_sin_claims_de_rol(self):
+        token = TokenConRol.for_user(self.usuario).access_token
+        del token['rol']
+        usuario = self._autenticar(token)
+        self.assertIsInstance(usuario, Personal)
+        self.assertEqual(usuario.pk, self.usuario.pk)
+
+
+class JWTConEstadoTests(TestCase):
+    """Con JWT_SIN_ESTADO=False (default) la API autentica con JWTAuthentication."""
+
+    def setUp(self):
+        self.usuario = Personal.objects.create_user('capitan', password='x', rol=Personal.Roles.CAPITAN_PUERTO)
+        self.client = APIClient()
+
+    def _login(self):
+        response = self.client.post('/api/auth/login/', {'username': 'capitan', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_login_y_peticion(self):
+        tokens = self._login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        self.assertEqual(self.client.get('/api/barcos/').status_code, 200)
+
+        # Cada petición lee Personal: la desactivación vale de inmediato
+        Personal.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/barcos/').status_code, 401)
+
+    def test_refresh_actualiza_los_claims(self):
+        tokens = self._login()
+        self.usuario.rol = Personal.Roles.INSPECTOR
+        self.usuario.save()
+        response = self.client.post('/api/auth/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TokenConRol.access_token_class(response.json()['access'])['rol'], Personal.Roles.INSPECTOR)
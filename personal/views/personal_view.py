@@ -33,13 +33,19 @@ class PersonalViewSet(viewsets.ModelViewSet):
             return PersonalCreateSerializer
         return PersonalSerializer
     
+    def _personal_actual(self, request):
+        """Personal autenticado (con JWT_SIN_ESTADO, request.user se arma desde el token)"""
+        if isinstance(request.user, Personal):
+            return request.user
+        return request.user.get_personal()
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def me(self, request):
         """
         Endpoint para obtener el perfil del usuario autenticado
         GET /api/personal/me/
         """
-        serializer = PersonalSerializer(request.user)
+        serializer = PersonalSerializer(self._personal_actual(request))
         return Response(serializer.data)
     
     @action(detail=False, methods=['patch'], permission_classes=[IsAuthenticated])
@@ -48,7 +54,7 @@ class PersonalViewSet(viewsets.ModelViewSet):
         Endpoint para actualizar el perfil propio
         PATCH /api/personal/update_profile/
         """
-        user = request.user
+        user = self._personal_actual(request)
         # Solo permitir actualizar ciertos campos
         allowed_fields = ['first_name', 'last_name', 'email', 'telefono']
         data = {k: v for k, v in request.data.items() if k in allowed_fields}
@@ -0,0 +1,134 @@
+"""
+Tokens JWT con el rol del usuario y autenticación sin consultar Personal.
+
+Los tokens emitidos por /api/auth/login/ y /api/auth/refresh/ incluyen los
+claims `rol`, `is_superuser` e `is_active`. Con JWT_SIN_ESTADO=True la API
+autentica con `JWTSinEstadoAuthentication`, que arma el usuario desde esos
+claims en lugar de leer la fila de Personal en cada petición.
+
+Para revocar tokens se guarda en caché, durante JWT_ESTADO_TTL segundos, el
+estado actual (activo, rol, superusuario) de cada usuario: un token deja de
+valer si el usuario fue desactivado o eliminado, o si sus claims ya no
+coinciden con su estado. Guardar o eliminar un Personal borra su entrada, así
+que con una caché compartida (Redis, Memcached) el cambio es inmediato; con
+la caché en memoria por proceso tarda como máximo JWT_ESTADO_TTL segundos.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from personal.models import Personal
+
+
+CLAIMS = ('rol', 'is_superuser', 'is_active')
+
+# Valor guardado en caché para un usuario que no existe
+_ELIMINADO = 'eliminado'
+
+
+def _clave_estado(user_id):
+    return f'jwt:estado:{user_id}'
+
+
+def estado_personal(user_id):
+    """
+    Estado actual {rol, is_superuser, is_active} del usuario, o None si no
+    existe. Se lee de la base a lo sumo una vez cada JWT_ESTADO_TTL segundos.
+    """
+    cache = caches[settings.JWT_ESTADO_CACHE_ALIAS]
+    clave = _clave_estado(user_id)
+    estado = cache.get(clave)
+    if estado is None:
+        estado = Personal.objects.filter(pk=user_id).values(*CLAIMS).first() or _ELIMINADO
+        cache.set(clave, estado, settings.JWT_ESTADO_TTL)
+    return None if estado == _ELIMINADO else estado
+
+
+def invalidar_estado_personal(sender, instance, **kwargs):
+    """Receptor de post_save/post_delete de Personal: descarta su estado en caché."""
+    caches[settings.JWT_ESTADO_CACHE_ALIAS].delete(_clave_estado(instance.pk))
+
+
+class TokenConRol(RefreshToken):
+    """RefreshToken cuyo access token lleva el estado del usuario como claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        # Al renovar, los claims se actualizan con el estado actual del usuario
+        estado = estado_personal(self.payload.get(api_settings.USER_ID_CLAIM))
+        if estado is not None:
+            for claim in CLAIMS:
+                access[claim] = estado[claim]
+        return access
+
+
+class TokenConRolObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = TokenConRol
+
+
+class TokenConRolRefreshSerializer(TokenRefreshSerializer):
+    token_class = TokenConRol
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuario construido desde los claims del token. Expone las mismas
+    propiedades de rol que Personal (is_admin, is_capitan_puerto...), que son
+    las que usan las clases de port_control.permissions.
+    """
+
+    Roles = Personal.Roles
+
+    is_admin = Personal.is_admin
+    is_capitan_puerto = Personal.is_capitan_puerto
+    is_operador_terminal = Personal.is_operador_terminal
+    is_inspector = Personal.is_inspector
+    is_agente_naviero = Personal.is_agente_naviero
+    is_vigilante = Personal.is_vigilante
+
+    @property
+    def rol(self):
+        return self.token.get('rol')
+
+    @property
+    def is_active(self):
+        return self.token.get('is_active', False)
+
+    def get_personal(self):
+        """Fila de Personal del usuario, para las vistas que la necesitan."""
+        return Personal.objects.get(pk=self.pk)
+
+
+class JWTSinEstadoAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autentica con los claims del token y el estado en caché del usuario, sin
+    leer Personal. Los tokens emitidos antes de incluir el rol se autentican
+    como con JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in CLAIMS):
+            return JWTAuthentication.get_user(self, validated_token)
+
+        usuario = UsuarioToken(validated_token)
+        estado = estado_personal(usuario.pk)
+        if estado is None:
+            raise AuthenticationFailed('Usuario no encontrado', code='user_not_found')
+        if not estado['is_active']:
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+        if any(validated_token[claim] != estado[claim] for claim in CLAIMS):
+            raise InvalidToken('El rol del usuario cambió; renueva el token')
+        return usuario
@@ -0,0 +1,102 @@
+"""
+Búsqueda de texto completo de PostgreSQL para los listados de la API.
+
+`BusquedaTextoCompleto` reemplaza a SearchFilter: con `?search=` filtra por la
+columna `busqueda` (tsvector mantenido por un trigger y con índice GIN) en lugar
+de combinar ILIKE '%...%' sobre cada campo de `search_fields`.
+
+Las palabras se buscan completas o como prefijo, así que una subcadena del
+medio ('1234' en 'MSCU1234567') no coincide con el vector. Los campos de código
+que la API buscaba así se declaran en `campos_subcadena` del ViewSet y se
+siguen comparando con icontains (con índice de trigramas).
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from rest_framework.filters import SearchFilter
+
+
+CAMPO_VECTOR = 'busqueda'
+
+_PALABRA = re.compile(r'\w+')
+
+
+def construir_consulta(texto):
+    """
+    Consulta de texto completo para `texto`, o None si no tiene palabras.
+
+    Combina la sintaxis de buscadores web ("frase exacta", -excluir, or) con
+    el diccionario español, para las observaciones, y las palabras como
+    prefijos sin normalizar, para códigos y nombres parciales ('MSCU12').
+    """
+    if not _PALABRA.search(texto):
+        return None
+
+    consulta = SearchQuery(texto, config='spanish', search_type='websearch')
+
+    # Los términos excluidos (-palabra) y el operador 'or' no se usan como prefijos
+    palabras = [
+        palabra
+        for termino in texto.split()
+        if not termino.startswith('-') and termino.lower() != 'or'
+        for palabra in _PALABRA.findall(termino)
+    ]
+    if palabras:
+        prefijos = ' & '.join(f'{palabra}:*' for palabra in palabras)
+        consulta |= SearchQuery(prefijos, config='simple', search_type='raw')
+    return consulta
+
+
+class BusquedaTextoCompleto(SearchFilter):
+    """
+    Filtro de búsqueda sobre el vector de texto completo del modelo.
+
+    Va después de OrderingFilter en `filter_backends`: si el cliente no pide un
+    `?ordering=` explícito, los resultados se ordenan por relevancia (anotada
+    como `rango`) y luego por el orden por defecto del ViewSet. La paginación
+    por cursor conserva su propio orden.
+
+    Las filas que solo coinciden por `campos_subcadena` quedan con rango 0.
+    Para modelos sin columna `busqueda` se comporta como SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not self._tiene_vector(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+
+        texto = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not texto:
+            return queryset
+
+        consulta = construir_consulta(texto)
+        if consulta is None:
+            return super().filter_queryset(request, queryset, view)
+
+        condicion = Q(**{CAMPO_VECTOR: consulta})
+        for campo in getattr(view, 'campos_subcadena', []):
+            condicion |= Q(**{f'{campo}__icontains': texto})
+        queryset = queryset.filter(condicion)
+
+        if not request.query_params.get(self._parametro_orden(view)):
+            queryset = queryset.annotate(
+                rango=SearchRank(F(CAMPO_VECTOR), consulta)
+            ).order_by('-rango', *queryset.query.order_by)
+
+        return queryset
+
+    @staticmethod
+    def _tiene_vector(modelo):
+        try:
+            modelo._meta.get_field(CAMPO_VECTOR)
+            return True
+        except FieldDoesNotExist:
+            return False
+
+    @staticmethod
+    def _parametro_orden(view):
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'ordering_param'):
+                return backend.ordering_param
+        return 'ordering'
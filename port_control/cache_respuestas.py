@@ -0,0 +1,133 @@
+"""
+Caché de respuestas versionada para los listados de datos de referencia.
+
+`CacheListadoMixin` guarda el cuerpo JSON ya renderizado de cada página del
+listado bajo la clave (versión del modelo, parámetros de la consulta
+normalizados, rol del usuario). Las páginas en caché se sirven sin consultar
+la base de datos ni serializar.
+
+La versión de cada modelo es un contador en la caché que `post_save` y
+`post_delete` incrementan (ver `registrar_modelo`): invalidar es una sola
+operación y las claves de versiones anteriores expiran solas por TTL.
+Los aciertos y fallos de los listados de cada modelo se cuentan en la caché
+(`estadisticas()`, comando `estadisticas_cache`).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+
+from port_control.condicional import respuesta_no_modificada
+
+
+def _cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _clave_version(modelo):
+    return f'respuestas:version:{modelo._meta.label_lower}'
+
+
+def _clave_contador(modelo, tipo):
+    return f'respuestas:{tipo}:{modelo._meta.label_lower}'
+
+
+def _incrementar(clave):
+    """Incrementa un contador de la caché, creándolo si no existe (sin expiración)."""
+    cache = _cache()
+    try:
+        return cache.incr(clave)
+    except ValueError:
+        if cache.add(clave, 1, None):
+            return 1
+        return cache.incr(clave)
+
+
+def versiones(modelos):
+    """Versión actual de cada modelo (0 si todavía no cambió)."""
+    claves = [_clave_version(modelo) for modelo in modelos]
+    valores = _cache().get_many(claves)
+    return tuple(valores.get(clave, 0) for clave in claves)
+
+
+def invalidar_modelo(sender, **kwargs):
+    """Receptor de post_save/post_delete: nueva versión del modelo."""
+    _incrementar(_clave_version(sender))
+
+
+def registrar_modelo(modelo):
+    """Conecta las señales que versionan las respuestas en caché del modelo."""
+    uid = f'cache_respuestas_{modelo._meta.label_lower}'
+    post_save.connect(invalidar_modelo, sender=modelo, dispatch_uid=uid)
+    post_delete.connect(invalidar_modelo, sender=modelo, dispatch_uid=uid)
+
+
+def estadisticas(modelo):
+    """Retorna (aciertos, fallos) de los listados en caché del modelo."""
+    claves = [_clave_contador(modelo, 'aciertos'), _clave_contador(modelo, 'fallos')]
+    valores = _cache().get_many(claves)
+    return tuple(valores.get(clave, 0) for clave in claves)
+
+
+class CacheListadoMixin:
+    """
+    Mixin para ModelViewSet: cachea las respuestas JSON del listado.
+
+    `cache_modelos` son los modelos cuyos cambios invalidan el listado
+    (default: el del queryset); cada uno debe registrarse con
+    `registrar_modelo` en el `ready()` de su app. La respuesta lleva la
+    cabecera X-Cache (HIT o MISS). Se activa con API_CACHE_RESPUESTAS=True.
+
+    Va antes de RespuestaCondicionalMixin: la página en caché guarda su ETag,
+    así que también el 304 se responde sin consultar la base.
+    """
+
+    cache_modelos = None
+
+    def get_cache_modelos(self):
+        return self.cache_modelos or [self.get_queryset().model]
+
+    def get_clave_cache(self, request):
+        params = sorted(
+            (clave, sorted(request.query_params.getlist(clave)))
+            for clave in request.query_params
+        )
+        # El host forma parte de los enlaces next/previous de la página
+        resumen = hashlib.sha1(repr((request.get_host(), params)).encode()).hexdigest()
+        usuario = request.user
+        rol = 'ADMIN' if getattr(usuario, 'is_admin', False) else getattr(usuario, 'rol', '')
+        version = '.'.join(str(v) for v in versiones(self.get_cache_modelos()))
+        return f'respuestas:{self.basename}:{version}:{rol}:{resumen}'
+
+    def list(self, request, *args, **kwargs):
+        # Solo se cachea JSON (la API navegable se renderiza siempre)
+        if not settings.API_CACHE_RESPUESTAS or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        cache = _cache()
+        clave = self.get_clave_cache(request)
+        guardada = cache.get(clave)
+        if guardada is not None:
+            _incrementar(_clave_contador(self.queryset.model, 'aciertos'))
+            cuerpo, content_type, etag = guardada
+            response = respuesta_no_modificada(request, etag) if etag else None
+            if response is None:
+                response = HttpResponse(cuerpo, content_type=content_type)
+                if etag:
+                    response['ETag'] = etag
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _incrementar(_clave_contador(self.queryset.model, 'fallos'))
+        response = super().list(request, *args, **kwargs)
+        response['X-Cache'] = 'MISS'
+        if response.status_code == 200:
+            # El cuerpo se guarda una vez renderizado por finalize_response
+            response.add_post_render_callback(
+                lambda r: cache.set(
+                    clave, (r.content, r['Content-Type'], r.get('ETag')), settings.API_CACHE_TTL
+                )
+            )
+        return response
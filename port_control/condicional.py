@@ -0,0 +1,132 @@
+"""
+Peticiones condicionales (If-None-Match / If-Modified-Since) para los ViewSets.
+
+`RespuestaCondicionalMixin` calcula los validadores de un listado o detalle con
+una consulta de agregación (MAX(fecha_actualizacion) y COUNT(*)) sobre el
+queryset filtrado, antes de leer y serializar las filas. Si el cliente ya tiene
+la versión vigente responde 304 sin cuerpo.
+
+Con paginación por cursor el validador se calcula solo sobre las filas de la
+página pedida (id y fecha_actualizacion de cada una), leídas con el mismo
+índice que la página: el costo no depende del tamaño de la tabla.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+CAMPO_ACTUALIZACION = 'fecha_actualizacion'
+
+
+def _tiene_campo(modelo):
+    return any(campo.name == CAMPO_ACTUALIZACION for campo in modelo._meta.concrete_fields)
+
+
+def respuesta_no_modificada(request, etag, ultima_modificacion=None):
+    """
+    Respuesta 304 si los validadores del cliente coinciden con `etag` o con
+    `ultima_modificacion` (timestamp), o None si hay que enviar el recurso.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+    if response is not None:
+        response['ETag'] = etag
+        if ultima_modificacion is not None:
+            response['Last-Modified'] = http_date(ultima_modificacion)
+    return response
+
+
+class RespuestaCondicionalMixin:
+    """
+    Mixin para ModelViewSet cuyo modelo tiene `fecha_actualizacion`: agrega
+    ETag a los listados y ETag y Last-Modified a los detalles, y responde 304
+    a las peticiones condicionales que coinciden.
+
+    El ETag del listado cambia con la ruta y los parámetros, el formato de la
+    respuesta, la última modificación y el número de filas (que detecta las
+    eliminaciones). Los listados no envían Last-Modified porque eliminar una
+    fila no cambia la última modificación. Con `?expand=` también se tiene en
+    cuenta la última modificación de las relaciones expandidas.
+    """
+
+    def get_campos_actualizacion(self):
+        modelo = self.get_queryset().model
+        campos = [CAMPO_ACTUALIZACION]
+        expandidos = self.get_campos_expandidos() if hasattr(self, 'get_campos_expandidos') else []
+        for relacion in expandidos:
+            if _tiene_campo(modelo._meta.get_field(relacion).related_model):
+                campos.append(f'{relacion}__{CAMPO_ACTUALIZACION}')
+        return campos
+
+    def get_validadores(self, queryset):
+        """Retorna (etag, última modificación del recurso principal) del queryset."""
+        campos = self.get_campos_actualizacion()
+        valores = queryset.order_by().aggregate(
+            total=Count('pk'),
+            **{f'ultima_{indice}': Max(campo) for indice, campo in enumerate(campos)},
+        )
+        return self._etag(sorted(valores.items())), valores['ultima_0']
+
+    def get_validador_pagina(self, consulta):
+        """
+        ETag de una página por cursor: `consulta` es el queryset ya recortado
+        de la página, del que se leen solo el id y las fechas de actualización.
+        Cualquier fila creada, modificada o eliminada dentro de la página lo cambia.
+        """
+        return self._etag(list(consulta.values_list('pk', *self.get_campos_actualizacion())))
+
+    def _etag(self, valores):
+        firma = repr((
+            self.request.get_full_path(),
+            self.request.accepted_renderer.media_type,
+            valores,
+        ))
+        return f'W/"{hashlib.sha1(firma.encode()).hexdigest()}"'
+
+    def list(self, request, *args, **kwargs):
+        if not _tiene_campo(self.get_queryset().model):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if hasattr(self.paginator, 'get_consulta_pagina'):
+            # Paginación por cursor: sin COUNT(*) ni MAX() sobre todas las filas filtradas
+            etag = self.get_validador_pagina(self.paginator.get_consulta_pagina(queryset, request, self))
+        else:
+            etag, _ = self.get_validadores(queryset)
+        no_modificada = respuesta_no_modificada(request, etag)
+        if no_modificada is not None:
+            return no_modificada
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        if not _tiene_campo(self.get_queryset().model):
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            etag, ultima = self.get_validadores(queryset)
+        except (TypeError, ValueError, ValidationError):
+            ultima = None
+        if ultima is None:
+            # No existe o el id no es válido: el retrieve normal responde 404
+            return super().retrieve(request, *args, **kwargs)
+
+        ultima_modificacion = int(ultima.timestamp())
+        no_modificada = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificada is not None:
+            return no_modificada
+
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(ultima_modificacion)
+        return response
@@ -0,0 +1,73 @@
+"""
+Conteo de consultas SQL por bloque de código y por petición.
+
+`ContadorConsultas` cuenta las consultas ejecutadas dentro de un bloque `with`
+(funciona también con DEBUG=False). `LimiteConsultasMiddleware` lo aplica a
+cada petición y registra una advertencia cuando se supera
+API_LIMITE_CONSULTAS, para detectar consultas N+1 en producción.
+"""
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class ContadorConsultas:
+    """
+    Context manager que cuenta las consultas SQL ejecutadas en todas las
+    conexiones dentro del bloque y guarda su SQL en `consultas`.
+    """
+
+    def __init__(self):
+        self.consultas = []
+        self._bloques = []
+
+    @property
+    def total(self):
+        return len(self.consultas)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        for conexion in connections.all():
+            bloque = conexion.execute_wrapper(self)
+            bloque.__enter__()
+            self._bloques.append(bloque)
+        return self
+
+    def __exit__(self, *exc_info):
+        while self._bloques:
+            self._bloques.pop().__exit__(*exc_info)
+        return False
+
+
+class LimiteConsultasMiddleware:
+    """
+    Cuenta las consultas de cada petición. Si superan API_LIMITE_CONSULTAS
+    registra una advertencia con la ruta; con DEBUG agrega además la cabecera
+    X-Consultas a todas las respuestas. Se desactiva con API_LIMITE_CONSULTAS=0.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limite = settings.API_LIMITE_CONSULTAS
+        if not self.limite:
+            raise MiddlewareNotUsed()
+
+    def __call__(self, request):
+        with ContadorConsultas() as contador:
+            response = self.get_response(request)
+
+        if contador.total > self.limite:
+            logger.warning(
+                f"{request.method} {request.path}: {contador.total} consultas SQL "
+                f"(límite {self.limite})"
+            )
+        if settings.DEBUG:
+            response['X-Consultas'] = str(contador.total)
+        return response
@@ -0,0 +1,86 @@
+"""
+Representaciones expandidas con `?expand=` para los serializers de la API.
+
+Por defecto las relaciones se serializan como su UUID. Con
+`?expand=contenedor,operador` el listado y el detalle embeben los objetos
+relacionados, evitando una petición adicional por cada UUID.
+
+`ExpandibleMixin` (serializer) declara qué relaciones pueden expandirse y con
+qué serializer. `ExpandirMixin` (ViewSet) agrega el `select_related` de las
+relaciones pedidas, de modo que expandir no cuesta consultas por fila.
+"""
+
+
+PARAMETRO_EXPAND = 'expand'
+
+
+def campos_pedidos(request):
+    """Nombres pedidos en `?expand=` (separados por coma), en orden y sin repetir."""
+    if request is None:
+        return []
+    valor = request.query_params.get(PARAMETRO_EXPAND, '')
+    return list(dict.fromkeys(c.strip() for c in valor.split(',') if c.strip()))
+
+
+class ExpandibleMixin:
+    """
+    Mixin para ModelSerializer. `campos_expandibles` asocia cada relación
+    (ForeignKey del modelo) con el serializer que la representa al expandirse.
+
+    La expansión solo cambia la representación de salida: al escribir, la
+    relación se sigue enviando como UUID. Los nombres de `?expand=` que el
+    serializer no admite se ignoran. Los serializers anidados no se expanden.
+    """
+
+    campos_expandibles = {}
+
+    @classmethod
+    def campos_expandidos(cls, request):
+        """Relaciones de `?expand=` que este serializer admite."""
+        return [campo for campo in campos_pedidos(request) if campo in cls.campos_expandibles]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._expandidos = {}
+        if self.context.get('anidado'):
+            return
+
+        contexto = {**self.context, 'anidado': True}
+        for campo in self.campos_expandidos(self.context.get('request')):
+            self._expandidos[campo] = self.campos_expandibles[campo](context=contexto)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for campo, serializer in self._expandidos.items():
+            relacionado = getattr(instance, campo)
+            data[campo] = serializer.to_representation(relacionado) if relacionado is not None else None
+        return data
+
+
+class ExpandirMixin:
+    """
+    Mixin para ModelViewSet cuyo serializer usa `ExpandibleMixin`: aplica
+    `select_related` a las relaciones pedidas en `?expand=`, así cada relación
+    expandida se resuelve con un JOIN en la misma consulta del listado.
+
+    Con expansiones el listado no puede leerse con `.values_list()`, por lo
+    que usa el camino normal de DRF en lugar del listado rápido.
+    """
+
+    def get_campos_expandidos(self):
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'campos_expandidos'):
+            return []
+        return serializer_class.campos_expandidos(self.request)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        campos = self.get_campos_expandidos()
+        if campos:
+            queryset = queryset.select_related(*campos)
+        return queryset
+
+    def get_serializador_valores(self):
+        if self.get_campos_expandidos():
+            return None
+        return super().get_serializador_valores()
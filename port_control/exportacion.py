@@ -0,0 +1,139 @@
+"""
+Exportación en streaming (CSV o NDJSON) de los listados de la API.
+
+`ExportacionMixin` agrega la ruta `<recurso>/exportar/`, que aplica los mismos
+filtros, búsqueda y orden que el listado pero sin paginar. Las filas se leen
+con un cursor del servidor (`.iterator(chunk_size=...)` sobre `.values_list()`)
+y se escriben a la respuesta por trozos, así que la memoria usada no depende
+del número de filas exportadas.
+
+Con un servidor ASGI, Django consume entero un iterador síncrono antes de
+enviarlo; por eso ahí los trozos se generan uno a uno desde un generador
+asíncrono, en el hilo de la petición (el de su conexión a la base).
+"""
+import csv
+import io
+import zlib
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from port_control.renderers import ORJSONRenderer
+from port_control.serializacion import SerializadorValores
+
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _en_trozos(iterable, tamano):
+    iterador = iter(iterable)
+    while trozo := list(islice(iterador, tamano)):
+        yield trozo
+
+
+def _comprimir(partes):
+    """Comprime con gzip cada parte a medida que se genera."""
+    compresor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for parte in partes:
+        comprimida = compresor.compress(parte)
+        if comprimida:
+            yield comprimida
+    yield compresor.flush()
+
+
+async def _en_async(partes):
+    """Recorre un generador síncrono parte por parte sin consumirlo entero."""
+    siguiente = sync_to_async(next)
+    fin = object()
+    try:
+        while (parte := await siguiente(partes, fin)) is not fin:
+            yield parte
+    finally:
+        # Cierra el cursor del servidor también si el cliente se desconecta
+        await sync_to_async(partes.close)()
+
+
+class ExportacionMixin:
+    """
+    Mixin para ModelViewSet: GET `<recurso>/exportar/` transmite todas las
+    filas del listado filtrado.
+
+    Parámetros:
+    - formato: `csv` (default) o `ndjson`
+    - gzip: `true` para descargar el archivo comprimido (.gz)
+
+    Las columnas y sus valores son los del listado (mismo serializer).
+    """
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in FORMATOS:
+            raise ValidationError({'formato': [f'Formato no soportado. Opciones: {", ".join(FORMATOS)}']})
+        comprimir = request.query_params.get('gzip', '').lower() in ('1', 'true')
+
+        queryset = self.filter_queryset(self.get_queryset())
+        trozos = self._trozos(queryset)
+        partes = self._csv(trozos) if formato == 'csv' else self._ndjson(trozos)
+
+        nombre = f'{self.basename}.{formato}'
+        if comprimir:
+            partes = _comprimir(partes)
+            nombre += '.gz'
+            content_type = 'application/gzip'
+        else:
+            content_type = FORMATOS[formato]
+
+        if isinstance(request._request, ASGIRequest):
+            partes = _en_async(partes)
+        response = StreamingHttpResponse(partes, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        # Evita que nginx acumule el archivo en su buffer
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def perform_content_negotiation(self, request, force=False):
+        # El archivo no pasa por los renderers: cualquier Accept (text/csv...) es válido
+        return super().perform_content_negotiation(request, force=force or self.action == 'exportar')
+
+    def get_columnas_exportacion(self):
+        return [campo.field_name for campo in self.get_serializer()._readable_fields]
+
+    def _trozos(self, queryset):
+        """Genera las filas representadas en listas de API_EXPORTACION_TROZO."""
+        tamano = settings.API_EXPORTACION_TROZO
+        serializador = SerializadorValores.compilar(self.get_serializer_class())
+        if serializador is not None:
+            filas = serializador.consulta(queryset).iterator(chunk_size=tamano)
+            for trozo in _en_trozos(filas, tamano):
+                yield serializador.serializar(trozo)
+        else:
+            representar = self.get_serializer().to_representation
+            for trozo in _en_trozos(queryset.iterator(chunk_size=tamano), tamano):
+                yield [representar(objeto) for objeto in trozo]
+
+    def _csv(self, trozos):
+        columnas = self.get_columnas_exportacion()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columnas)
+        for trozo in trozos:
+            writer.writerows([fila.get(columna) for columna in columnas] for fila in trozo)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def _ndjson(self, trozos):
+        renderer = ORJSONRenderer()
+        for trozo in trozos:
+            yield b''.join(renderer.render(fila) + b'\n' for fila in trozo)
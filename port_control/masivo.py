@@ -0,0 +1,252 @@
+"""
+Operaciones masivas (crear, actualizar y eliminar muchas filas por petición).
+
+`OperacionesMasivasMixin` agrega a un ModelViewSet la ruta `<recurso>/bulk/`:
+
+- POST con una lista de objetos: un INSERT por lote (`bulk_create`).
+  También se acepta la lista en el POST del listado.
+- PATCH con una lista de objetos con su `id`: un UPDATE por lote (`bulk_update`).
+- DELETE con `{"ids": [...]}`: un DELETE ... WHERE id IN (...).
+
+Cada operación ocurre en una transacción: si alguna fila no es válida no se
+escribe ninguna y la respuesta trae los errores por fila, en la misma posición
+que en la petición (`{}` para las filas válidas).
+
+`ListaMasivaSerializer` valida por lote: las relaciones y los campos únicos se
+comprueban con una consulta por campo, no con una consulta por fila.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+
+# Filas por sentencia en bulk_create/bulk_update
+TAMANO_LOTE = 500
+
+
+def _clave(modelo, valor):
+    """Valor normalizado de la clave primaria del modelo, o None si no es válido."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        return modelo._meta.pk.to_python(valor)
+    except (DjangoValidationError, TypeError, ValueError):
+        return None
+
+
+class _Precargados:
+    """
+    Reemplaza el queryset de un PrimaryKeyRelatedField por los objetos ya
+    leídos con una sola consulta. `get(pk=...)` se comporta como el del queryset.
+    """
+
+    def __init__(self, modelo, objetos):
+        self.modelo = modelo
+        self.objetos = objetos
+
+    def get(self, pk):
+        clave = self.modelo._meta.pk.to_python(pk)
+        try:
+            return self.objetos[clave]
+        except KeyError:
+            raise self.modelo.DoesNotExist()
+
+
+class ListaMasivaSerializer(serializers.ListSerializer):
+    """
+    ListSerializer que crea y actualiza con bulk_create/bulk_update.
+
+    Para actualizar, `instance` es un diccionario {pk: objeto} y cada fila de
+    `data` trae el `id` del objeto que modifica.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modelo = self.child.Meta.model
+        self._unicos = self._quitar_validadores_unicos()
+
+    def _quitar_validadores_unicos(self):
+        """
+        Quita los UniqueValidator de los campos (una consulta por fila) y
+        retorna [(campo, validador)] para comprobarlos por lote.
+        """
+        unicos = []
+        for campo in self.child.fields.values():
+            for validador in campo.validators:
+                if isinstance(validador, UniqueValidator):
+                    unicos.append((campo, validador))
+            campo.validators = [v for v in campo.validators if not isinstance(v, UniqueValidator)]
+        return unicos
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self._precargar_relaciones(data)
+            if self.instance is not None:
+                self._validar_ids(data)
+        filas = super().to_internal_value(data)
+        self._validar_unicos(data, filas)
+        return filas
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            self.child.instance = self.instance[_clave(self.modelo, data['id'])]
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def _precargar_relaciones(self, data):
+        """Lee con una consulta por relación los objetos referenciados por todas las filas."""
+        for campo in self.child._writable_fields:
+            if not isinstance(campo, PrimaryKeyRelatedField) or campo.pk_field is not None:
+                continue
+            queryset = campo.get_queryset()
+            modelo = queryset.model
+            claves = {
+                _clave(modelo, fila.get(campo.field_name))
+                for fila in data if isinstance(fila, dict)
+            }
+            claves.discard(None)
+            campo.queryset = _Precargados(modelo, queryset.in_bulk(claves))
+
+    def _validar_ids(self, data):
+        """Cada fila a actualizar debe traer el id de un objeto existente, sin repetirse."""
+        errores, vistos = [], set()
+        for fila in data:
+            clave = _clave(self.modelo, fila.get('id')) if isinstance(fila, dict) else None
+            if clave is None or clave not in self.instance:
+                errores.append({'id': ['No existe un objeto con este id.']})
+            elif clave in vistos:
+                errores.append({'id': ['El id está repetido en la petición.']})
+            else:
+                errores.append({})
+            vistos.add(clave)
+        if any(errores):
+            raise serializers.ValidationError(errores)
+
+    def _validar_unicos(self, data, filas):
+        """Comprueba los campos únicos con una consulta por campo."""
+        errores = [{} for _ in filas]
+        for campo, validador in self._unicos:
+            valores = [fila.get(campo.source) for fila in filas]
+            existentes = dict(
+                validador.queryset.filter(**{f'{campo.source}__in': {v for v in valores if v is not None}})
+                .values_list(campo.source, 'pk')
+            )
+            vistos = set()
+            for indice, valor in enumerate(valores):
+                if valor is None:
+                    continue
+                propio = _clave(self.modelo, data[indice]['id']) if self.instance is not None else None
+                if valor in vistos or existentes.get(valor, propio) != propio:
+                    errores[indice].setdefault(campo.field_name, []).append(str(validador.message))
+                vistos.add(valor)
+        if any(errores):
+            raise serializers.ValidationError(errores)
+
+    def create(self, validated_data):
+        objetos = [self.modelo(**atributos) for atributos in validated_data]
+        return self.modelo._default_manager.bulk_create(objetos, batch_size=TAMANO_LOTE)
+
+    def update(self, instance, validated_data):
+        objetos, campos = [], set()
+        for fila, atributos in zip(self.initial_data, validated_data):
+            objeto = instance[_clave(self.modelo, fila['id'])]
+            for nombre, valor in atributos.items():
+                setattr(objeto, nombre, valor)
+            campos.update(atributos)
+            objetos.append(objeto)
+
+        # bulk_update no llama a save(): se actualizan aquí los campos auto_now
+        for campo in self.modelo._meta.concrete_fields:
+            if getattr(campo, 'auto_now', False):
+                for objeto in objetos:
+                    campo.pre_save(objeto, add=False)
+                campos.add(campo.name)
+
+        if campos:
+            self.modelo._default_manager.bulk_update(objetos, campos, batch_size=TAMANO_LOTE)
+        return objetos
+
+
+class EliminacionMasivaSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=settings.API_MASIVO_MAXIMO,
+    )
+
+
+class OperacionesMasivasMixin:
+    """
+    Mixin para ModelViewSet: crear, actualizar y eliminar por lotes en
+    `<recurso>/bulk/` (ver el docstring del módulo). Usa los permisos del
+    ViewSet según el método HTTP.
+    """
+
+    def get_serializer_masivo(self, *args, **kwargs):
+        kwargs.setdefault('context', self.get_serializer_context())
+        child = self.get_serializer_class()(partial=kwargs.get('partial', False), context=kwargs['context'])
+        return ListaMasivaSerializer(
+            *args,
+            child=child,
+            allow_empty=False,
+            max_length=settings.API_MASIVO_MAXIMO,
+            **kwargs,
+        )
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.crear_masivo(request)
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk', url_name='bulk')
+    def masivo(self, request):
+        if request.method == 'PATCH':
+            return self.actualizar_masivo(request)
+        if request.method == 'DELETE':
+            return self.eliminar_masivo(request)
+        return self.crear_masivo(request)
+
+    def crear_masivo(self, request):
+        serializer = self.get_serializer_masivo(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def actualizar_masivo(self, request):
+        filas = request.data if isinstance(request.data, list) else []
+        modelo = self.get_queryset().model
+        claves = {_clave(modelo, fila.get('id')) for fila in filas if isinstance(fila, dict)}
+        claves.discard(None)
+
+        with transaction.atomic():
+            # Bloquea las filas a modificar hasta el fin de la transacción
+            instancias = self.get_queryset().select_for_update(of=('self',)).in_bulk(claves)
+            serializer = self.get_serializer_masivo(instancias, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(serializer.data)
+
+    def eliminar_masivo(self, request):
+        serializer = EliminacionMasivaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(pk__in=ids)
+            existentes = set(queryset.values_list('pk', flat=True))
+            if existentes != ids:
+                raise serializers.ValidationError({
+                    'ids': {
+                        indice: ['No existe un objeto con este id.']
+                        for indice, valor in enumerate(serializer.validated_data['ids'])
+                        if valor not in existentes
+                    }
+                })
+            queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,8 +1,10 @@
 """
 Módulo de conexión a MongoDB para el sistema de ubicación en tiempo real de buques.
 """
+import asyncio
 import os
-from pymongo import MongoClient
+import threading
+from pymongo import AsyncMongoClient, MongoClient, monitoring
 from pymongo.errors import ConnectionFailure, ConfigurationError
 from django.conf import settings
 import logging
@@ -12,83 +14,246 @@ logger = logging.getLogger(__name__)
 # Cliente MongoDB global
 _mongo_client = None
 _mongo_db = None
+# Clientes asíncronos (vistas ASGI): uno por event loop
+_clientes_async = {}
+# Cierres en curso de clientes de loops terminados (referencia a las tareas)
+_cierres_async = set()
+# Si este proceso precalentó el pool; los hijos de un fork lo repiten
+_precalentar_tras_fork = False
+_lock = threading.Lock()
+
+
+def _entero_opcional(variable, default):
+    """Lee un entero de entorno; 0 significa 'sin límite' y se traduce a None."""
+    valor = int(os.getenv(variable, default))
+    return valor or None
+
+
+def get_pool_options():
+    """
+    Opciones del pool de conexiones y timeouts del cliente, configurables
+    por variables de entorno.
+    """
+    return {
+        'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+        'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+        'maxIdleTimeMS': _entero_opcional('MONGO_MAX_IDLE_TIME_MS', '0'),
+        'waitQueueTimeoutMS': _entero_opcional('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'),
+        'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        'connectTimeoutMS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+        'socketTimeoutMS': _entero_opcional('MONGO_SOCKET_TIMEOUT_MS', '5000'),
+    }
+
+
+class MetricasPool(monitoring.ConnectionPoolListener):
+    """
+    Métricas del pool de conexiones del cliente de este proceso: conexiones
+    abiertas y en uso, y tiempo de espera para obtener una conexión.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.abiertas = 0
+            self.en_uso = 0
+            self.max_en_uso = 0
+            self.obtenidas = 0
+            self.fallidas = 0
+            self.espera_total = 0.0
+            self.espera_maxima = 0.0
+            self.vaciados = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.vaciados += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.abiertas += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.abiertas -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.fallidas += 1
+            self._registrar_espera(event.duration)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.obtenidas += 1
+            self.en_uso += 1
+            self.max_en_uso = max(self.max_en_uso, self.en_uso)
+            self._registrar_espera(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.en_uso -= 1
+
+    def _registrar_espera(self, duracion):
+        if duracion is None:
+            return
+        self.espera_total += duracion
+        self.espera_maxima = max(self.espera_maxima, duracion)
+
+    def como_dict(self):
+        with self._lock:
+            esperas = self.obtenidas + self.fallidas
+            return {
+                'conexiones_abiertas': self.abiertas,
+                'conexiones_en_uso': self.en_uso,
+                'max_conexiones_en_uso': self.max_en_uso,
+                'conexiones_obtenidas': self.obtenidas,
+                'obtenciones_fallidas': self.fallidas,
+                'espera_media_ms': round(self.espera_total / esperas * 1000, 3) if esperas else 0.0,
+                'espera_maxima_ms': round(self.espera_maxima * 1000, 3),
+                'pool_vaciado': self.vaciados,
+            }
+
+
+metricas_pool = MetricasPool()
 
 
 def get_mongo_client():
     """
     Obtiene o crea el cliente de MongoDB.
     Utiliza variables de entorno para la configuración.
+
+    El cliente se crea sin bloquear: PyMongo conecta en segundo plano y cada
+    operación espera como máximo serverSelectionTimeoutMS a que el servidor
+    esté disponible. Tras caídas del servidor el pool se recupera solo.
     """
     global _mongo_client
-    
+
     if _mongo_client is None:
-        try:
-            # Obtener configuración de variables de entorno
-            mongo_host = os.getenv('MONGO_HOST', 'localhost')
-            mongo_port = int(os.getenv('MONGO_PORT', '27017'))
-            mongo_username = os.getenv('MONGO_USERNAME', '')
-            mongo_password = os.getenv('MONGO_PASSWORD', '')
-            mongo_database = os.getenv('MONGO_DATABASE', 'control_puerto')
-            mongo_auth_source = os.getenv('MONGO_AUTH_SOURCE', 'admin')
-            
-            # Construir URI de conexión
-            if mongo_username and mongo_password:
-                # Conexión con autenticación
-                mongo_uri = f"mongodb://{mongo_username}:{mongo_password}@{mongo_host}:{mongo_port}/{mongo_database}?authSource={mongo_auth_source}"
-            else:
-                # Conexión sin autenticación (desarrollo local)
-                mongo_uri = f"mongodb://{mongo_host}:{mongo_port}/{mongo_database}"
-            
-            # También soportar MongoDB Atlas (URI completa)
-            mongo_uri_env = os.getenv('MONGO_URI')
-            if mongo_uri_env:
-                mongo_uri = mongo_uri_env
-            
-            # Crear cliente
-            _mongo_client = MongoClient(
-                mongo_uri,
-                serverSelectionTimeoutMS=5000,  # Timeout de 5 segundos
-                connectTimeoutMS=5000,
-                socketTimeoutMS=5000
-            )
-            
-            # Verificar conexión
-            _mongo_client.admin.command('ping')
-            logger.info(f"Conexión exitosa a MongoDB en {mongo_host}:{mongo_port}")
-            
-        except ConnectionFailure as e:
-            logger.error(f"Error al conectar a MongoDB: {e}")
-            raise
-        except ConfigurationError as e:
-            logger.error(f"Error de configuración de MongoDB: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Error inesperado al conectar a MongoDB: {e}")
-            raise
-    
+        with _lock:
+            if _mongo_client is None:
+                _mongo_client = _crear_cliente()
+
     return _mongo_client
 
 
+def get_mongo_uri():
+    """Construye la URI de conexión a partir de las variables de entorno."""
+    # Obtener configuración de variables de entorno
+    mongo_host = os.getenv('MONGO_HOST', 'localhost')
+    mongo_port = int(os.getenv('MONGO_PORT', '27017'))
+    mongo_username = os.getenv('MONGO_USERNAME', '')
+    mongo_password = os.getenv('MONGO_PASSWORD', '')
+    mongo_database = os.getenv('MONGO_DATABASE', 'control_puerto')
+    mongo_auth_source = os.getenv('MONGO_AUTH_SOURCE', 'admin')
+
+    # También soportar MongoDB Atlas (URI completa)
+    mongo_uri_env = os.getenv('MONGO_URI')
+    if mongo_uri_env:
+        return mongo_uri_env
+
+    # Construir URI de conexión
+    if mongo_username and mongo_password:
+        # Conexión con autenticación
+        return f"mongodb://{mongo_username}:{mongo_password}@{mongo_host}:{mongo_port}/{mongo_database}?authSource={mongo_auth_source}"
+    # Conexión sin autenticación (desarrollo local)
+    return f"mongodb://{mongo_host}:{mongo_port}/{mongo_database}"
+
+
+def _crear_cliente():
+    try:
+        # Crear cliente
+        metricas_pool.reiniciar()
+        client = MongoClient(
+            get_mongo_uri(),
+            event_listeners=[metricas_pool],
+            **get_pool_options()
+        )
+        logger.info(f"Cliente de MongoDB creado (pid {os.getpid()})")
+        return client
+
+    except ConfigurationError as e:
+        logger.error(f"Error de configuración de MongoDB: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al conectar a MongoDB: {e}")
+        raise
+
+
 def get_mongo_db():
     """
     Obtiene la base de datos de MongoDB.
     """
     global _mongo_db
-    
+
     if _mongo_db is None:
         client = get_mongo_client()
         mongo_database = os.getenv('MONGO_DATABASE', 'control_puerto')
         _mongo_db = client[mongo_database]
-    
+
     return _mongo_db
 
 
+def get_mongo_db_async():
+    """
+    Obtiene la base de datos de MongoDB con el cliente asíncrono de PyMongo,
+    para las vistas ASGI. Debe llamarse dentro de un event loop.
+
+    Cada cliente queda ligado al loop en el que se creó, así que se mantiene
+    uno por loop. Los clientes de loops ya cerrados (p. ej. los que crea
+    async_to_sync en cada llamada) se cierran al pedir uno nuevo, para no
+    dejar abiertos sus pools ni contarlos en las métricas.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        cliente = _clientes_async.get(loop)
+        cerrados = [viejo for viejo in _clientes_async if viejo.is_closed()]
+        abandonados = [_clientes_async.pop(viejo) for viejo in cerrados]
+        if cliente is None:
+            cliente = _clientes_async[loop] = AsyncMongoClient(
+                get_mongo_uri(),
+                event_listeners=[metricas_pool],
+                **get_pool_options()
+            )
+            logger.info(f"Cliente asíncrono de MongoDB creado (pid {os.getpid()})")
+
+    for abandonado in abandonados:
+        tarea = loop.create_task(_cerrar_cliente_async(abandonado))
+        _cierres_async.add(tarea)
+        tarea.add_done_callback(_cierres_async.discard)
+
+    return cliente[os.getenv('MONGO_DATABASE', 'control_puerto')]
+
+
+async def _cerrar_cliente_async(cliente):
+    """Cierra un cliente asíncrono cuyo loop terminó; sus conexiones publican connection_closed."""
+    try:
+        await cliente.close()
+    except Exception as e:
+        logger.warning(f"No se pudo cerrar un cliente asíncrono de MongoDB: {e}")
+
+
 def close_mongo_connection():
     """
     Cierra la conexión a MongoDB.
     """
     global _mongo_client, _mongo_db
-    
+
     if _mongo_client:
         _mongo_client.close()
         _mongo_client = None
@@ -96,6 +261,50 @@ def close_mongo_connection():
         logger.info("Conexión a MongoDB cerrada")
 
 
+def precalentar_pool():
+    """
+    Abre el pool antes de atender peticiones: selección de servidor,
+    autenticación y la primera conexión. PyMongo completa en segundo plano
+    las `minPoolSize` conexiones. Así la primera petición de cada worker no
+    paga el establecimiento. Retorna True si MongoDB respondió.
+    """
+    global _precalentar_tras_fork
+    _precalentar_tras_fork = True
+
+    try:
+        get_mongo_client().admin.command('ping')
+        logger.info(f"Pool de MongoDB precalentado (pid {os.getpid()})")
+        return True
+    except ConnectionFailure as e:
+        logger.warning(f"No se pudo precalentar el pool de MongoDB: {e}")
+        return False
+
+
+def _reiniciar_tras_fork():
+    """
+    Descarta en el proceso hijo el cliente heredado del padre: sus sockets y
+    monitores no son seguros tras un fork (p. ej. gunicorn --preload). Si el
+    padre había precalentado el pool, el hijo lo precalienta en segundo plano.
+    """
+    global _mongo_client, _mongo_db, _lock
+
+    _mongo_client = None
+    _mongo_db = None
+    # Los loops y sockets del padre no sirven en el hijo
+    _clientes_async.clear()
+    _lock = threading.Lock()
+    # Un lock tomado por otro hilo del padre quedaría tomado para siempre en el hijo
+    metricas_pool._lock = threading.Lock()
+    metricas_pool.reiniciar()
+
+    if _precalentar_tras_fork:
+        threading.Thread(target=precalentar_pool, daemon=True).start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
 def test_connection():
     """
     Prueba la conexión a MongoDB.
@@ -108,4 +317,3 @@ def test_connection():
     except Exception as e:
         logger.error(f"Error al probar conexión: {e}")
         return False
-
@@ -0,0 +1,213 @@
+"""
+Paginación por clave (keyset) para los listados grandes de la API.
+
+A diferencia de PageNumberPagination no ejecuta COUNT(*) ni OFFSET: cada
+página filtra a partir de la última fila de la anterior por la clave
+compuesta (campo de orden, id), que un índice sobre esas dos columnas resuelve
+en tiempo constante sin importar la profundidad de la página.
+"""
+import base64
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PaginacionCursor(BasePagination):
+    """
+    Paginación con cursor opaco sobre la clave (campo, id).
+
+    El campo de orden es el primero del `ordering` efectivo (parámetro
+    `?ordering=` o el `ordering` del ViewSet); el id desempata en la misma
+    dirección. Debe ser un campo no nulo del modelo. El tamaño de página se
+    elige con `?page_size=` hasta PAGINACION_CURSOR_MAXIMO.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.PAGINACION_CURSOR_MAXIMO
+    cursor_query_param = 'cursor'
+    campo_desempate = 'id'
+    # Orden por defecto si el ViewSet no define ninguno
+    ordering = '-id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        consulta = self.get_consulta_pagina(queryset, request, view)
+        cursor = self.cursor
+        reverso = cursor is not None and cursor[2]
+
+        filas = list(consulta)
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if reverso:
+            filas.reverse()
+
+        hay_siguiente = True if reverso else hay_mas
+        hay_anterior = hay_mas if reverso else cursor is not None
+        columnas = getattr(consulta, '_fields', None)
+        self.siguiente = self._posicion(filas[-1], columnas) if hay_siguiente and filas else None
+        self.anterior = self._posicion(filas[0], columnas) if hay_anterior and filas else None
+
+        return filas
+
+    def get_consulta_pagina(self, queryset, request, view=None):
+        """
+        Queryset (sin evaluar) de las filas de la página pedida más una, que
+        indica si hay otra página. Lanza NotFound si el cursor no es válido.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        modelo = queryset.model
+        campo, descendente = self.get_orden(request, queryset, view)
+        self.campos = [modelo._meta.get_field(campo)]
+        if campo != self.campo_desempate:
+            self.campos.append(modelo._meta.get_field(self.campo_desempate))
+
+        self.cursor = cursor = self.decodificar_cursor(request)
+        reverso = cursor is not None and cursor[2]
+        # Hacia atrás se lee en orden inverso y luego se da vuelta la página
+        descendente_lectura = descendente != reverso
+        prefijo = '-' if descendente_lectura else ''
+        queryset = queryset.order_by(*(f'{prefijo}{c.name}' for c in self.campos))
+
+        if cursor is not None:
+            queryset = queryset.filter(self._posteriores(cursor[:2], descendente_lectura))
+
+        return queryset[:self.page_size + 1]
+
+    def get_orden(self, request, queryset, view):
+        """Retorna (campo, descendente) del primer criterio de orden efectivo."""
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        else:
+            ordering = getattr(view, 'ordering', None)
+
+        if not ordering:
+            ordering = self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        primero = ordering[0]
+        if '__' in primero:
+            # El `ordering` o los `ordering_fields` del ViewSet incluyen una relación
+            raise ImproperlyConfigured(
+                f'La paginación por cursor no admite ordenar por campos relacionados ({primero}).'
+            )
+        campo = primero.lstrip('-')
+        return ('id' if campo == 'pk' else campo), primero.startswith('-')
+
+    def get_page_size(self, request):
+        try:
+            tamano = int(request.query_params[self.page_size_query_param])
+            if tamano > 0:
+                return min(tamano, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def _posteriores(self, posicion, descendente):
+        """Filtro de las filas que siguen a `posicion` en el orden de lectura."""
+        operador = 'lt' if descendente else 'gt'
+        campo = self.campos[0].name
+        if len(self.campos) == 1:
+            return Q(**{f'{campo}__{operador}': posicion[0]})
+
+        desempate = self.campos[1].name
+        return (
+            Q(**{f'{campo}__{operador}': posicion[0]})
+            | Q(**{campo: posicion[0], f'{desempate}__{operador}': posicion[1]})
+        )
+
+    def _posicion(self, fila, columnas):
+        """Valores de la clave (campo, id) de una fila: instancia o tupla de values_list()."""
+        if columnas is not None:
+            return tuple(fila[columnas.index(c.attname)] for c in self.campos)
+        return tuple(getattr(fila, c.attname) for c in self.campos)
+
+    def codificar_cursor(self, posicion, reverso):
+        partes = [v.isoformat() if hasattr(v, 'isoformat') else str(v) for v in posicion]
+        valor = '|'.join(partes + ['1' if reverso else '0'])
+        return base64.urlsafe_b64encode(valor.encode()).decode().rstrip('=')
+
+    def decodificar_cursor(self, request):
+        """
+        Retorna (valor, id, reverso) del cursor de la petición, o None.
+        Lanza NotFound si el cursor no es válido.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            partes = base64.urlsafe_b64decode(cursor + relleno).decode().rsplit('|', len(self.campos))
+            if len(partes) != len(self.campos) + 1:
+                raise ValueError('número de valores incorrecto')
+            valores = [c.to_python(p) for c, p in zip(self.campos, partes)]
+        except Exception:
+            raise NotFound('Cursor inválido')
+
+        if len(valores) == 1:
+            valores.append(None)
+        return valores[0], valores[1], partes[-1] == '1'
+
+    def get_next_link(self):
+        if self.siguiente is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.codificar_cursor(self.siguiente, False)
+        )
+
+    def get_previous_link(self):
+        if self.anterior is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.codificar_cursor(self.anterior, True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor de la página',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Resultados por página (máximo {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,74 @@
+"""
+Renderer y parser JSON rápidos basados en orjson.
+
+orjson es una dependencia opcional: si no está instalada, ambas clases se
+comportan exactamente como el JSONRenderer / JSONParser de DRF.
+"""
+from django.conf import settings
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Separadores de línea que DRF escapa para que el JSON sea un subconjunto de JavaScript
+_U2028 = '\u2028'.encode()
+_U2029 = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer JSON con orjson. Produce la misma salida que el JSONRenderer de
+    DRF (UUID como texto, fechas con 'Z' para UTC, Decimal según el encoder de
+    DRF). Las respuestas indentadas (API navegable, `; indent=N`) se delegan
+    en el renderer de DRF.
+    """
+
+    def __init__(self):
+        self._default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Las fechas pasan al encoder de DRF para conservar su formato
+        ret = orjson.dumps(
+            data,
+            default=self._default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+        if _U2028 in ret or _U2029 in ret:
+            ret = ret.replace(_U2028, b'\\u2028').replace(_U2029, b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parser JSON con orjson. Cuerpos con una codificación distinta de UTF-8 se
+    delegan en el parser de DRF.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,153 @@
+"""
+Serialización rápida de solo lectura para los listados de la API.
+
+`SerializadorValores` precompila, a partir de un ModelSerializer, las columnas
+que hay que leer con `.values_list()` y las conversiones que DRF aplicaría a
+cada una. Construye cada fila directamente desde la tupla de la base de datos,
+sin instanciar modelos ni recorrer los campos del serializer fila a fila. La
+salida es idéntica a la del ModelSerializer.
+
+`ListadoRapidoMixin` lo activa en la acción `list` de los ViewSets que lo
+piden y renderiza ese listado con orjson.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from port_control.renderers import ORJSONRenderer
+
+
+# Campos cuyo valor en la base de datos ya es su representación JSON
+_CAMPOS_DIRECTOS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.UUIDField,
+    serializers.ChoiceField,
+    serializers.ReadOnlyField,
+)
+
+# Campos que no pueden leerse de una columna
+_CAMPOS_NO_SOPORTADOS = (
+    serializers.BaseSerializer,
+    serializers.ManyRelatedField,
+    serializers.FileField,
+    serializers.SerializerMethodField,
+)
+
+_compilados = {}
+
+
+class SerializadorValores:
+    """
+    Versión precompilada y de solo lectura de un ModelSerializer.
+
+    Usar `compilar()` para obtenerla: retorna None si el serializer tiene
+    campos que no corresponden a una columna del modelo (métodos, anidados,
+    relaciones muchos a muchos, archivos...).
+    """
+
+    def __init__(self, nombres, columnas, conversiones):
+        self.nombres = nombres
+        self.columnas = columnas
+        self.conversiones = conversiones
+
+    @classmethod
+    def compilar(cls, serializer_class):
+        if serializer_class not in _compilados:
+            _compilados[serializer_class] = cls._desde_serializer(serializer_class())
+        return _compilados[serializer_class]
+
+    @classmethod
+    def _desde_serializer(cls, serializer):
+        modelo = serializer.Meta.model
+        nombres, columnas, conversiones = [], [], []
+
+        for campo in serializer._readable_fields:
+            columna = cls._columna(modelo, campo)
+            if columna is None:
+                return None
+            if not isinstance(campo, _CAMPOS_DIRECTOS + (PrimaryKeyRelatedField,)):
+                conversiones.append((len(columnas), campo.to_representation))
+            nombres.append(campo.field_name)
+            columnas.append(columna)
+
+        return cls(tuple(nombres), tuple(columnas), tuple(conversiones))
+
+    @staticmethod
+    def _columna(modelo, campo):
+        """Columna de `values_list()` que alimenta el campo, o None."""
+        if isinstance(campo, _CAMPOS_NO_SOPORTADOS) or '.' in campo.source or campo.source == '*':
+            return None
+        if isinstance(campo, serializers.JSONField) and campo.binary:
+            return None
+        if isinstance(campo, PrimaryKeyRelatedField) and campo.pk_field is not None:
+            return None
+
+        try:
+            campo_modelo = modelo._meta.get_field(campo.source)
+        except FieldDoesNotExist:
+            return None
+        if not campo_modelo.concrete or campo_modelo.many_to_many:
+            return None
+        if campo_modelo.is_relation and not isinstance(campo, PrimaryKeyRelatedField):
+            return None
+
+        # Las FK se leen de su columna (<campo>_id) sin tocar la tabla relacionada
+        return campo_modelo.attname
+
+    def consulta(self, queryset):
+        return queryset.values_list(*self.columnas)
+
+    def serializar(self, filas):
+        nombres = self.nombres
+        if not self.conversiones:
+            return [dict(zip(nombres, fila)) for fila in filas]
+
+        conversiones = self.conversiones
+        resultado = []
+        for fila in filas:
+            fila = list(fila)
+            for indice, convertir in conversiones:
+                valor = fila[indice]
+                if valor is not None:
+                    fila[indice] = convertir(valor)
+            resultado.append(dict(zip(nombres, fila)))
+        return resultado
+
+
+class ListadoRapidoMixin:
+    """
+    Mixin para ModelViewSet: con `listado_rapido = True` el listado se
+    construye con `SerializadorValores` y se renderiza con orjson. Si el
+    serializer del ViewSet no puede precompilarse, el listado usa el camino
+    normal de DRF. Las demás acciones no cambian.
+    """
+
+    listado_rapido = False
+
+    def get_renderers(self):
+        if self.listado_rapido and self.action == 'list':
+            return [ORJSONRenderer(), BrowsableAPIRenderer()]
+        return super().get_renderers()
+
+    def get_serializador_valores(self):
+        if not self.listado_rapido:
+            return None
+        return SerializadorValores.compilar(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        serializador = self.get_serializador_valores()
+        if serializador is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = serializador.consulta(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializador.serializar(page))
+
+        return Response(serializador.serializar(queryset))
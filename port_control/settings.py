@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'django_filters',
@@ -45,8 +46,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'port_control.consultas.LimiteConsultasMiddleware',
 ]
 
+# Consultas SQL por petición a partir de las cuales se registra una advertencia (0 = desactivado)
+API_LIMITE_CONSULTAS = int(os.getenv('API_LIMITE_CONSULTAS', '0'))
+
 # ROOT URL
 ROOT_URLCONF = 'port_control.urls'
 
@@ -82,8 +87,16 @@ DATABASES = {
 }
 
 # AUTHENTICATION
+# JWT sin estado: el rol viaja en el token y las peticiones no leen Personal
+JWT_SIN_ESTADO = os.getenv('JWT_SIN_ESTADO', 'False') == 'True'
+# Segundos que se guarda el estado (activo, rol) de cada usuario para revocar tokens
+JWT_ESTADO_TTL = int(os.getenv('JWT_ESTADO_TTL', '30'))
+JWT_ESTADO_CACHE_ALIAS = os.getenv('JWT_ESTADO_CACHE_ALIAS', 'default')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'port_control.autenticacion.JWTSinEstadoAuthentication'
+        if JWT_SIN_ESTADO else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -99,11 +112,54 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'port_control.exception_handlers.custom_exception_handler',
 }
 
+# Tamaño máximo de página (?page_size=) de los listados con paginación por cursor
+PAGINACION_CURSOR_MAXIMO = int(os.getenv('PAGINACION_CURSOR_MAXIMO', '100'))
+
+# Filas máximas por petición en las operaciones masivas (<recurso>/bulk/)
+API_MASIVO_MAXIMO = int(os.getenv('API_MASIVO_MAXIMO', '5000'))
+
+# Filas leídas por trozo del cursor al exportar (<recurso>/exportar/)
+API_EXPORTACION_TROZO = int(os.getenv('API_EXPORTACION_TROZO', '2000'))
+
+# Caché de respuestas de los listados de barcos, zonas y tripulación. Activarla solo
+# con una caché compartida (Redis, Memcached): con la caché en memoria de cada proceso
+# una escritura invalida las páginas de un solo worker
+API_CACHE_RESPUESTAS = os.getenv('API_CACHE_RESPUESTAS', 'False') == 'True'
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', 'default')
+API_CACHE_TTL = int(os.getenv('API_CACHE_TTL', '60'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    # Tokens con los claims rol, is_superuser e is_active
+    'TOKEN_OBTAIN_SERIALIZER': 'port_control.autenticacion.TokenConRolObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'port_control.autenticacion.TokenConRolRefreshSerializer',
 }
 
+# UBICACIONES (MongoDB)
+# Máximo de ubicaciones por lote JSON y tamaño de cada insert_many
+UBICACIONES_LOTE_MAXIMO = int(os.getenv('UBICACIONES_LOTE_MAXIMO', '5000'))
+UBICACIONES_LOTE_ESCRITURA = int(os.getenv('UBICACIONES_LOTE_ESCRITURA', '1000'))
+# Ubicaciones por trozo al transmitir el historial (y batch_size del cursor)
+UBICACIONES_HISTORIAL_TROZO = int(os.getenv('UBICACIONES_HISTORIAL_TROZO', '500'))
+# Historial como colección time-series (MongoDB 5.0+) y días de retención (0 = sin expiración)
+UBICACIONES_TIMESERIES = os.getenv('UBICACIONES_TIMESERIES', 'False') == 'True'
+UBICACIONES_RETENCION_DIAS = int(os.getenv('UBICACIONES_RETENCION_DIAS', '0'))
+# Caché del snapshot de /api/ubicaciones/actuales/: 'memoria' (por proceso) o 'django'
+UBICACIONES_CACHE_BACKEND = os.getenv('UBICACIONES_CACHE_BACKEND', 'memoria')
+UBICACIONES_CACHE_ALIAS = os.getenv('UBICACIONES_CACHE_ALIAS', 'default')
+UBICACIONES_CACHE_TTL = int(os.getenv('UBICACIONES_CACHE_TTL', '5'))
+# Stream en vivo: segundos entre keep-alives y eventos máximos en cola por cliente
+UBICACIONES_STREAM_HEARTBEAT = int(os.getenv('UBICACIONES_STREAM_HEARTBEAT', '15'))
+UBICACIONES_STREAM_COLA = int(os.getenv('UBICACIONES_STREAM_COLA', '1000'))
+# Vistas asíncronas de ubicaciones (solo con un servidor ASGI)
+UBICACIONES_ASYNC = os.getenv('UBICACIONES_ASYNC', 'False') == 'True'
+# Geocercas: lado de la celda del índice de zonas (grados) y segundos antes de recargarlo
+UBICACIONES_GEOCERCAS_CELDA = float(os.getenv('UBICACIONES_GEOCERCAS_CELDA', '0.01'))
+UBICACIONES_GEOCERCAS_TTL = int(os.getenv('UBICACIONES_GEOCERCAS_TTL', '60'))
+# Intentos de actualizar la ubicación actual si otro escritor cambió la zona del barco
+UBICACIONES_INTENTOS_ZONA = int(os.getenv('UBICACIONES_INTENTOS_ZONA', '3'))
+
 # STATIC FILES
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
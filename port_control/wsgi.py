@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "port_control.settings")
 
 application = get_wsgi_application()
+
+# Abrir el pool de MongoDB al iniciar cada worker (con --preload, tras el fork)
+if os.getenv('MONGO_PRECALENTAR', 'False') == 'True':
+    from port_control.mongodb import precalentar_pool
+    precalentar_pool()
@@ -1,3 +1,11 @@
 from django.contrib import admin
+from tripulacion.models import Tripulante
 
-# Register your models here.
+
+@admin.register(Tripulante)
+class TripulanteAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'barco', 'nacionalidad', 'identificacion')
+    list_filter = ('rol', 'nacionalidad')
+    list_select_related = ('barco',)
+    raw_id_fields = ('barco',)
+    search_fields = ('nombre', 'identificacion')
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 class TripulacionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tripulacion'
+
+    def ready(self):
+        """Versiona la caché de respuestas del listado con cada cambio."""
+        from tripulacion.models import Tripulante
+        from port_control.cache_respuestas import registrar_modelo
+
+        registrar_modelo(Tripulante)
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("barcos", "0002_indices_busqueda"),
+        ("tripulacion", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=models.Index(fields=["nombre"], name="tripulac_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=models.Index(fields=["barco", "nombre"], name="tripulac_barco_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=models.Index(fields=["rol", "nombre"], name="tripulac_rol_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=models.Index(fields=["nacionalidad", "nombre"], name="tripulac_nacion_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("nombre"), name="gin_trgm_ops"), name="tripulac_nombre_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("rol"), name="gin_trgm_ops"), name="tripulac_rol_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("nacionalidad"), name="gin_trgm_ops"), name="tripulac_nacion_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="tripulante",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("identificacion"), name="gin_trgm_ops"), name="tripulac_ident_trgm"),
+        ),
+    ]
@@ -1,7 +1,18 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 from barcos.models import Barco
 
+class TripulanteQuerySet(models.QuerySet):
+    def con_relaciones(self):
+        """
+        Carga en la misma consulta el barco, que usan __str__,
+        el admin y las representaciones expandidas. Omite los vectores de búsqueda.
+        """
+        return self.select_related('barco').defer('barco__busqueda')
+
+
 class Tripulante(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     barco = models.ForeignKey(Barco, on_delete=models.CASCADE, related_name='tripulacion')
@@ -9,9 +20,28 @@ class Tripulante(models.Model):
     rol = models.CharField(max_length=50)
     nacionalidad = models.CharField(max_length=50)
     identificacion = models.CharField(max_length=50)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = TripulanteQuerySet.as_manager()
 
     class Meta:
         db_table = "tripulacion"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='tripulac_actualizacion_idx'),
+            # Orden de los listados
+            models.Index(fields=['nombre'], name='tripulac_nombre_idx'),
+            # Filtros combinados con el orden por defecto
+            models.Index(fields=['barco', 'nombre'], name='tripulac_barco_nombre_idx'),
+            models.Index(fields=['rol', 'nombre'], name='tripulac_rol_nombre_idx'),
+            models.Index(fields=['nacionalidad', 'nombre'], name='tripulac_nacion_nombre_idx'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('nombre'), name='gin_trgm_ops'), name='tripulac_nombre_trgm'),
+            GinIndex(OpClass(Upper('rol'), name='gin_trgm_ops'), name='tripulac_rol_trgm'),
+            GinIndex(OpClass(Upper('nacionalidad'), name='gin_trgm_ops'), name='tripulac_nacion_trgm'),
+            GinIndex(OpClass(Upper('identificacion'), name='gin_trgm_ops'), name='tripulac_ident_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} ({self.rol})"
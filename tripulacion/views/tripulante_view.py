@@ -3,10 +3,12 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from tripulacion.models import Tripulante
 from tripulacion.serializers import TripulanteSerializer
+from port_control.cache_respuestas import CacheListadoMixin
+from port_control.condicional import RespuestaCondicionalMixin
 from port_control.permissions import TripulacionPermission
 
 
-class TripulanteViewSet(viewsets.ModelViewSet):
+class TripulanteViewSet(CacheListadoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Tripulación
     
@@ -15,7 +17,7 @@ class TripulanteViewSet(viewsets.ModelViewSet):
     - Leer: CAPITAN_PUERTO, INSPECTOR, VIGILANTE
     - Sin acceso: OPERADOR_TERMINAL
     """
-    queryset = Tripulante.objects.all()
+    queryset = Tripulante.objects.con_relaciones()
     serializer_class = TripulanteSerializer
     permission_classes = [TripulacionPermission]
     
@@ -7,5 +7,17 @@ class UbicacionesConfig(AppConfig):
     
     def ready(self):
         """Inicialización cuando la app está lista."""
-        pass
-
+        from django.db.models.signals import post_save, post_delete
+        from ubicaciones.cache import invalidar_snapshot_flota
+        from ubicaciones.geocercas import zona_guardada, zona_eliminada
+        from ubicaciones.signals import ubicaciones_actualizadas
+        from zonas_puerto.models import ZonaPuerto
+        
+        ubicaciones_actualizadas.connect(
+            invalidar_snapshot_flota,
+            dispatch_uid='ubicaciones_invalidar_snapshot_flota'
+        )
+        
+        # Réplica de las zonas en MongoDB e índice de geocercas
+        post_save.connect(zona_guardada, sender=ZonaPuerto, dispatch_uid='ubicaciones_zona_guardada')
+        post_delete.connect(zona_eliminada, sender=ZonaPuerto, dispatch_uid='ubicaciones_zona_eliminada')
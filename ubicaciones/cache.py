@@ -0,0 +1,138 @@
+"""
+Caché del snapshot de la flota (última ubicación de cada barco).
+
+El snapshot se guarda como los bytes JSON ya renderizados de la respuesta de
+/api/ubicaciones/actuales/ junto con su ETag, de modo que los sondeos de los
+tableros no consultan MongoDB ni vuelven a serializar la flota. Se invalida con
+la señal `ubicaciones_actualizadas` cada vez que se escribe una ubicación.
+"""
+import hashlib
+import threading
+import time
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from port_control.renderers import ORJSONRenderer
+from ubicaciones.models import UbicacionBuque
+from ubicaciones.serializers import UbicacionBuqueSerializer
+
+Snapshot = Tuple[bytes, str]
+
+
+class MemoriaLocalBackend:
+    """
+    Guarda el snapshot en la memoria del proceso.
+    La invalidación solo alcanza al proceso que escribió la ubicación, por lo
+    que el TTL acota cuánto puede quedar desactualizado en otros workers.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._snapshot = None
+        self._expira = 0.0
+
+    def get(self) -> Optional[Snapshot]:
+        if self._snapshot is not None and time.monotonic() < self._expira:
+            return self._snapshot
+        return None
+
+    def set(self, snapshot: Snapshot):
+        self._snapshot = snapshot
+        self._expira = time.monotonic() + self.ttl
+
+    def delete(self):
+        self._snapshot = None
+
+
+class DjangoCacheBackend:
+    """
+    Guarda el snapshot en el framework de caché de Django (Redis, Memcached...).
+    Con una caché compartida la invalidación alcanza a todos los workers.
+    """
+
+    CLAVE = 'ubicaciones:snapshot_flota'
+
+    def __init__(self, ttl: int, alias: str = 'default'):
+        self.ttl = ttl
+        self._cache = caches[alias]
+
+    def get(self) -> Optional[Snapshot]:
+        return self._cache.get(self.CLAVE)
+
+    def set(self, snapshot: Snapshot):
+        self._cache.set(self.CLAVE, snapshot, self.ttl)
+
+    def delete(self):
+        self._cache.delete(self.CLAVE)
+
+
+def construir_snapshot() -> bytes:
+    """Consulta la flota y renderiza el cuerpo JSON de /api/ubicaciones/actuales/."""
+    ubicaciones = UbicacionBuque.get_todas_ubicaciones_actuales()
+    serializer = UbicacionBuqueSerializer(ubicaciones, many=True)
+    return ORJSONRenderer().render({
+        'success': True,
+        'count': len(ubicaciones),
+        'data': serializer.data
+    })
+
+
+class SnapshotFlota:
+    """
+    Mantiene el snapshot de la flota en un backend de caché.
+    Un solo hilo por proceso reconstruye el snapshot cuando falta; el contador
+    de generación evita guardar un snapshot construido antes de una invalidación.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._generacion = 0
+
+    def obtener(self) -> Snapshot:
+        """Retorna (cuerpo, etag), reconstruyendo el snapshot si no está en caché."""
+        snapshot = self.backend.get()
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            snapshot = self.backend.get()
+            if snapshot is not None:
+                return snapshot
+
+            generacion = self._generacion
+            cuerpo = construir_snapshot()
+            snapshot = (cuerpo, f'"{hashlib.sha1(cuerpo).hexdigest()}"')
+            if generacion == self._generacion:
+                self.backend.set(snapshot)
+            return snapshot
+
+    def invalidar(self):
+        """Descarta el snapshot actual."""
+        self._generacion += 1
+        self.backend.delete()
+
+
+_snapshot_flota = None
+
+
+def get_snapshot_flota() -> SnapshotFlota:
+    """Obtiene o crea el snapshot de la flota según la configuración."""
+    global _snapshot_flota
+
+    if _snapshot_flota is None:
+        ttl = settings.UBICACIONES_CACHE_TTL
+        if settings.UBICACIONES_CACHE_BACKEND == 'django':
+            backend = DjangoCacheBackend(ttl, settings.UBICACIONES_CACHE_ALIAS)
+        else:
+            backend = MemoriaLocalBackend(ttl)
+        _snapshot_flota = SnapshotFlota(backend)
+
+    return _snapshot_flota
+
+
+def invalidar_snapshot_flota(sender, **kwargs):
+    """Receptor de `ubicaciones_actualizadas`: invalida el snapshot de la flota."""
+    get_snapshot_flota().invalidar()
@@ -0,0 +1,171 @@
+"""
+Generador de tráfico sintético de ubicaciones para pruebas de carga.
+
+Cada shard (subconjunto de barcos agrupados por barco_id) se simula con un
+MotorSimulacion propio, en el proceso actual o en un worker de un pool, y
+escribe directamente en MongoDB o a través del endpoint de registro en lote.
+"""
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Dict, List
+
+from ubicaciones.models import UbicacionBuque
+from ubicaciones.simulacion import MotorSimulacion
+
+
+def repartir_en_shards(barco_ids: List[str], shards: int) -> List[List[str]]:
+    """Reparte los barcos en shards según su barco_id (UUID)."""
+    resultado = [[] for _ in range(shards)]
+    for barco_id in barco_ids:
+        resultado[uuid.UUID(barco_id).int % shards].append(barco_id)
+    return resultado
+
+
+def _a_formato_api(doc: dict) -> dict:
+    """Convierte un documento de MongoDB al formato de UbicacionBuqueSerializer."""
+    longitud, latitud = doc['ubicacion']['coordinates']
+    return {
+        'barco_id': doc['barco_id'],
+        'latitud': latitud,
+        'longitud': longitud,
+        'velocidad': doc['velocidad'],
+        'rumbo': doc['rumbo'],
+        'timestamp': doc['timestamp'].isoformat() + 'Z',
+        'estado': doc['estado'],
+        'metadata': doc['metadata'],
+    }
+
+
+class EmisorHTTP:
+    """Envía ubicaciones al endpoint /api/ubicaciones/registrar/lote/ como NDJSON."""
+
+    def __init__(self, url: str, token: str, lote: int = 5000, timeout: int = 30):
+        self.url = url
+        self.token = token
+        self.lote = lote
+        self.timeout = timeout
+
+    def enviar(self, docs: List[dict]):
+        """
+        Envía los documentos en peticiones de hasta `lote` ubicaciones.
+        Retorna (insertadas, rechazadas).
+        """
+        insertadas = 0
+        rechazadas = 0
+        for inicio in range(0, len(docs), self.lote):
+            trozo = docs[inicio:inicio + self.lote]
+            cuerpo = '\n'.join(json.dumps(_a_formato_api(doc)) for doc in trozo).encode()
+            peticion = urllib.request.Request(
+                self.url,
+                data=cuerpo,
+                method='POST',
+                headers={
+                    'Content-Type': 'application/x-ndjson',
+                    'Authorization': f'Bearer {self.token}',
+                }
+            )
+            try:
+                with urllib.request.urlopen(peticion, timeout=self.timeout) as respuesta:
+                    resultado = json.loads(respuesta.read())
+            except urllib.error.HTTPError as e:
+                try:
+                    resultado = json.loads(e.read())
+                except ValueError:
+                    resultado = {}
+                if 'insertadas' not in resultado:
+                    # Error de autenticación, del servidor, etc.: todo el trozo se pierde
+                    rechazadas += len(trozo)
+                    continue
+            except OSError:
+                # Conexión rechazada, timeout, DNS (URLError): el trozo se pierde
+                rechazadas += len(trozo)
+                continue
+
+            insertadas += resultado.get('insertadas', 0)
+            rechazadas += resultado.get('rechazadas', 0)
+
+        return insertadas, rechazadas
+
+
+def ejecutar_shard(config: Dict) -> Dict:
+    """
+    Simula un shard de barcos hasta cumplir las iteraciones o la duración.
+
+    Claves de `config`:
+        barco_ids: barcos del shard
+        sinteticos: si los barcos no existen en PostgreSQL (no se busca su última ubicación)
+        intervalo: segundos simulados por iteración
+        tasa: ubicaciones por segundo objetivo del shard (0 = una iteración por intervalo)
+        duracion: segundos de ejecución (0 = según iteraciones)
+        veces: iteraciones (None = sin límite)
+        destino: 'mongo' o 'http'
+        url, token, lote: configuración del emisor HTTP
+
+    Returns:
+        Estadísticas del shard: ubicaciones escritas, rechazadas, iteraciones y segundos
+    """
+    barco_ids = config['barco_ids']
+    motor = MotorSimulacion()
+
+    if config['sinteticos'] or config['destino'] == 'http':
+        motor.agregar_barcos(barco_ids)
+    else:
+        motor.agregar_barcos(barco_ids, UbicacionBuque.get_ultimas_ubicaciones(barco_ids))
+
+    emisor = None
+    if config['destino'] == 'http':
+        emisor = EmisorHTTP(config['url'], config['token'], config['lote'])
+
+    # Con tasa objetivo, cada iteración escribe todo el shard una vez
+    periodo = len(barco_ids) / config['tasa'] if config['tasa'] else config['intervalo']
+    fin = time.monotonic() + config['duracion'] if config['duracion'] else None
+
+    escritas = 0
+    rechazadas = 0
+    iteraciones = 0
+    inicio = time.monotonic()
+
+    try:
+        while True:
+            inicio_iteracion = time.monotonic()
+
+            if emisor:
+                motor.avanzar(config['intervalo'])
+                insertadas, fallidas = emisor.enviar(motor.documentos())
+            else:
+                insertadas = motor.paso(config['intervalo'])
+                fallidas = motor.total_barcos - insertadas
+
+            escritas += insertadas
+            rechazadas += fallidas
+            iteraciones += 1
+
+            if fin is not None:
+                if time.monotonic() >= fin:
+                    break
+            elif config['veces'] is not None and iteraciones >= config['veces']:
+                break
+
+            espera = periodo - (time.monotonic() - inicio_iteracion)
+            if fin is not None:
+                espera = min(espera, fin - time.monotonic())
+            if espera > 0:
+                time.sleep(espera)
+    except KeyboardInterrupt:
+        pass
+
+    return {
+        'escritas': escritas,
+        'rechazadas': rechazadas,
+        'iteraciones': iteraciones,
+        'segundos': time.monotonic() - inicio,
+    }
+
+
+def inicializar_worker():
+    """Configura Django en un proceso del pool (necesario con el método spawn)."""
+    import django
+    django.setup()
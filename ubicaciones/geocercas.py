@@ -0,0 +1,338 @@
+"""
+Geocercas: clasificación de ubicaciones en las zonas del puerto.
+
+Las zonas (ZonaPuerto con `geometria` GeoJSON) se cargan desde PostgreSQL en
+un índice espacial en memoria: una grilla de celdas fijas que asocia cada
+celda con las zonas cuyo rectángulo envolvente la toca. Clasificar una
+ubicación es buscar su celda y probar punto-en-polígono solo contra esas
+zonas. Las zonas también se replican en MongoDB (colección `zonas_puerto`
+con índice 2dsphere) para consultas geoespaciales del lado de la base.
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from pymongo import ReplaceOne
+
+from port_control.mongodb import get_mongo_db
+
+logger = logging.getLogger(__name__)
+
+ZONAS_COLLECTION_NAME = 'zonas_puerto'
+EVENTOS_COLLECTION_NAME = 'eventos_zonas'
+
+
+def _area_anillo(anillo: List[List[float]]) -> float:
+    """Área (en grados², sin signo) de un anillo con la fórmula del polígono."""
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(anillo, anillo[1:]):
+        area += x1 * y2 - x2 * y1
+    return abs(area) / 2
+
+
+def _punto_en_anillo(lon: float, lat: float, anillo: List[List[float]]) -> bool:
+    """Prueba punto-en-polígono por trazado de rayos sobre un anillo cerrado."""
+    dentro = False
+    for (x1, y1), (x2, y2) in zip(anillo, anillo[1:]):
+        if (y1 > lat) != (y2 > lat) and lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+            dentro = not dentro
+    return dentro
+
+
+def _puntos_en_anillo(lon: np.ndarray, lat: np.ndarray, anillo: List[List[float]]) -> np.ndarray:
+    """Versión vectorizada de _punto_en_anillo para arreglos de puntos."""
+    dentro = np.zeros(len(lon), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(anillo, anillo[1:]):
+        if y1 == y2:
+            continue
+        cruza = (y1 > lat) != (y2 > lat)
+        dentro ^= cruza & (lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1))
+    return dentro
+
+
+class Zona:
+    """Zona del puerto con su polígono (anillo exterior y huecos) en [lon, lat]."""
+
+    def __init__(self, zona_id: str, nombre: str, tipo: str, geometria: Dict[str, Any]):
+        self.id = zona_id
+        self.nombre = nombre
+        self.tipo = tipo
+        self.geometria = geometria
+        self.exterior, *self.huecos = geometria['coordinates']
+
+        lons = [x for x, _ in self.exterior]
+        lats = [y for _, y in self.exterior]
+        self.bbox = (min(lons), min(lats), max(lons), max(lats))
+        self.area = _area_anillo(self.exterior) - sum(_area_anillo(h) for h in self.huecos)
+
+    def contiene(self, lon: float, lat: float) -> bool:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+        if not _punto_en_anillo(lon, lat, self.exterior):
+            return False
+        return not any(_punto_en_anillo(lon, lat, hueco) for hueco in self.huecos)
+
+    def contiene_lote(self, lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        resultado = (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        candidatos = np.flatnonzero(resultado)
+        if len(candidatos) == 0:
+            return resultado
+
+        lon_c, lat_c = lon[candidatos], lat[candidatos]
+        dentro = _puntos_en_anillo(lon_c, lat_c, self.exterior)
+        for hueco in self.huecos:
+            dentro &= ~_puntos_en_anillo(lon_c, lat_c, hueco)
+        resultado[candidatos] = dentro
+        return resultado
+
+
+class IndiceZonas:
+    """
+    Índice espacial en grilla de las zonas del puerto.
+
+    Si una ubicación cae en varias zonas superpuestas (p. ej. un muelle dentro
+    del área portuaria) se clasifica en la de menor área, la más específica.
+    """
+
+    def __init__(self, zonas: List[Zona], celda: float):
+        # Orden por área: la primera zona que contiene el punto es la más específica
+        self.zonas = sorted(zonas, key=lambda zona: zona.area)
+        self.celda = celda
+        self.celdas: Dict[tuple, List[Zona]] = defaultdict(list)
+        for zona in self.zonas:
+            min_lon, min_lat, max_lon, max_lat = zona.bbox
+            for ix in range(self._celda(min_lon), self._celda(max_lon) + 1):
+                for iy in range(self._celda(min_lat), self._celda(max_lat) + 1):
+                    self.celdas[(ix, iy)].append(zona)
+
+    def __len__(self):
+        return len(self.zonas)
+
+    def _celda(self, valor: float) -> int:
+        return math.floor(valor / self.celda)
+
+    def clasificar(self, lon: float, lat: float) -> Optional[Zona]:
+        """Zona que contiene el punto, o None si está fuera de todas."""
+        for zona in self.celdas.get((self._celda(lon), self._celda(lat)), ()):
+            if zona.contiene(lon, lat):
+                return zona
+        return None
+
+    def clasificar_lote(self, lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+        """
+        Clasifica arreglos de puntos. Retorna, por punto, la posición de su
+        zona en `self.zonas` o -1 si no pertenece a ninguna.
+        """
+        resultado = np.full(len(lon), -1, dtype=np.int32)
+        for posicion, zona in enumerate(self.zonas):
+            pendientes = np.flatnonzero(resultado < 0)
+            if len(pendientes) == 0:
+                break
+            dentro = zona.contiene_lote(lon[pendientes], lat[pendientes])
+            resultado[pendientes[dentro]] = posicion
+        return resultado
+
+
+_indice: Optional[IndiceZonas] = None
+_indice_cargado = 0.0
+_lock = threading.Lock()
+
+
+def cargar_zonas() -> List[Zona]:
+    """Lee de PostgreSQL las zonas que tienen geometría."""
+    from zonas_puerto.models import ZonaPuerto
+
+    return [
+        Zona(str(zona_id), nombre, tipo, geometria)
+        for zona_id, nombre, tipo, geometria in ZonaPuerto.objects.filter(
+            geometria__isnull=False
+        ).values_list('id', 'nombre', 'tipo', 'geometria')
+    ]
+
+
+def get_indice() -> IndiceZonas:
+    """
+    Retorna el índice de zonas del proceso. Se reconstruye al vencer
+    UBICACIONES_GEOCERCAS_TTL para tomar cambios hechos por otros procesos;
+    los cambios en este proceso lo invalidan de inmediato.
+    """
+    global _indice, _indice_cargado
+
+    indice = _indice
+    if indice is not None and time.monotonic() - _indice_cargado < settings.UBICACIONES_GEOCERCAS_TTL:
+        return indice
+
+    with _lock:
+        if _indice is None or time.monotonic() - _indice_cargado >= settings.UBICACIONES_GEOCERCAS_TTL:
+            _indice = IndiceZonas(cargar_zonas(), settings.UBICACIONES_GEOCERCAS_CELDA)
+            _indice_cargado = time.monotonic()
+        return _indice
+
+
+async def aget_indice() -> IndiceZonas:
+    """Versión asíncrona de get_indice: la recarga desde PostgreSQL corre en un hilo."""
+    indice = _indice
+    if indice is not None and time.monotonic() - _indice_cargado < settings.UBICACIONES_GEOCERCAS_TTL:
+        return indice
+    return await sync_to_async(get_indice, thread_sensitive=False)()
+
+
+def invalidar_indice():
+    """Descarta el índice del proceso; se reconstruye en la próxima clasificación."""
+    global _indice
+    with _lock:
+        _indice = None
+
+
+def clasificar_documentos(docs: List[Dict[str, Any]], indice: Optional[IndiceZonas] = None):
+    """Asigna `zona_id` a documentos en el formato de UbicacionBuque.to_dict()."""
+    indice = indice or get_indice()
+    for doc in docs:
+        zona = indice.clasificar(*doc['ubicacion']['coordinates']) if len(indice) else None
+        doc['zona_id'] = zona.id if zona else None
+
+
+def registrar_transiciones(docs: List[Dict[str, Any]], previas: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Registra eventos de entrada y salida de zona en la colección `eventos_zonas`.
+
+    Args:
+        docs: ubicaciones recién insertadas (con _id y zona_id)
+        previas: última ubicación conocida de cada barco antes de insertarlas
+            ({barco_id: {'zona_id', 'timestamp'}})
+
+    Returns:
+        Número de eventos registrados
+    """
+    eventos = calcular_transiciones(docs, previas)
+    if eventos:
+        get_mongo_db()[EVENTOS_COLLECTION_NAME].insert_many(eventos, ordered=False)
+    return len(eventos)
+
+
+def calcular_transiciones(docs: List[Dict[str, Any]], previas: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Eventos de entrada/salida que producen `docs` respecto de `previas`, en orden temporal."""
+    from ubicaciones.models import _a_utc_naive
+
+    por_barco = defaultdict(list)
+    for doc in docs:
+        por_barco[doc['barco_id']].append(doc)
+
+    eventos = []
+    for barco_id, ubicaciones in por_barco.items():
+        previa = previas.get(barco_id, {})
+        zona_actual = previa.get('zona_id')
+        ultimo = previa.get('timestamp')
+
+        for doc in sorted(ubicaciones, key=lambda d: _a_utc_naive(d['timestamp'])):
+            # Las ubicaciones atrasadas no alteran la zona vigente
+            momento = _a_utc_naive(doc['timestamp'])
+            if ultimo is not None and momento <= ultimo:
+                continue
+            ultimo = momento
+
+            zona = doc.get('zona_id')
+            if zona == zona_actual:
+                continue
+            if zona_actual:
+                eventos.append(_evento('salida', barco_id, zona_actual, doc))
+            if zona:
+                eventos.append(_evento('entrada', barco_id, zona, doc))
+            zona_actual = zona
+
+    return eventos
+
+
+def _evento(tipo: str, barco_id: str, zona_id: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'tipo': tipo,
+        'barco_id': barco_id,
+        'zona_id': zona_id,
+        'timestamp': doc['timestamp'],
+        'ubicacion': doc['ubicacion'],
+        'ubicacion_id': doc['_id'],
+    }
+
+
+def get_eventos(barco_id: Optional[str] = None, zona_id: Optional[str] = None,
+                limite: int = 100) -> list:
+    """Eventos de entrada/salida más recientes, filtrados por barco y/o zona."""
+    filtro = {}
+    if barco_id:
+        filtro['barco_id'] = barco_id
+    if zona_id:
+        filtro['zona_id'] = zona_id
+
+    eventos = []
+    for doc in get_mongo_db()[EVENTOS_COLLECTION_NAME].find(filtro).sort('timestamp', -1).limit(limite):
+        doc['_id'] = str(doc['_id'])
+        doc['ubicacion_id'] = str(doc['ubicacion_id'])
+        eventos.append(doc)
+    return eventos
+
+
+def create_indexes():
+    """Índices de la réplica de zonas y de los eventos."""
+    db = get_mongo_db()
+    db[ZONAS_COLLECTION_NAME].create_index([('geometria', '2dsphere')])
+    db[EVENTOS_COLLECTION_NAME].create_index([('barco_id', 1), ('timestamp', -1)])
+    db[EVENTOS_COLLECTION_NAME].create_index([('zona_id', 1), ('timestamp', -1)])
+
+
+def sincronizar_zonas() -> int:
+    """Replica en MongoDB todas las zonas con geometría y elimina las sobrantes."""
+    zonas = cargar_zonas()
+    coleccion = get_mongo_db()[ZONAS_COLLECTION_NAME]
+    if zonas:
+        coleccion.bulk_write([
+            ReplaceOne(
+                {'_id': zona.id},
+                _documento_zona(zona.id, zona.nombre, zona.tipo, zona.geometria),
+                upsert=True
+            )
+            for zona in zonas
+        ], ordered=False)
+    coleccion.delete_many({'_id': {'$nin': [zona.id for zona in zonas]}})
+    return len(zonas)
+
+
+def _documento_zona(zona_id: str, nombre: str, tipo: str, geometria: Dict[str, Any]) -> Dict[str, Any]:
+    return {'_id': zona_id, 'nombre': nombre, 'tipo': tipo, 'geometria': geometria}
+
+
+def zona_guardada(sender, instance, **kwargs):
+    """
+    Receptor de post_save de ZonaPuerto: actualiza la réplica y el índice.
+    Un fallo de MongoDB no impide guardar la zona; `init_mongodb` vuelve a
+    sincronizar la réplica completa.
+    """
+    invalidar_indice()
+    try:
+        coleccion = get_mongo_db()[ZONAS_COLLECTION_NAME]
+        if instance.geometria:
+            coleccion.replace_one(
+                {'_id': str(instance.id)},
+                _documento_zona(str(instance.id), instance.nombre, instance.tipo, instance.geometria),
+                upsert=True
+            )
+        else:
+            coleccion.delete_one({'_id': str(instance.id)})
+    except Exception as e:
+        logger.warning(f'No se pudo replicar la zona {instance.id} en MongoDB: {e}')
+
+
+def zona_eliminada(sender, instance, **kwargs):
+    """Receptor de post_delete de ZonaPuerto."""
+    invalidar_indice()
+    try:
+        get_mongo_db()[ZONAS_COLLECTION_NAME].delete_one({'_id': str(instance.id)})
+    except Exception as e:
+        logger.warning(f'No se pudo eliminar la zona {instance.id} de MongoDB: {e}')
@@ -3,8 +3,9 @@ Comando de gestión para inicializar los índices de MongoDB.
 Ejecutar: python manage.py init_mongodb
 """
 from django.core.management.base import BaseCommand
+from ubicaciones import geocercas
 from ubicaciones.models import UbicacionBuque
-from port_control.mongodb import test_connection
+from port_control.mongodb import get_mongo_db, test_connection
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,17 +36,36 @@ class Command(BaseCommand):
             return
         
         try:
+            # Crear el historial como time-series si está habilitado y aún no existe
+            if UbicacionBuque.es_timeseries():
+                if UbicacionBuque.COLLECTION_NAME not in get_mongo_db().list_collection_names():
+                    UbicacionBuque.crear_coleccion_timeseries()
+                    self.stdout.write('Colección time-series "ubicaciones_buques" creada')
+            
             # Crear índices
             UbicacionBuque.create_indexes()
+            geocercas.create_indexes()
+            
+            # Replicar las zonas del puerto con geometría
+            zonas = geocercas.sincronizar_zonas()
             
             self.stdout.write(
                 self.style.SUCCESS('✅ Índices de MongoDB creados exitosamente')
             )
             self.stdout.write('Índices creados:')
             self.stdout.write('  - Geoespacial 2dsphere en "ubicacion"')
-            self.stdout.write('  - Índice en "barco_id"')
-            self.stdout.write('  - Índice en "timestamp"')
-            self.stdout.write('  - Índice compuesto (barco_id, timestamp)')
+            if UbicacionBuque.es_timeseries():
+                self.stdout.write('  - Índice compuesto (barco_id, timestamp)')
+            else:
+                self.stdout.write('  - Índice en "barco_id"')
+                self.stdout.write('  - Índice en "timestamp"')
+                self.stdout.write('  - Índice compuesto (barco_id, timestamp)')
+                self.stdout.write('  - Índice compuesto (barco_id, timestamp, _id)')
+            self.stdout.write('  - Geoespacial 2dsphere en "ubicaciones_actuales.ubicacion"')
+            self.stdout.write('  - Índice compuesto (barco_id, inicio) en los resúmenes por hora y día')
+            self.stdout.write('  - Geoespacial 2dsphere en "zonas_puerto.geometria"')
+            self.stdout.write('  - Índices (barco_id, timestamp) y (zona_id, timestamp) en "eventos_zonas"')
+            self.stdout.write(f'Zonas del puerto replicadas: {zonas}')
             
         except Exception as e:
             self.stdout.write(
@@ -0,0 +1,131 @@
+"""
+Comando para migrar el historial de ubicaciones a una colección time-series.
+Ejecutar: python manage.py migrar_ubicaciones_timeseries
+"""
+from django.core.management.base import BaseCommand
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from ubicaciones.models import UbicacionBuque
+from port_control.mongodb import get_mongo_db, test_connection
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Migra ubicaciones_buques a una colección time-series (MongoDB 5.0+): renombra la '
+        'colección actual a ubicaciones_buques_legacy y copia sus documentos por lotes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=10000,
+            help='Documentos por lote de copia (default: 10000)',
+        )
+        parser.add_argument(
+            '--desde-id',
+            type=str,
+            default=None,
+            help='Reanudar la copia desde este _id de la colección legacy (exclusivo)',
+        )
+        parser.add_argument(
+            '--eliminar-legacy',
+            action='store_true',
+            help='Eliminar ubicaciones_buques_legacy al terminar la copia',
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+
+        if not test_connection():
+            self.stdout.write(
+                self.style.ERROR('❌ Error: No se pudo conectar a MongoDB')
+            )
+            return
+
+        db = get_mongo_db()
+        version = db.client.server_info()['versionArray']
+        if version[0] < 5:
+            self.stdout.write(
+                self.style.ERROR('❌ Las colecciones time-series requieren MongoDB 5.0 o superior')
+            )
+            return
+
+        colecciones = {c['name']: c for c in db.list_collections()}
+        actual = colecciones.get(UbicacionBuque.COLLECTION_NAME)
+
+        # 1. Renombrar el historial original (MongoDB no permite renombrar time-series)
+        if actual and actual.get('type') != 'timeseries':
+            if UbicacionBuque.LEGACY_COLLECTION_NAME in colecciones:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f'❌ Ya existen {UbicacionBuque.COLLECTION_NAME} y '
+                        f'{UbicacionBuque.LEGACY_COLLECTION_NAME}; revisa una migración anterior'
+                    )
+                )
+                return
+            db[UbicacionBuque.COLLECTION_NAME].rename(UbicacionBuque.LEGACY_COLLECTION_NAME)
+            self.stdout.write(f'Historial renombrado a {UbicacionBuque.LEGACY_COLLECTION_NAME}')
+            actual = None
+
+        # 2. Crear la colección time-series
+        if actual is None:
+            UbicacionBuque.crear_coleccion_timeseries()
+            self.stdout.write(self.style.SUCCESS('✅ Colección time-series creada'))
+        else:
+            self.stdout.write('La colección time-series ya existe')
+
+        # 3. Copiar por lotes en orden de _id
+        legacy = db[UbicacionBuque.LEGACY_COLLECTION_NAME]
+        destino = UbicacionBuque.get_collection()
+        filtro = {}
+        if options['desde_id']:
+            filtro = {'_id': {'$gt': ObjectId(options['desde_id'])}}
+
+        total = legacy.count_documents(filtro)
+        copiados = 0
+        inicio = time.monotonic()
+        self.stdout.write(f'Copiando {total} ubicaciones en lotes de {lote}...')
+
+        try:
+            while True:
+                docs = list(legacy.find(filtro).sort('_id', 1).limit(lote))
+                if not docs:
+                    break
+
+                try:
+                    destino.insert_many(docs, ordered=False)
+                except BulkWriteError as e:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"⚠️  {len(e.details.get('writeErrors', []))} documentos rechazados en el lote"
+                        )
+                    )
+
+                copiados += len(docs)
+                ultimo_id = docs[-1]['_id']
+                filtro = {'_id': {'$gt': ultimo_id}}
+                self.stdout.write(f'  {copiados}/{total} (último _id: {ultimo_id})')
+
+        except KeyboardInterrupt:
+            self.stdout.write(
+                self.style.WARNING('\n⚠️  Copia interrumpida; reanudar con --desde-id')
+            )
+            return
+
+        duracion = time.monotonic() - inicio
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {copiados} ubicaciones copiadas en {duracion:.1f}s')
+        )
+
+        UbicacionBuque.create_indexes()
+        self.stdout.write('Índices creados')
+
+        if options['eliminar_legacy']:
+            legacy.drop()
+            self.stdout.write(f'{UbicacionBuque.LEGACY_COLLECTION_NAME} eliminada')
+
+        self.stdout.write(
+            self.style.WARNING('Recuerda definir UBICACIONES_TIMESERIES=True en el entorno')
+        )
@@ -0,0 +1,46 @@
+"""
+Comando de gestión para reconstruir la colección de ubicaciones actuales.
+Ejecutar: python manage.py reconstruir_ubicaciones_actuales
+"""
+from django.core.management.base import BaseCommand
+from ubicaciones.models import UbicacionBuque
+from port_control.mongodb import test_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye la colección ubicaciones_actuales (última ubicación por barco) '
+        'a partir del historial ubicaciones_buques'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limpiar',
+            action='store_true',
+            help='Vaciar la colección antes de reconstruirla (descarta barcos sin historial)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconstruyendo ubicaciones actuales...')
+        
+        if not test_connection():
+            self.stdout.write(
+                self.style.ERROR('❌ Error: No se pudo conectar a MongoDB')
+            )
+            return
+        
+        try:
+            UbicacionBuque.get_collection_actuales().create_index([("ubicacion", "2dsphere")])
+            total = UbicacionBuque.reconstruir_actuales(limpiar=options['limpiar'])
+            
+            self.stdout.write(
+                self.style.SUCCESS(f'✅ Ubicaciones actuales reconstruidas: {total} barcos')
+            )
+            
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'❌ Error al reconstruir ubicaciones actuales: {e}')
+            )
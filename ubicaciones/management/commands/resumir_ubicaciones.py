@@ -0,0 +1,74 @@
+"""
+Comando para calcular los resúmenes por hora y por día del historial de ubicaciones.
+Ejecutar: python manage.py resumir_ubicaciones
+"""
+from django.core.management.base import BaseCommand
+from datetime import datetime, timedelta
+from ubicaciones.models import UbicacionBuque
+from port_control.mongodb import test_connection
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Calcula los resúmenes por barco y por hora/día de las ubicaciones recientes. '
+        'Programarlo (cron) con una frecuencia menor que la retención de ubicaciones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=int,
+            default=2,
+            help='Horas hacia atrás a resumir por hora (default: 2)',
+        )
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=2,
+            help='Días hacia atrás a resumir por día (default: 2)',
+        )
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Repetir el resumen periódicamente hasta que se detenga (Ctrl+C)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=900,
+            help='Segundos entre resúmenes en modo continuo (default: 900)',
+        )
+
+    def handle(self, *args, **options):
+        if not test_connection():
+            self.stdout.write(
+                self.style.ERROR('❌ Error: No se pudo conectar a MongoDB')
+            )
+            return
+
+        try:
+            while True:
+                ahora = datetime.utcnow()
+
+                por_hora = UbicacionBuque.resumir('hora', ahora - timedelta(hours=options['horas']))
+                por_dia = UbicacionBuque.resumir('dia', ahora - timedelta(days=options['dias']))
+
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'✅ Resúmenes actualizados: {por_hora} por hora, {por_dia} por día'
+                    )
+                )
+
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+
+        except KeyboardInterrupt:
+            self.stdout.write(
+                self.style.WARNING('\n⚠️  Resumen detenido por el usuario')
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'❌ Error al resumir ubicaciones: {e}')
+            )
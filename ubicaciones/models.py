@@ -2,12 +2,27 @@
 Modelos para el sistema de ubicación en tiempo real de buques.
 Estos modelos se almacenan en MongoDB.
 """
-from datetime import datetime
-from typing import Optional, Dict, Any
-from port_control.mongodb import get_mongo_db
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+from django.conf import settings
+from port_control.mongodb import get_mongo_db, get_mongo_db_async
+from ubicaciones import geocercas
+from ubicaciones.signals import ubicaciones_actualizadas
 from bson import ObjectId
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
 import json
 
+# Código de error de MongoDB para violaciones de índice único
+CODIGO_CLAVE_DUPLICADA = 11000
+
+
+def _a_utc_naive(momento: datetime) -> datetime:
+    """Normaliza un datetime a UTC sin zona horaria, como lo devuelve MongoDB."""
+    if momento.tzinfo is not None:
+        return momento.astimezone(timezone.utc).replace(tzinfo=None)
+    return momento
+
 
 class UbicacionBuque:
     """
@@ -16,11 +31,34 @@ class UbicacionBuque:
     """
     
     COLLECTION_NAME = 'ubicaciones_buques'
+    # Campos de la API y el campo de MongoDB que los contiene
+    CAMPOS_MONGO = {
+        'id': '_id',
+        'barco_id': 'barco_id',
+        'latitud': 'ubicacion',
+        'longitud': 'ubicacion',
+        'velocidad': 'velocidad',
+        'rumbo': 'rumbo',
+        'timestamp': 'timestamp',
+        'estado': 'estado',
+        'metadata': 'metadata',
+        'zona_id': 'zona_id',
+    }
+    # Colección materializada con la última ubicación de cada barco (_id = barco_id)
+    ACTUALES_COLLECTION_NAME = 'ubicaciones_actuales'
+    # Colección a la que se renombra el historial original al migrarlo a time-series
+    LEGACY_COLLECTION_NAME = 'ubicaciones_buques_legacy'
+    # Resúmenes por nivel: (colección, segundos por intervalo)
+    RESUMENES = {
+        'hora': ('ubicaciones_resumen_hora', 3600),
+        'dia': ('ubicaciones_resumen_dia', 86400),
+    }
     
     def __init__(self, barco_id: str, latitud: float, longitud: float, 
                  velocidad: float = 0.0, rumbo: float = 0.0, 
                  timestamp: Optional[datetime] = None, 
-                 estado: str = 'en_transito', metadata: Optional[Dict] = None):
+                 estado: str = 'en_transito', metadata: Optional[Dict] = None,
+                 zona_id: Optional[str] = None, id: Optional[str] = None):
         """
         Inicializa una ubicación de buque.
         
@@ -33,7 +71,10 @@ class UbicacionBuque:
             timestamp: Fecha y hora de la ubicación (default: ahora)
             estado: Estado del buque (en_transito, atracado, fondeado, etc.)
             metadata: Información adicional (altura, calado, etc.)
+            zona_id: Zona del puerto en la que se encuentra (asignada al guardar)
+            id: _id del documento en el historial (asignado al guardar o al leer)
         """
+        self.id = id
         self.barco_id = barco_id
         self.latitud = latitud
         self.longitud = longitud
@@ -42,6 +83,7 @@ class UbicacionBuque:
         self.timestamp = timestamp or datetime.utcnow()
         self.estado = estado
         self.metadata = metadata or {}
+        self.zona_id = zona_id
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte la ubicación a un diccionario para MongoDB."""
@@ -55,7 +97,8 @@ class UbicacionBuque:
             'rumbo': self.rumbo,
             'timestamp': self.timestamp,
             'estado': self.estado,
-            'metadata': self.metadata
+            'metadata': self.metadata,
+            'zona_id': self.zona_id
         }
     
     @classmethod
@@ -63,6 +106,8 @@ class UbicacionBuque:
         """Crea una instancia desde un diccionario de MongoDB."""
         ubicacion = data.get('ubicacion', {})
         coords = ubicacion.get('coordinates', [0, 0])
+        # En ubicaciones_actuales el _id es el barco; el del historial es ubicacion_id
+        documento_id = data.get('ubicacion_id', data.get('_id'))
         
         return cls(
             barco_id=data.get('barco_id'),
@@ -72,7 +117,9 @@ class UbicacionBuque:
             rumbo=data.get('rumbo', 0.0),
             timestamp=data.get('timestamp'),
             estado=data.get('estado', 'en_transito'),
-            metadata=data.get('metadata', {})
+            metadata=data.get('metadata', {}),
+            zona_id=data.get('zona_id'),
+            id=str(documento_id) if documento_id is not None else None
         )
     
     @classmethod
@@ -81,6 +128,72 @@ class UbicacionBuque:
         db = get_mongo_db()
         return db[cls.COLLECTION_NAME]
     
+    @classmethod
+    def get_collection_actuales(cls):
+        """Obtiene la colección de MongoDB con la última ubicación de cada barco."""
+        db = get_mongo_db()
+        return db[cls.ACTUALES_COLLECTION_NAME]
+    
+    @classmethod
+    def get_collection_resumen(cls, nivel: str):
+        """Obtiene la colección de resúmenes del nivel indicado ('hora' o 'dia')."""
+        db = get_mongo_db()
+        return db[cls.RESUMENES[nivel][0]]
+    
+    # Variantes con el cliente asíncrono, para las vistas ASGI (views_async.py)
+    
+    @classmethod
+    def get_collection_async(cls):
+        return get_mongo_db_async()[cls.COLLECTION_NAME]
+    
+    @classmethod
+    def get_collection_actuales_async(cls):
+        return get_mongo_db_async()[cls.ACTUALES_COLLECTION_NAME]
+    
+    @classmethod
+    def get_collection_resumen_async(cls, nivel: str):
+        return get_mongo_db_async()[cls.RESUMENES[nivel][0]]
+    
+    @classmethod
+    def _desde_documento(cls, doc: Dict[str, Any]) -> 'UbicacionBuque':
+        """Crea una instancia desde un documento crudo de MongoDB."""
+        doc['_id'] = str(doc['_id'])  # Convertir ObjectId a string
+        return cls.from_dict(doc)
+    
+    @classmethod
+    def es_timeseries(cls) -> bool:
+        """Indica si el historial se almacena en una colección time-series."""
+        return settings.UBICACIONES_TIMESERIES
+    
+    @classmethod
+    def crear_coleccion_timeseries(cls):
+        """
+        Crea el historial como colección time-series de MongoDB (5.0+), con
+        timestamp como timeField y barco_id como metaField. Si hay retención
+        configurada, las ubicaciones expiran pasados UBICACIONES_RETENCION_DIAS.
+        """
+        db = get_mongo_db()
+        opciones = {
+            'timeseries': {
+                'timeField': 'timestamp',
+                'metaField': 'barco_id',
+                'granularity': 'seconds'
+            }
+        }
+        if settings.UBICACIONES_RETENCION_DIAS:
+            opciones['expireAfterSeconds'] = settings.UBICACIONES_RETENCION_DIAS * 86400
+        
+        db.create_collection(cls.COLLECTION_NAME, **opciones)
+    
+    @classmethod
+    def configurar_retencion(cls, dias: int):
+        """
+        Cambia la expiración de las ubicaciones de la colección time-series.
+        Con 0 dias las ubicaciones dejan de expirar.
+        """
+        db = get_mongo_db()
+        db.command('collMod', cls.COLLECTION_NAME, expireAfterSeconds=dias * 86400 if dias else 'off')
+    
     @classmethod
     def create_indexes(cls):
         """
@@ -88,20 +201,38 @@ class UbicacionBuque:
         - Índice geoespacial 2dsphere para búsquedas por ubicación
         - Índice en barco_id para búsquedas por barco
         - Índice en timestamp para búsquedas temporales
+        
+        En modo time-series MongoDB ya organiza los documentos por barco_id y
+        timestamp, por lo que solo se crean el índice geoespacial y el
+        compuesto (barco_id, timestamp).
         """
         collection = cls.get_collection()
         
         # Índice geoespacial
         collection.create_index([("ubicacion", "2dsphere")])
         
-        # Índice en barco_id
-        collection.create_index([("barco_id", 1)])
+        if cls.es_timeseries():
+            collection.create_index([("barco_id", 1), ("timestamp", 1)])
+        else:
+            # Índice en barco_id
+            collection.create_index([("barco_id", 1)])
+            
+            # Índice en timestamp (descendente para obtener las más recientes primero)
+            collection.create_index([("timestamp", -1)])
+            
+            # Índice compuesto para búsquedas por barco y tiempo
+            collection.create_index([("barco_id", 1), ("timestamp", -1)])
+            
+            # Índice para la paginación por clave (timestamp, _id) del historial
+            collection.create_index([("barco_id", 1), ("timestamp", 1), ("_id", 1)])
         
-        # Índice en timestamp (descendente para obtener las más recientes primero)
-        collection.create_index([("timestamp", -1)])
+        # Índice geoespacial en la colección de ubicaciones actuales
+        # (el _id ya es el barco_id, no requiere índice adicional)
+        cls.get_collection_actuales().create_index([("ubicacion", "2dsphere")])
         
-        # Índice compuesto para búsquedas por barco y tiempo
-        collection.create_index([("barco_id", 1), ("timestamp", -1)])
+        # Índice para consultar los resúmenes de un barco por tiempo
+        for nivel in cls.RESUMENES:
+            cls.get_collection_resumen(nivel).create_index([("barco_id", 1), ("inicio", 1)])
     
     def save(self) -> str:
         """
@@ -110,23 +241,352 @@ class UbicacionBuque:
         """
         collection = self.get_collection()
         data = self.to_dict()
+        geocercas.clasificar_documentos([data])
+        self.zona_id = data['zona_id']
         result = collection.insert_one(data)
-        return str(result.inserted_id)
+        self._actualizar_actuales([data])
+        self.id = str(result.inserted_id)
+        return self.id
+    
+    async def asave(self) -> str:
+        """Versión asíncrona de save()."""
+        data = self.to_dict()
+        geocercas.clasificar_documentos([data], await geocercas.aget_indice())
+        self.zona_id = data['zona_id']
+        result = await self.get_collection_async().insert_one(data)
+        await self._aactualizar_actuales([data])
+        self.id = str(result.inserted_id)
+        return self.id
+    
+    @staticmethod
+    def _recientes(docs: List[Dict[str, Any]]) -> Dict[str, Dict]:
+        """Ubicación más reciente de cada barco del lote."""
+        recientes = {}
+        for doc in docs:
+            actual = recientes.get(doc['barco_id'])
+            if actual is None or _a_utc_naive(doc['timestamp']) >= _a_utc_naive(actual['timestamp']):
+                recientes[doc['barco_id']] = doc
+        return recientes
+    
+    @staticmethod
+    def _reemplazos(recientes: Dict[str, Dict],
+                    previas: Optional[Dict[str, Dict]] = None) -> List[ReplaceOne]:
+        """
+        Reemplazos condicionales en la colección de actuales: solo si la
+        ubicación nueva es igual o más reciente que la almacenada y, si se
+        pasan `previas`, si la zona almacenada sigue siendo la leída.
+        """
+        operaciones = []
+        for barco_id, doc in recientes.items():
+            filtro = {'_id': barco_id, 'timestamp': {'$lte': doc['timestamp']}}
+            if previas is not None:
+                filtro['zona_id'] = previas.get(barco_id, {}).get('zona_id')
+            operaciones.append(ReplaceOne(
+                filtro,
+                dict(doc, _id=barco_id, ubicacion_id=doc['_id']),
+                upsert=True
+            ))
+        return operaciones
+    
+    @staticmethod
+    def _vigentes(recientes: Dict[str, Dict], previas: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Descarta los barcos cuya ubicación almacenada ya es más nueva que la del lote."""
+        return {
+            barco_id: doc for barco_id, doc in recientes.items()
+            if barco_id not in previas
+            or _a_utc_naive(previas[barco_id]['timestamp']) <= _a_utc_naive(doc['timestamp'])
+        }
+    
+    @staticmethod
+    def _sigue_zonas(docs: List[Dict[str, Any]], indice) -> bool:
+        """Indica si hay que comparar con la zona previa de cada barco para registrar eventos."""
+        return bool(len(indice) or any(doc.get('zona_id') for doc in docs))
+    
+    @staticmethod
+    def _descartar_duplicados(e: BulkWriteError):
+        """Relanza el error salvo que solo contenga choques de _id esperados."""
+        otros = [
+            error for error in e.details.get('writeErrors', [])
+            if error.get('code') != CODIGO_CLAVE_DUPLICADA
+        ]
+        if otros:
+            raise e
+    
+    @classmethod
+    def _rechazados(cls, e: BulkWriteError, barcos: List[str]) -> set:
+        """Barcos cuyo reemplazo no coincidió con el documento almacenado."""
+        cls._descartar_duplicados(e)
+        return {barcos[error['index']] for error in e.details.get('writeErrors', [])}
+    
+    @classmethod
+    def _actualizar_actuales(cls, docs: List[Dict[str, Any]]):
+        """
+        Actualiza la colección de ubicaciones actuales con los documentos
+        recién insertados en el historial.
+        
+        Solo se reemplaza la ubicación de un barco si la nueva es igual o más
+        reciente que la almacenada: el filtro por timestamp no coincide con
+        una ubicación más nueva y el upsert choca con el _id existente, error
+        que se descarta.
+        
+        Con geocercas, los eventos de entrada/salida se calculan contra la zona
+        leída antes de escribir, y el reemplazo solo se aplica si esa zona no
+        cambió; si otro escritor la cambió entretanto, se vuelve a leer y a
+        intentar (ver _actualizar_con_zonas).
+        """
+        recientes = cls._recientes(docs)
+        if not recientes:
+            return
+        
+        if cls._sigue_zonas(docs, geocercas.get_indice()):
+            cls._actualizar_con_zonas(docs, recientes)
+        else:
+            try:
+                cls.get_collection_actuales().bulk_write(cls._reemplazos(recientes), ordered=False)
+            except BulkWriteError as e:
+                cls._descartar_duplicados(e)
+        
+        ubicaciones_actualizadas.send(sender=cls, docs=list(recientes.values()))
+    
+    @classmethod
+    def _actualizar_con_zonas(cls, docs: List[Dict[str, Any]], recientes: Dict[str, Dict]):
+        """
+        Reemplaza las ubicaciones actuales condicionadas a la zona leída y
+        registra los eventos de los barcos cuyo reemplazo se aplicó. Los que
+        chocan con otro escritor se reintentan hasta UBICACIONES_INTENTOS_ZONA
+        veces; el último intento ya no exige la zona, para no perder la
+        ubicación, y sus eventos pueden quedar desfasados.
+        """
+        collection = cls.get_collection_actuales()
+        pendientes = recientes
+        intentos = settings.UBICACIONES_INTENTOS_ZONA
+        for intento in range(1, intentos + 1):
+            previas = {
+                doc['_id']: doc for doc in collection.find(
+                    {'_id': {'$in': list(pendientes)}},
+                    {'zona_id': 1, 'timestamp': 1}
+                )
+            }
+            pendientes = cls._vigentes(pendientes, previas)
+            if not pendientes:
+                return
+            
+            rechazados = set()
+            try:
+                collection.bulk_write(
+                    cls._reemplazos(pendientes, previas if intento < intentos else None),
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                rechazados = cls._rechazados(e, list(pendientes))
+            
+            geocercas.registrar_transiciones(
+                [doc for doc in docs if doc['barco_id'] in pendientes and doc['barco_id'] not in rechazados],
+                previas
+            )
+            pendientes = {barco_id: pendientes[barco_id] for barco_id in rechazados}
+            if not pendientes:
+                return
+    
+    @classmethod
+    async def _aactualizar_actuales(cls, docs: List[Dict[str, Any]]):
+        """Versión asíncrona de _actualizar_actuales()."""
+        recientes = cls._recientes(docs)
+        if not recientes:
+            return
+        
+        if cls._sigue_zonas(docs, await geocercas.aget_indice()):
+            await cls._aactualizar_con_zonas(docs, recientes)
+        else:
+            try:
+                await cls.get_collection_actuales_async().bulk_write(cls._reemplazos(recientes), ordered=False)
+            except BulkWriteError as e:
+                cls._descartar_duplicados(e)
+        
+        await ubicaciones_actualizadas.asend(sender=cls, docs=list(recientes.values()))
+    
+    @classmethod
+    async def _aactualizar_con_zonas(cls, docs: List[Dict[str, Any]], recientes: Dict[str, Dict]):
+        """Versión asíncrona de _actualizar_con_zonas()."""
+        collection = cls.get_collection_actuales_async()
+        pendientes = recientes
+        intentos = settings.UBICACIONES_INTENTOS_ZONA
+        for intento in range(1, intentos + 1):
+            previas = {
+                doc['_id']: doc async for doc in collection.find(
+                    {'_id': {'$in': list(pendientes)}},
+                    {'zona_id': 1, 'timestamp': 1}
+                )
+            }
+            pendientes = cls._vigentes(pendientes, previas)
+            if not pendientes:
+                return
+            
+            rechazados = set()
+            try:
+                await collection.bulk_write(
+                    cls._reemplazos(pendientes, previas if intento < intentos else None),
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                rechazados = cls._rechazados(e, list(pendientes))
+            
+            eventos = geocercas.calcular_transiciones(
+                [doc for doc in docs if doc['barco_id'] in pendientes and doc['barco_id'] not in rechazados],
+                previas
+            )
+            if eventos:
+                await get_mongo_db_async()[geocercas.EVENTOS_COLLECTION_NAME].insert_many(eventos, ordered=False)
+            pendientes = {barco_id: pendientes[barco_id] for barco_id in rechazados}
+            if not pendientes:
+                return
+    
+    @classmethod
+    def insertar_lote(cls, ubicaciones: List['UbicacionBuque']) -> Tuple[List[Optional[str]], List[Dict]]:
+        """
+        Inserta un lote de ubicaciones con un único insert_many no ordenado.
+        Un documento rechazado por MongoDB no detiene la inserción del resto.
+        
+        Returns:
+            Tupla (ids, errores): `ids` está alineada con `ubicaciones` y
+            contiene None en las posiciones que fallaron; `errores` contiene
+            {'indice', 'mensaje'} por cada documento rechazado.
+        """
+        return cls.insertar_documentos([ubicacion.to_dict() for ubicacion in ubicaciones])
+    
+    @classmethod
+    def insertar_documentos(cls, docs: List[Dict[str, Any]],
+                            clasificar: bool = True) -> Tuple[List[Optional[str]], List[Dict]]:
+        """
+        Igual que insertar_lote, pero recibe documentos ya en el formato de
+        to_dict(), para escritores masivos que no necesitan instanciar el modelo.
+        Con `clasificar=False` se respeta el `zona_id` que ya traen los documentos.
+        """
+        if not docs:
+            return [], []
+        
+        if clasificar:
+            geocercas.clasificar_documentos(docs)
+        
+        collection = cls.get_collection()
+        errores = []
+        
+        try:
+            collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errores = cls._errores_insercion(e)
+        
+        ids, insertados = cls._resultado_insercion(docs, errores)
+        cls._actualizar_actuales(insertados)
+        return ids, errores
+    
+    @classmethod
+    async def ainsertar_documentos(cls, docs: List[Dict[str, Any]],
+                                   clasificar: bool = True) -> Tuple[List[Optional[str]], List[Dict]]:
+        """Versión asíncrona de insertar_documentos()."""
+        if not docs:
+            return [], []
+        
+        if clasificar:
+            geocercas.clasificar_documentos(docs, await geocercas.aget_indice())
+        
+        errores = []
+        try:
+            await cls.get_collection_async().insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errores = cls._errores_insercion(e)
+        
+        ids, insertados = cls._resultado_insercion(docs, errores)
+        await cls._aactualizar_actuales(insertados)
+        return ids, errores
+    
+    @staticmethod
+    def _errores_insercion(e: BulkWriteError) -> List[Dict]:
+        """Errores de un insert_many no ordenado como {'indice', 'mensaje'}."""
+        return [
+            {
+                'indice': error['index'],
+                'mensaje': error.get('errmsg', 'Error de escritura en MongoDB')
+            }
+            for error in e.details.get('writeErrors', [])
+        ]
+    
+    @staticmethod
+    def _resultado_insercion(docs: List[Dict[str, Any]], errores: List[Dict]):
+        """
+        Retorna los ids alineados con `docs` (None en los fallidos) y los
+        documentos efectivamente insertados.
+        """
+        # insert_many asigna el _id a cada documento antes de enviarlo
+        fallidos = {error['indice'] for error in errores}
+        ids = [
+            None if indice in fallidos else str(doc['_id'])
+            for indice, doc in enumerate(docs)
+        ]
+        insertados = [doc for indice, doc in enumerate(docs) if indice not in fallidos]
+        return ids, insertados
     
     @classmethod
     def get_ultima_ubicacion(cls, barco_id: str) -> Optional['UbicacionBuque']:
         """
         Obtiene la última ubicación registrada de un barco.
+        Consulta primero la colección de ubicaciones actuales y recurre al
+        historial si el barco aún no figura en ella.
         """
-        collection = cls.get_collection()
-        doc = collection.find_one(
-            {'barco_id': barco_id},
-            sort=[('timestamp', -1)]
-        )
+        doc = cls.get_collection_actuales().find_one({'_id': barco_id})
+        
+        if doc is None:
+            collection = cls.get_collection()
+            doc = collection.find_one(
+                {'barco_id': barco_id},
+                sort=[('timestamp', -1)]
+            )
+        
+        if doc:
+            return cls._desde_documento(doc)
+        return None
+    
+    @classmethod
+    def get_ultimas_ubicaciones(cls, barco_ids: List[str]) -> Dict[str, 'UbicacionBuque']:
+        """
+        Obtiene la última ubicación de varios barcos en un solo viaje a MongoDB.
+        Los barcos que aún no figuran en la colección de actuales se buscan en
+        el historial con una única agregación.
+        
+        Returns:
+            Diccionario barco_id -> UbicacionBuque (sin los barcos sin ubicaciones)
+        """
+        barco_ids = list(barco_ids)
+        ultimas = {
+            doc['barco_id']: cls._desde_documento(doc)
+            for doc in cls.get_collection_actuales().find({'_id': {'$in': barco_ids}})
+        }
+        
+        faltantes = [barco_id for barco_id in barco_ids if barco_id not in ultimas]
+        if faltantes:
+            pipeline = [
+                {'$match': {'barco_id': {'$in': faltantes}}},
+                {'$sort': {'barco_id': 1, 'timestamp': -1}},
+                {'$group': {'_id': '$barco_id', 'ultima': {'$first': '$$ROOT'}}},
+            ]
+            for grupo in cls.get_collection().aggregate(pipeline, allowDiskUse=True):
+                ultimas[grupo['_id']] = cls._desde_documento(grupo['ultima'])
+        
+        return ultimas
+    
+    @classmethod
+    async def aget_ultima_ubicacion(cls, barco_id: str) -> Optional['UbicacionBuque']:
+        """Versión asíncrona de get_ultima_ubicacion()."""
+        doc = await cls.get_collection_actuales_async().find_one({'_id': barco_id})
+        
+        if doc is None:
+            doc = await cls.get_collection_async().find_one(
+                {'barco_id': barco_id},
+                sort=[('timestamp', -1)]
+            )
         
         if doc:
-            doc['_id'] = str(doc['_id'])  # Convertir ObjectId a string
-            return cls.from_dict(doc)
+            return cls._desde_documento(doc)
         return None
     
     @classmethod
@@ -137,17 +597,159 @@ class UbicacionBuque:
         Obtiene todas las ubicaciones de un barco en un rango de tiempo.
         """
         collection = cls.get_collection()
-        docs = collection.find({
+        docs = collection.find(cls._filtro_rango(barco_id, inicio, fin)).sort('timestamp', 1)
+        
+        return [cls._desde_documento(doc) for doc in docs]
+    
+    @classmethod
+    async def aget_ubicaciones_por_rango_tiempo(cls, barco_id: str,
+                                                inicio: datetime,
+                                                fin: datetime) -> list:
+        """Versión asíncrona de get_ubicaciones_por_rango_tiempo()."""
+        docs = cls.get_collection_async().find(cls._filtro_rango(barco_id, inicio, fin)).sort('timestamp', 1)
+        
+        return [cls._desde_documento(doc) async for doc in docs]
+    
+    @staticmethod
+    def _filtro_rango(barco_id: str, inicio: datetime, fin: datetime) -> Dict[str, Any]:
+        """Filtro del historial de un barco en un rango de tiempo."""
+        return {
             'barco_id': barco_id,
             'timestamp': {'$gte': inicio, '$lte': fin}
-        }).sort('timestamp', 1)
+        }
+    
+    @classmethod
+    def iterar_historial(cls, barco_id: str, inicio: datetime, fin: datetime,
+                         campos: Optional[List[str]] = None,
+                         despues_de: Optional[Tuple[datetime, ObjectId]] = None,
+                         limite: Optional[int] = None, batch_size: int = 1000):
+        """
+        Obtiene un cursor de MongoDB sobre el historial de un barco ordenado por
+        (timestamp, _id), sin materializar los documentos en memoria.
         
-        ubicaciones = []
-        for doc in docs:
-            doc['_id'] = str(doc['_id'])
-            ubicaciones.append(cls.from_dict(doc))
+        Args:
+            barco_id: UUID del barco
+            inicio: Inicio del rango de tiempo
+            fin: Fin del rango de tiempo
+            campos: Campos de la API a proyectar (default: todos)
+            despues_de: Clave (timestamp, _id) de la última ubicación de la página anterior
+            limite: Máximo de documentos a retornar
+            batch_size: Documentos por lote del cursor
         
-        return ubicaciones
+        Returns:
+            Cursor de documentos crudos de MongoDB
+        """
+        filtro, proyeccion = cls._consulta_historial(barco_id, inicio, fin, campos, despues_de)
+        
+        cursor = cls.get_collection().find(filtro, proyeccion).sort(
+            [('timestamp', 1), ('_id', 1)]
+        ).batch_size(batch_size)
+        
+        if limite:
+            cursor = cursor.limit(limite)
+        
+        return cursor
+    
+    @classmethod
+    def aiterar_historial(cls, barco_id: str, inicio: datetime, fin: datetime,
+                          campos: Optional[List[str]] = None,
+                          despues_de: Optional[Tuple[datetime, ObjectId]] = None,
+                          limite: Optional[int] = None, batch_size: int = 1000):
+        """Igual que iterar_historial(), pero retorna un cursor asíncrono (async for)."""
+        filtro, proyeccion = cls._consulta_historial(barco_id, inicio, fin, campos, despues_de)
+        
+        cursor = cls.get_collection_async().find(filtro, proyeccion).sort(
+            [('timestamp', 1), ('_id', 1)]
+        ).batch_size(batch_size)
+        
+        if limite:
+            cursor = cursor.limit(limite)
+        
+        return cursor
+    
+    @classmethod
+    def _consulta_historial(cls, barco_id: str, inicio: datetime, fin: datetime,
+                            campos: Optional[List[str]],
+                            despues_de: Optional[Tuple[datetime, ObjectId]]):
+        """Filtro y proyección del historial paginado por clave (timestamp, _id)."""
+        filtro = cls._filtro_rango(barco_id, inicio, fin)
+        if despues_de:
+            timestamp, object_id = despues_de
+            filtro['$or'] = [
+                {'timestamp': {'$gt': timestamp}},
+                {'timestamp': timestamp, '_id': {'$gt': object_id}}
+            ]
+        
+        proyeccion = None
+        if campos:
+            # timestamp y _id siempre se proyectan para construir el cursor
+            proyeccion = {cls.CAMPOS_MONGO[campo]: 1 for campo in campos}
+            proyeccion['timestamp'] = 1
+        
+        return filtro, proyeccion
+    
+    @staticmethod
+    def _inicio_intervalo(segundos: int) -> Dict[str, Any]:
+        """Expresión de agregación con el inicio del intervalo (ms desde epoch) de cada ubicación."""
+        milisegundos = segundos * 1000
+        return {'$subtract': [
+            {'$toLong': '$timestamp'},
+            {'$mod': [{'$toLong': '$timestamp'}, milisegundos]}
+        ]}
+    
+    @classmethod
+    def get_ubicaciones_agrupadas(cls, barco_id: str, inicio: datetime,
+                                  fin: datetime, segundos: int) -> list:
+        """
+        Obtiene el historial de un barco reducido a una ubicación por intervalo
+        de tiempo. La agrupación se hace en MongoDB ($group), por lo que solo
+        viaja una ubicación por intervalo.
+        
+        Args:
+            barco_id: UUID del barco
+            inicio: Inicio del rango de tiempo
+            fin: Fin del rango de tiempo
+            segundos: Tamaño de cada intervalo en segundos
+        
+        Returns:
+            Lista con la última ubicación registrada en cada intervalo
+        """
+        collection = cls.get_collection()
+        pipeline = cls._pipeline_agrupadas(barco_id, inicio, fin, segundos)
+        
+        return [
+            cls._desde_grupo(grupo)
+            for grupo in collection.aggregate(pipeline, allowDiskUse=True)
+        ]
+    
+    @classmethod
+    async def aget_ubicaciones_agrupadas(cls, barco_id: str, inicio: datetime,
+                                         fin: datetime, segundos: int) -> list:
+        """Versión asíncrona de get_ubicaciones_agrupadas()."""
+        pipeline = cls._pipeline_agrupadas(barco_id, inicio, fin, segundos)
+        cursor = await cls.get_collection_async().aggregate(pipeline, allowDiskUse=True)
+        
+        return [cls._desde_grupo(grupo) async for grupo in cursor]
+    
+    @classmethod
+    def _pipeline_agrupadas(cls, barco_id: str, inicio: datetime,
+                            fin: datetime, segundos: int) -> List[Dict[str, Any]]:
+        return [
+            {'$match': cls._filtro_rango(barco_id, inicio, fin)},
+            {'$sort': {'timestamp': 1}},
+            {'$group': {
+                '_id': cls._inicio_intervalo(segundos),
+                'ultima_ubicacion': {'$last': '$$ROOT'},
+                'puntos': {'$sum': 1}
+            }},
+            {'$sort': {'_id': 1}}
+        ]
+    
+    @classmethod
+    def _desde_grupo(cls, grupo: Dict[str, Any]) -> 'UbicacionBuque':
+        ubicacion = cls._desde_documento(grupo['ultima_ubicacion'])
+        ubicacion.metadata = dict(ubicacion.metadata, puntos_agrupados=grupo['puntos'])
+        return ubicacion
     
     @classmethod
     def get_buques_cercanos(cls, latitud: float, longitud: float, 
@@ -163,13 +765,37 @@ class UbicacionBuque:
         Returns:
             Lista de ubicaciones de buques cercanos
         """
-        collection = cls.get_collection()
+        # Las colecciones time-series no admiten $near: se busca sobre la
+        # última ubicación de cada barco
+        if cls.es_timeseries():
+            collection = cls.get_collection_actuales()
+        else:
+            collection = cls.get_collection()
+        
+        docs = collection.find(cls._filtro_cercanos(latitud, longitud, radio_km))
+        
+        return [cls._desde_documento(doc) for doc in docs]
+    
+    @classmethod
+    async def aget_buques_cercanos(cls, latitud: float, longitud: float,
+                                   radio_km: float = 10.0) -> list:
+        """Versión asíncrona de get_buques_cercanos()."""
+        if cls.es_timeseries():
+            collection = cls.get_collection_actuales_async()
+        else:
+            collection = cls.get_collection_async()
         
+        docs = collection.find(cls._filtro_cercanos(latitud, longitud, radio_km))
+        
+        return [cls._desde_documento(doc) async for doc in docs]
+    
+    @staticmethod
+    def _filtro_cercanos(latitud: float, longitud: float, radio_km: float) -> Dict[str, Any]:
         # Convertir radio de km a metros (MongoDB usa metros)
         radio_metros = radio_km * 1000
         
         # Búsqueda geoespacial
-        docs = collection.find({
+        return {
             'ubicacion': {
                 '$near': {
                     '$geometry': {
@@ -179,7 +805,16 @@ class UbicacionBuque:
                     '$maxDistance': radio_metros
                 }
             }
-        })
+        }
+    
+    @classmethod
+    def get_todas_ubicaciones_actuales(cls) -> list:
+        """
+        Obtiene la última ubicación de cada barco.
+        Lee la colección materializada de ubicaciones actuales (un documento
+        por barco), por lo que no depende del tamaño del historial.
+        """
+        docs = cls.get_collection_actuales().find()
         
         ubicaciones = []
         for doc in docs:
@@ -189,28 +824,107 @@ class UbicacionBuque:
         return ubicaciones
     
     @classmethod
-    def get_todas_ubicaciones_actuales(cls) -> list:
+    def reconstruir_actuales(cls, limpiar: bool = False) -> int:
         """
-        Obtiene la última ubicación de cada barco.
+        Reconstruye la colección de ubicaciones actuales a partir del historial.
+        
+        Args:
+            limpiar: Si es True, vacía la colección antes de reconstruirla para
+                     descartar barcos que ya no tengan ubicaciones.
+        
+        Returns:
+            Número de barcos en la colección de ubicaciones actuales
         """
         collection = cls.get_collection()
+        actuales = cls.get_collection_actuales()
+        
+        if limpiar:
+            actuales.delete_many({})
         
-        # Agregación para obtener la última ubicación de cada barco
+        # Agregación para obtener la última ubicación de cada barco,
+        # volcada con $merge en la colección materializada
         pipeline = [
             {'$sort': {'barco_id': 1, 'timestamp': -1}},
             {'$group': {
                 '_id': '$barco_id',
                 'ultima_ubicacion': {'$first': '$$ROOT'}
             }},
-            {'$replaceRoot': {'newRoot': '$ultima_ubicacion'}}
+            {'$replaceRoot': {'newRoot': {'$mergeObjects': [
+                '$ultima_ubicacion',
+                {'_id': '$_id', 'ubicacion_id': '$ultima_ubicacion._id'}
+            ]}}},
+            {'$merge': {
+                'into': cls.ACTUALES_COLLECTION_NAME,
+                'on': '_id',
+                'whenMatched': 'replace',
+                'whenNotMatched': 'insert'
+            }}
         ]
         
-        docs = collection.aggregate(pipeline)
+        collection.aggregate(pipeline, allowDiskUse=True)
+        return actuales.count_documents({})
+    
+    @classmethod
+    def resumir(cls, nivel: str, desde: datetime) -> int:
+        """
+        Calcula los resúmenes por barco e intervalo ('hora' o 'dia') de las
+        ubicaciones posteriores a `desde` y los guarda con $merge, reemplazando
+        los intervalos ya resumidos. Debe ejecutarse antes de que las
+        ubicaciones expiren por la retención.
         
-        ubicaciones = []
-        for doc in docs:
-            doc['_id'] = str(doc['_id'])
-            ubicaciones.append(cls.from_dict(doc))
+        Returns:
+            Número de resúmenes escritos
+        """
+        coleccion_resumen, segundos = cls.RESUMENES[nivel]
         
-        return ubicaciones
-
+        # Empezar en el inicio del intervalo para no resumirlo parcialmente
+        desde = _a_utc_naive(desde)
+        epoch = datetime(1970, 1, 1)
+        desde = epoch + timedelta(seconds=((desde - epoch).total_seconds() // segundos) * segundos)
+        
+        pipeline = [
+            {'$match': {'timestamp': {'$gte': desde}}},
+            {'$sort': {'timestamp': 1}},
+            {'$group': {
+                '_id': {'barco_id': '$barco_id', 'inicio': cls._inicio_intervalo(segundos)},
+                'puntos': {'$sum': 1},
+                'velocidad_media': {'$avg': '$velocidad'},
+                'velocidad_maxima': {'$max': '$velocidad'},
+                'primera_ubicacion': {'$first': '$ubicacion'},
+                'ultima_ubicacion': {'$last': '$ubicacion'},
+                'primer_timestamp': {'$first': '$timestamp'},
+                'ultimo_timestamp': {'$last': '$timestamp'},
+                'estado': {'$last': '$estado'}
+            }},
+            {'$addFields': {
+                'barco_id': '$_id.barco_id',
+                'inicio': {'$toDate': '$_id.inicio'}
+            }},
+            {'$merge': {
+                'into': coleccion_resumen,
+                'on': '_id',
+                'whenMatched': 'replace',
+                'whenNotMatched': 'insert'
+            }}
+        ]
+        
+        cls.get_collection().aggregate(pipeline, allowDiskUse=True)
+        return cls.get_collection_resumen(nivel).count_documents({'inicio': {'$gte': desde}})
+    
+    @classmethod
+    def get_resumenes(cls, barco_id: str, inicio: datetime, fin: datetime, nivel: str) -> list:
+        """Obtiene los resúmenes de un barco en un rango de tiempo, ordenados por inicio."""
+        docs = cls.get_collection_resumen(nivel).find(
+            {'barco_id': barco_id, 'inicio': {'$gte': inicio, '$lte': fin}},
+            {'_id': 0}
+        ).sort('inicio', 1)
+        return list(docs)
+    
+    @classmethod
+    async def aget_resumenes(cls, barco_id: str, inicio: datetime, fin: datetime, nivel: str) -> list:
+        """Versión asíncrona de get_resumenes()."""
+        docs = cls.get_collection_resumen_async(nivel).find(
+            {'barco_id': barco_id, 'inicio': {'$gte': inicio, '$lte': fin}},
+            {'_id': 0}
+        ).sort('inicio', 1)
+        return await docs.to_list()
@@ -0,0 +1,36 @@
+"""
+Cursores de paginación por clave (timestamp, _id) para el historial de ubicaciones.
+"""
+import base64
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def codificar_cursor(doc: dict) -> str:
+    """Genera el cursor opaco que apunta a la ubicación siguiente a `doc`."""
+    timestamp = doc['timestamp']
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    # MongoDB guarda las fechas con precisión de milisegundos
+    milisegundos = (timestamp - EPOCH) // timedelta(milliseconds=1)
+    valor = f"{milisegundos}:{doc['_id']}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Obtiene (timestamp, _id) de un cursor.
+    Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valor = base64.urlsafe_b64decode(cursor + relleno).decode()
+        milisegundos, object_id = valor.split(':', 1)
+        return EPOCH + timedelta(milliseconds=int(milisegundos)), ObjectId(object_id)
+    except (ValueError, InvalidId, UnicodeDecodeError) as e:
+        raise ValueError(f'Cursor inválido: {e}')
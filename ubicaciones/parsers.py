@@ -0,0 +1,46 @@
+"""
+Parsers para la ingesta masiva de ubicaciones de buques.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+from port_control.renderers import orjson
+
+
+class LineaInvalida:
+    """Marca una línea NDJSON que no pudo decodificarse como JSON."""
+
+    def __init__(self, numero: int, mensaje: str):
+        self.numero = numero
+        self.mensaje = mensaje
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parser para cuerpos NDJSON (un objeto JSON por línea).
+
+    No lee el cuerpo completo en memoria: retorna un generador que decodifica
+    las líneas a medida que se consumen. Las líneas inválidas se entregan como
+    `LineaInvalida` para que la vista las reporte sin abortar el lote.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return self._iterar_lineas(stream, encoding)
+
+    def _iterar_lineas(self, stream, encoding):
+        # orjson decodifica los bytes UTF-8 directamente
+        rapido = orjson is not None and encoding.lower().replace('_', '-') in ('utf-8', 'utf8')
+        for numero, linea in enumerate(stream, start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield orjson.loads(linea) if rapido else json.loads(linea.decode(encoding))
+            except (ValueError, UnicodeDecodeError) as e:
+                yield LineaInvalida(numero, f'JSON inválido: {e}')
@@ -4,6 +4,47 @@ Serializers para el sistema de ubicación de buques.
 from rest_framework import serializers
 from datetime import datetime
 
+from ubicaciones.paginacion import decodificar_cursor
+
+
+class _ItemInvalido:
+    """Resultado de validación de un elemento rechazado dentro de un lote."""
+
+    def __init__(self, errores):
+        self.errores = errores
+
+
+class UbicacionBuqueLoteSerializer(serializers.ListSerializer):
+    """
+    Valida un lote de ubicaciones (many=True) sin descartar los elementos válidos.
+
+    A diferencia de ListSerializer, un elemento inválido no invalida el lote:
+    sus errores quedan en `errores_items` con su índice y `validated_data`
+    contiene solo los elementos válidos, cuyos índices originales se guardan
+    en `indices_validos`.
+    """
+
+    def run_child_validation(self, data):
+        try:
+            return super().run_child_validation(data)
+        except serializers.ValidationError as exc:
+            return _ItemInvalido(exc.detail)
+
+    def to_internal_value(self, data):
+        resultados = super().to_internal_value(data)
+
+        self.indices_validos = []
+        self.errores_items = []
+        validos = []
+        for indice, resultado in enumerate(resultados):
+            if isinstance(resultado, _ItemInvalido):
+                self.errores_items.append({'indice': indice, 'errores': resultado.errores})
+            else:
+                self.indices_validos.append(indice)
+                validos.append(resultado)
+
+        return validos
+
 
 class UbicacionBuqueSerializer(serializers.Serializer):
     """Serializer para ubicaciones de buques."""
@@ -21,6 +62,9 @@ class UbicacionBuqueSerializer(serializers.Serializer):
     )
     metadata = serializers.DictField(required=False, allow_empty=True, default=dict)
     
+    class Meta:
+        list_serializer_class = UbicacionBuqueLoteSerializer
+    
     def to_representation(self, instance):
         """Convierte la instancia a formato JSON para la respuesta."""
         if isinstance(instance, dict):
@@ -37,11 +81,13 @@ class UbicacionBuqueSerializer(serializers.Serializer):
                 'rumbo': instance.get('rumbo', 0.0),
                 'timestamp': instance.get('timestamp'),
                 'estado': instance.get('estado', 'en_transito'),
-                'metadata': instance.get('metadata', {})
+                'metadata': instance.get('metadata', {}),
+                'zona_id': instance.get('zona_id')
             }
         else:
             # Si es una instancia de UbicacionBuque
             return {
+                'id': instance.id,
                 'barco_id': instance.barco_id,
                 'latitud': instance.latitud,
                 'longitud': instance.longitud,
@@ -49,14 +95,109 @@ class UbicacionBuqueSerializer(serializers.Serializer):
                 'rumbo': instance.rumbo,
                 'timestamp': instance.timestamp,
                 'estado': instance.estado,
-                'metadata': instance.metadata
+                'metadata': instance.metadata,
+                'zona_id': instance.zona_id
             }
 
 
-class BusquedaCercanosSerializer(serializers.Serializer):
-    """Serializer para búsqueda de buques cercanos."""
+class PuntoSerializer(serializers.Serializer):
+    """Serializer para un punto geográfico."""
     
     latitud = serializers.FloatField(min_value=-90, max_value=90)
     longitud = serializers.FloatField(min_value=-180, max_value=180)
+
+
+class BusquedaCercanosSerializer(PuntoSerializer):
+    """Serializer para búsqueda de buques cercanos."""
+    
     radio_km = serializers.FloatField(min_value=0.1, max_value=1000, required=False, default=10.0)
 
+
+class EventosZonaSerializer(serializers.Serializer):
+    """Parámetros de consulta de los eventos de entrada/salida de zonas."""
+    
+    barco_id = serializers.UUIDField(required=False)
+    zona_id = serializers.UUIDField(required=False)
+    limite = serializers.IntegerField(min_value=1, max_value=1000, required=False, default=100)
+
+
+
+class SimulacionSerializer(serializers.Serializer):
+    """Parámetros para iniciar la simulación de ubicaciones."""
+    
+    intervalo_segundos = serializers.IntegerField(
+        min_value=5, required=False, default=30,
+        error_messages={'min_value': 'El intervalo mínimo es 5 segundos'}
+    )
+    barcos_sinteticos = serializers.IntegerField(
+        min_value=0, max_value=100000, required=False, default=0,
+        help_text='Barcos generados en memoria para pruebas de carga'
+    )
+
+
+class HistorialSerializer(serializers.Serializer):
+    """Serializer para los parámetros de consulta del historial de ubicaciones."""
+    
+    CAMPOS = ['id', 'barco_id', 'latitud', 'longitud', 'velocidad',
+              'rumbo', 'timestamp', 'estado', 'metadata', 'zona_id']
+    
+    # Reducción de la trayectoria
+    simplify = serializers.ChoiceField(choices=['dp', 'vw'], required=False)
+    tolerancia = serializers.FloatField(min_value=0, max_value=100000, required=False, default=10.0)
+    bucket = serializers.IntegerField(min_value=1, max_value=86400, required=False)
+    resumen = serializers.ChoiceField(choices=['hora', 'dia'], required=False)
+    
+    # Proyección, paginación por clave y formato de salida
+    fields = serializers.CharField(required=False, help_text='Campos separados por coma')
+    limite = serializers.IntegerField(min_value=1, max_value=10000, required=False)
+    cursor = serializers.CharField(required=False)
+    formato = serializers.ChoiceField(choices=['json', 'ndjson'], required=False, default='json')
+    
+    def validate_fields(self, value):
+        campos = [campo.strip() for campo in value.split(',') if campo.strip()]
+        invalidos = [campo for campo in campos if campo not in self.CAMPOS]
+        if invalidos:
+            raise serializers.ValidationError(
+                f"Campos no válidos: {', '.join(invalidos)}. Disponibles: {', '.join(self.CAMPOS)}"
+            )
+        return campos
+    
+    def validate_cursor(self, value):
+        try:
+            return decodificar_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+    
+    def validate(self, data):
+        reduccion = data.get('bucket') or data.get('simplify') or data.get('resumen')
+        paginacion = data.get('limite') or data.get('cursor') or data['formato'] == 'ndjson'
+        if reduccion and paginacion:
+            raise serializers.ValidationError(
+                'limite, cursor y formato=ndjson no se pueden combinar con bucket, simplify ni resumen'
+            )
+        return data
+
+
+class SuscripcionStreamSerializer(serializers.Serializer):
+    """Serializer para los filtros del stream de ubicaciones en vivo."""
+    
+    barco_id = serializers.CharField(required=False, help_text='UUIDs separados por coma')
+    bbox = serializers.CharField(required=False, help_text='min_lon,min_lat,max_lon,max_lat')
+    
+    def validate_barco_id(self, value):
+        barco_ids = [barco_id.strip() for barco_id in value.split(',') if barco_id.strip()]
+        campo = serializers.UUIDField()
+        return [str(campo.to_internal_value(barco_id)) for barco_id in barco_ids]
+    
+    def validate_bbox(self, value):
+        try:
+            min_lon, min_lat, max_lon, max_lat = [float(v) for v in value.split(',')]
+        except ValueError:
+            raise serializers.ValidationError(
+                'Formato esperado: min_lon,min_lat,max_lon,max_lat'
+            )
+        
+        if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+            raise serializers.ValidationError('Coordenadas fuera de rango o invertidas')
+        
+        return (min_lon, min_lat, max_lon, max_lat)
@@ -0,0 +1,8 @@
+"""
+Señales del sistema de ubicación de buques.
+"""
+from django.dispatch import Signal
+
+# Enviada tras escribir ubicaciones en MongoDB y actualizar la colección de
+# ubicaciones actuales. Argumentos: docs (última ubicación escrita por barco).
+ubicaciones_actualizadas = Signal()
@@ -0,0 +1,204 @@
+"""
+Motor vectorizado de simulación de ubicaciones de buques.
+
+El estado de toda la flota se mantiene en arreglos de NumPy (latitud, longitud,
+velocidad, rumbo y estado) y cada paso avanza a todos los buques a la vez; el
+resultado se escribe en MongoDB con una sola escritura masiva por paso. La zona
+del puerto de cada buque se resuelve en lote con el índice de geocercas.
+"""
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ubicaciones import geocercas
+from ubicaciones.models import UbicacionBuque
+
+# Coordenadas del puerto de Panamá (ejemplo); se usan para ubicar la flota
+# inicial y, si no hay zonas con geometría, como único punto de atraque
+PUERTO_LAT = 8.9824
+PUERTO_LON = -79.5199
+
+RADIO_TIERRA_KM = 6371
+KM_POR_GRADO = 111
+KM_POR_NUDO_HORA = 1.852
+
+ESTADOS = np.array(['en_transito', 'atracado', 'en_espera'], dtype=object)
+EN_TRANSITO, ATRACADO, EN_ESPERA = range(3)
+
+
+def distancia_km(lat1, lon1, lat2, lon2):
+    """Distancia en km entre puntos (escalares o arreglos) con la fórmula de Haversine."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class MotorSimulacion:
+    """
+    Mantiene el estado de la flota simulada en memoria y la avanza por pasos.
+    Solo consulta MongoDB al cargar la flota; los pasos siguientes parten del
+    estado en memoria.
+    """
+
+    def __init__(self, semilla: Optional[int] = None):
+        self.rng = np.random.default_rng(semilla)
+        self.barco_ids: List[str] = []
+        self._indices: Dict[str, int] = {}
+        self.latitud = np.empty(0)
+        self.longitud = np.empty(0)
+        self.velocidad = np.empty(0)
+        self.rumbo = np.empty(0)
+        self.estado = np.empty(0, dtype=np.int8)
+        self.distancia_puerto = np.empty(0)
+        # Posición de la zona de cada buque en `_zona_ids` (-1 = fuera de toda zona)
+        self.zona = np.empty(0, dtype=np.int32)
+        self._zona_ids = np.array([None], dtype=object)
+        self._hay_zonas = False
+
+        # Métricas del último paso y acumuladas
+        self.pasos = 0
+        self.ubicaciones_escritas = 0
+        self.duracion_ultimo_paso = 0.0
+        self.ubicaciones_por_segundo = 0.0
+
+    @property
+    def total_barcos(self) -> int:
+        return len(self.barco_ids)
+
+    def contiene(self, barco_id: str) -> bool:
+        """Indica si el barco ya forma parte de la flota simulada."""
+        return barco_id in self._indices
+
+    def agregar_barcos(self, barco_ids: List[str],
+                       ultimas: Optional[Dict[str, UbicacionBuque]] = None):
+        """
+        Agrega barcos a la flota. Los que tienen una última ubicación conocida
+        parten de ella; el resto recibe una posición inicial aleatoria a
+        5-50 km del puerto.
+        """
+        ultimas = ultimas or {}
+        nuevos = [barco_id for barco_id in barco_ids if barco_id not in self._indices]
+        if not nuevos:
+            return
+
+        n = len(nuevos)
+        radio_km = self.rng.uniform(5, 50, n)
+        angulo = self.rng.uniform(0, 2 * np.pi, n)
+        latitud = PUERTO_LAT + (radio_km * np.cos(angulo)) / KM_POR_GRADO
+        longitud = PUERTO_LON + (radio_km * np.sin(angulo)) / (KM_POR_GRADO * np.cos(np.radians(PUERTO_LAT)))
+        velocidad = self.rng.uniform(5, 15, n)
+        rumbo = self.rng.uniform(0, 360, n)
+        estado = np.full(n, EN_TRANSITO, dtype=np.int8)
+
+        for i, barco_id in enumerate(nuevos):
+            ultima = ultimas.get(barco_id)
+            if ultima is not None:
+                latitud[i] = ultima.latitud
+                longitud[i] = ultima.longitud
+                velocidad[i] = ultima.velocidad
+                rumbo[i] = ultima.rumbo
+
+        inicio = self.total_barcos
+        self.barco_ids.extend(nuevos)
+        self._indices.update({barco_id: inicio + i for i, barco_id in enumerate(nuevos)})
+        self.latitud = np.concatenate([self.latitud, latitud])
+        self.longitud = np.concatenate([self.longitud, longitud])
+        self.velocidad = np.concatenate([self.velocidad, velocidad])
+        self.rumbo = np.concatenate([self.rumbo, rumbo])
+        self.estado = np.concatenate([self.estado, estado])
+        self._clasificar()
+
+    def agregar_barcos_sinteticos(self, cantidad: int):
+        """Agrega barcos con UUID aleatorio que no existen en PostgreSQL (pruebas de carga)."""
+        self.agregar_barcos([str(uuid.uuid4()) for _ in range(cantidad)])
+
+    def avanzar(self, segundos: float):
+        """
+        Avanza a toda la flota `segundos`: los buques dentro de una zona del
+        puerto (o, sin zonas definidas, a menos de 0.5 km del puerto) quedan
+        atracados o en espera a 0-2 nudos; el resto navega a 5-20 nudos con un
+        rumbo que varía ±5°.
+        """
+        n = self.total_barcos
+        if n == 0:
+            return
+
+        if self._hay_zonas:
+            en_puerto = self.zona >= 0
+        else:
+            en_puerto = self.distancia_puerto < 0.5
+
+        # atracado con probabilidad 2/3, en espera con 1/3
+        self.estado = np.where(
+            en_puerto,
+            np.where(self.rng.random(n) < 2 / 3, ATRACADO, EN_ESPERA),
+            EN_TRANSITO
+        ).astype(np.int8)
+        self.velocidad = np.where(en_puerto, self.rng.uniform(0, 2, n), self.rng.uniform(5, 20, n))
+        self.rumbo = np.mod(self.rumbo + self.rng.uniform(-5, 5, n), 360)
+
+        distancia = (self.velocidad * KM_POR_NUDO_HORA * segundos) / 3600
+        rumbo_rad = np.radians(self.rumbo)
+        delta_lat = (distancia * np.cos(rumbo_rad)) / KM_POR_GRADO
+        delta_lon = (distancia * np.sin(rumbo_rad)) / (KM_POR_GRADO * np.cos(np.radians(self.latitud)))
+
+        self.latitud = np.clip(self.latitud + delta_lat, -90, 90)
+        self.longitud = np.clip(self.longitud + delta_lon, -180, 180)
+        self._clasificar()
+
+    def _clasificar(self):
+        """Calcula la distancia al puerto y la zona de cada buque en su posición actual."""
+        self.distancia_puerto = distancia_km(self.latitud, self.longitud, PUERTO_LAT, PUERTO_LON)
+
+        indice = geocercas.get_indice()
+        self._hay_zonas = len(indice) > 0
+        # El último elemento (None) es el que corresponde a la posición -1
+        self._zona_ids = np.array([zona.id for zona in indice.zonas] + [None], dtype=object)
+        self.zona = indice.clasificar_lote(self.longitud, self.latitud)
+
+    def documentos(self, timestamp: Optional[datetime] = None) -> List[dict]:
+        """Construye los documentos de MongoDB (formato de to_dict) del estado actual."""
+        timestamp = timestamp or datetime.utcnow()
+        latitudes = self.latitud.tolist()
+        longitudes = self.longitud.tolist()
+        velocidades = self.velocidad.tolist()
+        rumbos = self.rumbo.tolist()
+        estados = ESTADOS[self.estado].tolist()
+        distancias = np.round(self.distancia_puerto, 2).tolist()
+        zonas = self._zona_ids[self.zona].tolist()
+
+        return [
+            {
+                'barco_id': self.barco_ids[i],
+                'ubicacion': {'type': 'Point', 'coordinates': [longitudes[i], latitudes[i]]},
+                'velocidad': velocidades[i],
+                'rumbo': rumbos[i],
+                'timestamp': timestamp,
+                'estado': estados[i],
+                'metadata': {'distancia_puerto_km': distancias[i], 'simulado': True},
+                'zona_id': zonas[i]
+            }
+            for i in range(self.total_barcos)
+        ]
+
+    def paso(self, segundos: float) -> int:
+        """
+        Avanza la flota y escribe todas las ubicaciones en una sola escritura
+        masiva. Retorna el número de ubicaciones escritas.
+        """
+        inicio = time.perf_counter()
+        self.avanzar(segundos)
+        # Las zonas ya se resolvieron en lote al avanzar
+        ids, _ = UbicacionBuque.insertar_documentos(self.documentos(), clasificar=False)
+        escritas = sum(1 for ubicacion_id in ids if ubicacion_id is not None)
+
+        self.duracion_ultimo_paso = time.perf_counter() - inicio
+        self.pasos += 1
+        self.ubicaciones_escritas += escritas
+        if self.duracion_ultimo_paso > 0:
+            self.ubicaciones_por_segundo = escritas / self.duracion_ultimo_paso
+        return escritas
@@ -0,0 +1,258 @@
+"""
+Difusión en vivo de ubicaciones de buques.
+
+Un único change stream de MongoDB sobre `ubicaciones_buques` (o sobre
+`ubicaciones_actuales` si el historial es time-series) alimenta a todos
+los clientes conectados del proceso: el hub renderiza cada inserción una sola
+vez y la reparte a las colas de las suscripciones cuyo filtro la acepta.
+
+`eventos_sse` espera los eventos bloqueando el hilo (vista síncrona);
+`aeventos_sse` los espera en el loop de asyncio sin ocupar un hilo (vista ASGI).
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from pymongo.errors import PyMongoError
+
+from port_control.renderers import ORJSONRenderer
+from ubicaciones.models import UbicacionBuque
+from ubicaciones.serializers import UbicacionBuqueSerializer
+
+logger = logging.getLogger(__name__)
+
+# (min_longitud, min_latitud, max_longitud, max_latitud)
+BBox = Tuple[float, float, float, float]
+
+
+class Suscripcion:
+    """
+    Suscripción de un cliente al hub con filtros opcionales por barco y por
+    área. Si el cliente no consume a tiempo, se descartan los eventos más
+    antiguos de su cola en lugar de bloquear al hub.
+    """
+
+    def __init__(self, barco_ids: Optional[Iterable[str]] = None,
+                 bbox: Optional[BBox] = None, tamano_cola: int = 1000):
+        self.barco_ids = set(barco_ids) if barco_ids else None
+        self.bbox = bbox
+        self.cola = queue.Queue(maxsize=tamano_cola)
+        self.descartados = 0
+        # Loop y evento de las suscripciones asíncronas (ver vincular_loop)
+        self._loop = None
+        self._aviso = None
+
+    def vincular_loop(self):
+        """Permite esperar eventos con `aobtener` desde el loop de asyncio actual."""
+        self._loop = asyncio.get_running_loop()
+        self._aviso = asyncio.Event()
+
+    async def aobtener(self, timeout: float) -> Optional[bytes]:
+        """Siguiente evento de la cola, o None si no llega ninguno en `timeout` segundos."""
+        while True:
+            try:
+                return self.cola.get_nowait()
+            except queue.Empty:
+                pass
+            self._aviso.clear()
+            # Un evento encolado entre get_nowait() y clear() no debe perderse
+            if not self.cola.empty():
+                continue
+            try:
+                await asyncio.wait_for(self._aviso.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def acepta(self, doc: dict) -> bool:
+        """Indica si la ubicación cumple los filtros de la suscripción."""
+        if self.barco_ids is not None and doc.get('barco_id') not in self.barco_ids:
+            return False
+        if self.bbox is not None:
+            longitud, latitud = doc['ubicacion']['coordinates']
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            if not (min_lon <= longitud <= max_lon and min_lat <= latitud <= max_lat):
+                return False
+        return True
+
+    def entregar(self, evento: bytes):
+        """Encola un evento descartando el más antiguo si la cola está llena."""
+        while True:
+            try:
+                self.cola.put_nowait(evento)
+                break
+            except queue.Full:
+                try:
+                    self.cola.get_nowait()
+                    self.descartados += 1
+                except queue.Empty:
+                    pass
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._aviso.set)
+            except RuntimeError:
+                # El loop ya terminó: el cliente se desconectó
+                pass
+
+
+class HubUbicaciones:
+    """
+    Reparte las inserciones de `ubicaciones_buques` entre las suscripciones.
+    El hilo del change stream se inicia con la primera suscripción y termina
+    cuando no queda ninguna.
+    """
+
+    def __init__(self):
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._resume_token = None
+
+    def suscribir(self, barco_ids: Optional[Iterable[str]] = None,
+                  bbox: Optional[BBox] = None) -> Suscripcion:
+        """Registra una suscripción e inicia el change stream si no está activo."""
+        suscripcion = Suscripcion(barco_ids, bbox, settings.UBICACIONES_STREAM_COLA)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._escuchar, daemon=True)
+                self._hilo.start()
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        """Elimina una suscripción del hub."""
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    @property
+    def total_suscripciones(self) -> int:
+        return len(self._suscripciones)
+
+    def _hay_suscripciones(self) -> bool:
+        """Indica si el hilo debe seguir; si no, lo marca como terminado."""
+        with self._lock:
+            if self._suscripciones:
+                return True
+            self._hilo = None
+            # Los próximos clientes solo quieren ubicaciones nuevas
+            self._resume_token = None
+            return False
+
+    def _escuchar(self):
+        """
+        Hilo del hub: reinicia el change stream tras cualquier error hasta que no
+        quedan suscripciones. Si el hilo termina de forma inesperada, la próxima
+        suscripción inicia otro.
+        """
+        try:
+            while self._hay_suscripciones():
+                try:
+                    self._observar()
+                    return
+                except PyMongoError as e:
+                    logger.error(f"Error en el change stream de ubicaciones: {e}")
+                except Exception:
+                    logger.exception("Error inesperado en el hub de ubicaciones")
+                time.sleep(1)
+        finally:
+            with self._lock:
+                if self._hilo is threading.current_thread():
+                    self._hilo = None
+
+    def _observar(self):
+        """Loop del change stream, reanudado con el último resume token."""
+        if UbicacionBuque.es_timeseries():
+            # Las colecciones time-series no admiten change streams: se observa
+            # la colección de ubicaciones actuales, que recibe la última
+            # ubicación de cada barco en cada escritura
+            collection = UbicacionBuque.get_collection_actuales()
+            pipeline = [{'$match': {'operationType': {'$in': ['insert', 'replace']}}}]
+        else:
+            collection = UbicacionBuque.get_collection()
+            pipeline = [{'$match': {'operationType': 'insert'}}]
+
+        with collection.watch(
+            pipeline,
+            resume_after=self._resume_token,
+            max_await_time_ms=1000
+        ) as stream:
+            while self._hay_suscripciones():
+                cambio = stream.try_next()
+                # El token avanza antes de publicar: un documento que falla al
+                # renderizarse no se vuelve a leer al reanudar
+                self._resume_token = stream.resume_token
+                if cambio is not None:
+                    self._publicar(cambio['fullDocument'])
+
+    def _publicar(self, doc: dict):
+        """Renderiza la ubicación una vez y la entrega a las suscripciones que la aceptan."""
+        with self._lock:
+            destinatarios = [s for s in self._suscripciones if s.acepta(doc)]
+
+        if not destinatarios:
+            return
+
+        if 'ubicacion_id' in doc:
+            # Documento de ubicaciones_actuales: el id es el del historial
+            doc = dict(doc, _id=doc['ubicacion_id'])
+
+        datos = ORJSONRenderer().render(UbicacionBuqueSerializer().to_representation(doc))
+        evento = b'id: ' + str(doc['_id']).encode() + b'\nevent: ubicacion\ndata: ' + datos + b'\n\n'
+        for suscripcion in destinatarios:
+            suscripcion.entregar(evento)
+
+
+class EventStreamRenderer(ORJSONRenderer):
+    """
+    Renderer de `text/event-stream`, el Accept que envía EventSource. Los
+    eventos se escriben directamente en la StreamingHttpResponse; este
+    renderer solo se usa para las respuestas de error (400, 401...), que se
+    envían como un evento `error` con el cuerpo JSON.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b'event: error\ndata: ' + super().render(data) + b'\n\n'
+
+
+def eventos_sse(suscripcion: Suscripcion):
+    """
+    Generador de eventos Server-Sent Events para una suscripción.
+    Envía un comentario de keep-alive si no hay ubicaciones nuevas y cancela
+    la suscripción cuando el cliente se desconecta.
+    """
+    try:
+        yield b'retry: 3000\n\n'
+        while True:
+            try:
+                yield suscripcion.cola.get(timeout=settings.UBICACIONES_STREAM_HEARTBEAT)
+            except queue.Empty:
+                yield b': keep-alive\n\n'
+    finally:
+        hub.cancelar(suscripcion)
+
+
+async def aeventos_sse(suscripcion: Suscripcion):
+    """
+    Versión asíncrona de `eventos_sse` para servidores ASGI: espera en el loop
+    sin ocupar un hilo por cliente. La suscripción debe estar vinculada al
+    loop (`vincular_loop`). Django cancela el generador cuando el cliente se
+    desconecta.
+    """
+    try:
+        yield b'retry: 3000\n\n'
+        while True:
+            evento = await suscripcion.aobtener(settings.UBICACIONES_STREAM_HEARTBEAT)
+            yield evento if evento is not None else b': keep-alive\n\n'
+    finally:
+        hub.cancelar(suscripcion)
+
+
+# Instancia global del hub
+hub = HubUbicaciones()
@@ -0,0 +1,672 @@
+import asyncio
+import hashlib
+import json
+import threading
+import urllib.error
+from collections import namedtuple
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from pymongo.errors import BulkWriteError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from port_control import mongodb
+from personal.models import Personal
+from ubicaciones import cache, geocercas, trayectorias, views, views_async
+from ubicaciones.generador_carga import EmisorHTTP
+from ubicaciones.models import UbicacionBuque
+from ubicaciones.serializers import UbicacionBuqueSerializer
+from ubicaciones.signals import ubicaciones_actualizadas
+from ubicaciones.stream import HubUbicaciones, Suscripcion, aeventos_sse
+
+
+class StreamUbicacionesTests(SimpleTestCase):
+    """GET /api/ubicaciones/stream/ con el Accept que envía EventSource."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.usuario = Personal(username='operador', rol=Personal.Roles.OPERADOR_TERMINAL)
+
+    def _get(self, ruta):
+        request = self.factory.get(ruta, HTTP_ACCEPT='text/event-stream')
+        force_authenticate(request, user=self.usuario)
+        return views.stream_ubicaciones(request)
+
+    @mock.patch('ubicaciones.views.hub')
+    def test_acepta_event_stream(self, hub):
+        hub.suscribir.return_value = Suscripcion()
+        response = self._get('/api/ubicaciones/stream/')
+        try:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            self.assertEqual(next(iter(response.streaming_content)), b'retry: 3000\n\n')
+        finally:
+            response.close()
+
+    def test_error_como_evento(self):
+        response = self._get('/api/ubicaciones/stream/?bbox=1,2')
+        response.render()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.content.startswith(b'event: error\ndata: {'))
+
+
+BARCO = '9a1f3c2e-5b7d-4e8f-a6c1-2d3e4f5a6b7c'
+
+
+@mock.patch.object(views_async._autenticacion, 'authenticate',
+                   return_value=(Personal(username='operador', rol=Personal.Roles.OPERADOR_TERMINAL), None))
+class StreamUbicacionesAsyncTests(SimpleTestCase):
+    """Vista ASGI del stream: los eventos se esperan en el loop, sin ocupar un hilo."""
+
+    def _get(self, ruta):
+        request = AsyncRequestFactory().get(ruta, headers={'Accept': 'text/event-stream'})
+        return views_async.stream_ubicaciones(request)
+
+    @override_settings(UBICACIONES_STREAM_HEARTBEAT=0.05)
+    @mock.patch('ubicaciones.views_async.hub')
+    def test_eventos(self, hub, _):
+        suscripcion = Suscripcion()
+        hub.suscribir.return_value = suscripcion
+        evento = b'id: 1\nevent: ubicacion\ndata: {}\n\n'
+
+        async def leer():
+            response = await self._get('/api/ubicaciones/stream/?barco_id=' + BARCO)
+            self.assertTrue(response.is_async)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            contenido = aiter(response)
+            partes = [await anext(contenido), await anext(contenido)]
+            # Entrega desde otro hilo, como el del change stream
+            asyncio.get_running_loop().call_later(0.01, lambda: threading.Thread(
+                target=suscripcion.entregar, args=(evento,)).start())
+            partes.append(await anext(contenido))
+            await contenido.aclose()
+            return partes
+
+        partes = asyncio.run(leer())
+        self.assertEqual(partes, [b'retry: 3000\n\n', b': keep-alive\n\n', evento])
+        hub.suscribir.assert_called_once_with(barco_ids=[BARCO], bbox=None)
+
+    def test_error_como_evento(self, _):
+        response = asyncio.run(self._get('/api/ubicaciones/stream/?bbox=1,2'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.content.startswith(b'event: error\ndata: {'))
+
+    @mock.patch('ubicaciones.stream.hub')
+    def test_cancela_al_desconectar(self, hub, _):
+        suscripcion = Suscripcion()
+
+        async def desconectar():
+            suscripcion.vincular_loop()
+            eventos = aeventos_sse(suscripcion)
+            await anext(eventos)
+            await eventos.aclose()
+
+        asyncio.run(desconectar())
+        hub.cancelar.assert_called_once_with(suscripcion)
+
+
+class HubUbicacionesTests(SimpleTestCase):
+    """Hilo del change stream compartido por las suscripciones."""
+
+    def setUp(self):
+        self.hub = HubUbicaciones()
+        self.stream = mock.MagicMock(resume_token={'_data': 'token'})
+        self.stream.__enter__.return_value = self.stream
+        cambios = [{'fullDocument': {'barco_id': BARCO}}]
+        self.stream.try_next.side_effect = lambda: cambios.pop() if cambios else None
+        self.collection = mock.Mock()
+        for objetivo in (
+            mock.patch.object(UbicacionBuque, 'es_timeseries', return_value=False),
+            mock.patch.object(UbicacionBuque, 'get_collection', return_value=self.collection),
+            mock.patch('ubicaciones.stream.time.sleep'),
+        ):
+            objetivo.start()
+            self.addCleanup(objetivo.stop)
+
+    def _escuchar_hasta_publicar(self):
+        publicado = threading.Event()
+        with mock.patch.object(self.hub, '_publicar', side_effect=lambda doc: publicado.set()) as publicar:
+            suscripcion = self.hub.suscribir()
+            hilo = self.hub._hilo
+            self.assertTrue(publicado.wait(5))
+            self.hub.cancelar(suscripcion)
+            hilo.join(5)
+        self.assertFalse(hilo.is_alive())
+        self.assertIsNone(self.hub._hilo)
+        return publicar
+
+    def test_reanuda_tras_error_inesperado(self):
+        self.collection.watch.side_effect = [ValueError('fallo'), self.stream]
+        with self.assertLogs('ubicaciones.stream', 'ERROR') as registro:
+            publicar = self._escuchar_hasta_publicar()
+        self.assertIn('Error inesperado', registro.output[0])
+        publicar.assert_called_once_with({'barco_id': BARCO})
+        self.assertEqual(self.collection.watch.call_count, 2)
+
+    def test_hilo_terminado_se_reinicia(self):
+        # Un error que escapa del loop libera el hilo para la próxima suscripción
+        with mock.patch.object(self.hub, '_hay_suscripciones', side_effect=KeyboardInterrupt), \
+                mock.patch('threading.excepthook'):
+            suscripcion = self.hub.suscribir()
+            self.hub._hilo.join(5)
+        self.assertIsNone(self.hub._hilo)
+        self.hub.cancelar(suscripcion)
+
+        self.collection.watch.return_value = self.stream
+        self._escuchar_hasta_publicar()
+
+
+def _zona(zona_id, *anillos):
+    return geocercas.Zona(zona_id, zona_id, 'patio', {'type': 'Polygon', 'coordinates': [
+        [list(punto) for punto in anillo] + [list(anillo[0])] for anillo in anillos
+    ]})
+
+
+class GeocercasTests(SimpleTestCase):
+    """Índice en grilla y clasificación punto-en-polígono, escalar y en lote."""
+
+    def setUp(self):
+        self.muelle = _zona('muelle', [(0, 0), (1, 0), (1, 1), (0, 1)])
+        self.vecina = _zona('vecina', [(1, 0), (2, 0), (2, 1), (1, 1)])
+        # Área portuaria que contiene al muelle
+        self.puerto = _zona('puerto', [(-1, -1), (3, -1), (3, 2), (-1, 2)])
+        # Forma de U: el hueco entre los brazos no es parte de la zona
+        self.u = _zona('u', [(10, 0), (13, 0), (13, 3), (12, 3), (12, 1), (11, 1), (11, 3), (10, 3)])
+        self.anillo = _zona('anillo', [(20, 0), (23, 0), (23, 3), (20, 3)], [(21, 1), (22, 1), (22, 2), (21, 2)])
+
+    def _indice(self, *zonas, celda=0.5):
+        return geocercas.IndiceZonas(list(zonas), celda)
+
+    def _ids(self, indice, puntos):
+        """Clasificación escalar y en lote de los mismos puntos."""
+        escalar = [getattr(indice.clasificar(lon, lat), 'id', None) for lon, lat in puntos]
+        lon, lat = np.array(puntos, dtype=float).T
+        lote = [indice.zonas[p].id if p >= 0 else None for p in indice.clasificar_lote(lon, lat)]
+        self.assertEqual(escalar, lote)
+        return escalar
+
+    def test_grilla(self):
+        indice = self._indice(self.muelle, self.u)
+        self.assertEqual(indice.celdas[(0, 0)], [self.muelle])
+        self.assertEqual(indice.celdas[(25, 5)], [self.u])
+        self.assertNotIn((5, 0), indice.celdas)
+        self.assertEqual(self._ids(indice, [(0.5, 0.5), (2.6, 0.5), (-5, -5)]), ['muelle', None, None])
+
+    def test_borde_y_vertice_compartidos(self):
+        # Un punto del borde o vértice común pertenece a una sola de las zonas vecinas
+        indice = self._indice(self.muelle, self.vecina)
+        for punto in [(1, 0.5), (1, 0), (0.5, 0), (1.5, 0)]:
+            with self.subTest(punto=punto):
+                self.assertEqual(self._ids(indice, [punto]), ['vecina' if punto[0] >= 1 else 'muelle'])
+        self.assertEqual(self._ids(indice, [(1, 1), (0.5, 1)]), [None, None])
+
+    def test_poligono_concavo(self):
+        indice = self._indice(self.u)
+        self.assertEqual(
+            self._ids(indice, [(10.5, 2.5), (12.5, 2.5), (11.5, 0.5), (11.5, 2)]),
+            ['u', 'u', 'u', None],
+        )
+
+    def test_hueco(self):
+        indice = self._indice(self.anillo)
+        self.assertEqual(self._ids(indice, [(20.5, 1.5), (21.5, 1.5)]), ['anillo', None])
+
+    def test_zonas_superpuestas(self):
+        indice = self._indice(self.puerto, self.muelle)
+        self.assertEqual(self._ids(indice, [(0.5, 0.5), (2.5, 0.5)]), ['muelle', 'puerto'])
+
+    def test_lote_coincide_con_escalar(self):
+        indice = self._indice(self.puerto, self.muelle, self.vecina, self.u, self.anillo)
+        aleatorios = np.random.default_rng(0).uniform([-2, -2], [24, 4], size=(2000, 2))
+        # Incluye vértices y puntos sobre bordes, donde los redondeos podrían diferir
+        bordes = [(x, y) for x in range(-1, 24) for y in (-1, 0, 0.5, 1, 2, 3)]
+        self._ids(indice, [tuple(punto) for punto in aleatorios] + bordes)
+
+
+class TransicionesZonasTests(SimpleTestCase):
+    """Eventos de entrada y salida entre ubicaciones consecutivas de un barco."""
+
+    def _doc(self, minuto, zona_id, barco_id='b1'):
+        return {
+            '_id': f'{barco_id}-{minuto}', 'barco_id': barco_id, 'zona_id': zona_id,
+            'timestamp': datetime(2025, 1, 1, 10, minuto),
+            'ubicacion': {'type': 'Point', 'coordinates': [0, 0]},
+        }
+
+    def _eventos(self, docs, previas=None):
+        return [
+            (evento['tipo'], evento['barco_id'], evento['zona_id'], evento['ubicacion_id'])
+            for evento in geocercas.calcular_transiciones(docs, previas or {})
+        ]
+
+    def test_entradas_y_salidas(self):
+        docs = [self._doc(1, None), self._doc(2, 'A'), self._doc(3, 'A'), self._doc(4, 'B'), self._doc(5, None)]
+        self.assertEqual(self._eventos(docs), [
+            ('entrada', 'b1', 'A', 'b1-2'),
+            ('salida', 'b1', 'A', 'b1-4'),
+            ('entrada', 'b1', 'B', 'b1-4'),
+            ('salida', 'b1', 'B', 'b1-5'),
+        ])
+
+    def test_orden_temporal_y_zona_previa(self):
+        previas = {'b1': {'zona_id': 'A', 'timestamp': datetime(2025, 1, 1, 10, 2)}}
+        # Desordenados, y uno anterior a la ubicación vigente que no cuenta
+        docs = [self._doc(4, None), self._doc(1, 'B'), self._doc(3, 'A'), self._doc(5, 'A', barco_id='b2')]
+        self.assertEqual(self._eventos(docs, previas), [
+            ('salida', 'b1', 'A', 'b1-4'),
+            ('entrada', 'b2', 'A', 'b2-5'),
+        ])
+
+
+@override_settings(UBICACIONES_INTENTOS_ZONA=3)
+@mock.patch.object(geocercas, 'registrar_transiciones')
+class ActualizarActualesTests(SimpleTestCase):
+    """Reemplazo de ubicaciones_actuales condicionado a la zona leída."""
+
+    def setUp(self):
+        self.collection = mock.Mock()
+        for objetivo in (
+            mock.patch.object(UbicacionBuque, 'get_collection_actuales', return_value=self.collection),
+            mock.patch.object(geocercas, 'get_indice', return_value=geocercas.IndiceZonas([], 1)),
+        ):
+            objetivo.start()
+            self.addCleanup(objetivo.stop)
+        self.doc = {
+            '_id': 'u1', 'barco_id': 'b1', 'zona_id': 'B', 'timestamp': datetime(2025, 1, 1, 10, 5),
+            'ubicacion': {'type': 'Point', 'coordinates': [0, 0]},
+        }
+
+    def _previa(self, zona_id, minuto):
+        return [{'_id': 'b1', 'zona_id': zona_id, 'timestamp': datetime(2025, 1, 1, 10, minuto)}]
+
+    @staticmethod
+    def _choque():
+        return BulkWriteError({'writeErrors': [{'index': 0, 'code': 11000, 'errmsg': 'duplicado'}]})
+
+    def _filtros(self):
+        return [llamada.args[0][0]._filter for llamada in self.collection.bulk_write.call_args_list]
+
+    def test_sin_concurrencia(self, registrar):
+        self.collection.find.return_value = self._previa('A', 0)
+        UbicacionBuque._actualizar_actuales([self.doc])
+        self.assertEqual(self._filtros(), [
+            {'_id': 'b1', 'timestamp': {'$lte': self.doc['timestamp']}, 'zona_id': 'A'},
+        ])
+        registrar.assert_called_once_with([self.doc], {'b1': self._previa('A', 0)[0]})
+
+    def test_reintenta_si_otro_escritor_cambio_la_zona(self, registrar):
+        # Otro proceso movió el barco a C entre la lectura y la escritura
+        self.collection.find.side_effect = [self._previa('A', 0), self._previa('C', 3)]
+        self.collection.bulk_write.side_effect = [self._choque(), None]
+        UbicacionBuque._actualizar_actuales([self.doc])
+        self.assertEqual([filtro['zona_id'] for filtro in self._filtros()], ['A', 'C'])
+        self.assertEqual(registrar.call_args_list, [
+            mock.call([], {'b1': self._previa('A', 0)[0]}),
+            mock.call([self.doc], {'b1': self._previa('C', 3)[0]}),
+        ])
+
+    def test_ubicacion_atrasada_no_se_reintenta(self, registrar):
+        self.collection.find.side_effect = [self._previa('A', 0), self._previa('C', 9)]
+        self.collection.bulk_write.side_effect = [self._choque()]
+        UbicacionBuque._actualizar_actuales([self.doc])
+        self.assertEqual(self.collection.bulk_write.call_count, 1)
+        registrar.assert_called_once_with([], {'b1': self._previa('A', 0)[0]})
+
+    def test_ultimo_intento_sin_condicion_de_zona(self, registrar):
+        self.collection.find.side_effect = [self._previa(zona, minuto) for zona, minuto in (('A', 0), ('C', 1), ('D', 2))]
+        self.collection.bulk_write.side_effect = [self._choque(), self._choque(), None]
+        UbicacionBuque._actualizar_actuales([self.doc])
+        self.assertEqual([filtro.get('zona_id', '-') for filtro in self._filtros()], ['A', 'C', '-'])
+        self.assertEqual(registrar.call_args_list[-1], mock.call([self.doc], {'b1': self._previa('D', 2)[0]}))
+
+
+class TrayectoriasTests(SimpleTestCase):
+    """Douglas-Peucker y Visvalingam-Whyatt sobre puntos en metros."""
+
+    ALGORITMOS = (trayectorias.douglas_peucker, trayectorias.visvalingam)
+
+    # Zigzag con desvíos de 50 m sobre una recta de 1 km
+    ZIGZAG = [(0, 0), (100, 50), (200, 0), (300, 50), (400, 0), (500, 0), (1000, 0)]
+
+    def test_colineales_se_reducen_a_los_extremos(self):
+        puntos = [(x, 2 * x) for x in range(0, 1000, 100)]
+        for algoritmo in self.ALGORITMOS:
+            with self.subTest(algoritmo=algoritmo.__name__):
+                self.assertEqual(algoritmo(puntos, 1), [0, 9])
+
+    def test_tolerancia_cero_no_elimina_puntos(self):
+        # Incluye puntos colineales y repetidos, con distancia y área 0
+        puntos = self.ZIGZAG + [(1000, 0), (1500, 0), (2000, 0)]
+        for algoritmo in self.ALGORITMOS:
+            with self.subTest(algoritmo=algoritmo.__name__):
+                self.assertEqual(algoritmo(puntos, 0), list(range(len(puntos))))
+
+    def test_uno_y_dos_puntos(self):
+        for algoritmo in self.ALGORITMOS:
+            with self.subTest(algoritmo=algoritmo.__name__):
+                self.assertEqual(algoritmo([], 10), [])
+                self.assertEqual(algoritmo([(5, 5)], 10), [0])
+                self.assertEqual(algoritmo([(5, 5), (5, 5)], 10), [0, 1])
+
+    def test_conserva_extremos(self):
+        for algoritmo in self.ALGORITMOS:
+            for tolerancia in (1, 30, 100, 10000):
+                with self.subTest(algoritmo=algoritmo.__name__, tolerancia=tolerancia):
+                    indices = algoritmo(self.ZIGZAG, tolerancia)
+                    self.assertEqual((indices[0], indices[-1]), (0, len(self.ZIGZAG) - 1))
+                    self.assertEqual(indices, sorted(set(indices)))
+
+    def test_tolerancia(self):
+        # Los desvíos de 50 m se conservan por debajo de esa tolerancia y se eliminan por encima
+        self.assertEqual(trayectorias.douglas_peucker(self.ZIGZAG, 30), [0, 1, 2, 3, 4, 6])
+        self.assertEqual(trayectorias.douglas_peucker(self.ZIGZAG, 60), [0, 6])
+        # Triángulos de 5000 m²: umbral 70² = 4900 los conserva; al eliminar un
+        # punto el triángulo de sus vecinos crece, así que con 71 quedan algunos
+        self.assertEqual(trayectorias.visvalingam(self.ZIGZAG, 70), [0, 1, 2, 3, 4, 6])
+        self.assertEqual(trayectorias.visvalingam(self.ZIGZAG, 71), [0, 3, 4, 6])
+        self.assertEqual(trayectorias.visvalingam(self.ZIGZAG, 1000), [0, 6])
+
+    def test_simplificar_en_metros(self):
+        # Desvío de ~55 m hacia el norte a mitad de un tramo de ~2 km hacia el este
+        # (triángulo de ~61000 m², menor que 300²)
+        Ubicacion = namedtuple('Ubicacion', 'longitud latitud')
+        ubicaciones = [Ubicacion(-79.5, 9.0), Ubicacion(-79.49, 9.0005), Ubicacion(-79.48, 9.0)]
+        for algoritmo in trayectorias.ALGORITMOS:
+            with self.subTest(algoritmo=algoritmo):
+                self.assertEqual(trayectorias.simplificar(ubicaciones, algoritmo, 20), ubicaciones)
+                self.assertEqual(trayectorias.simplificar(ubicaciones, algoritmo, 300), [ubicaciones[0], ubicaciones[2]])
+
+
+def _insertar_lote(ubicaciones):
+    """Reemplazo de UbicacionBuque.insertar_lote: MongoDB rechaza las de velocidad 99."""
+    ids, errores = [], []
+    for indice, ubicacion in enumerate(ubicaciones):
+        if ubicacion.velocidad == 99:
+            ids.append(None)
+            errores.append({'indice': indice, 'mensaje': 'E11000 duplicate key'})
+        else:
+            ids.append(f'id{indice}')
+    return ids, errores
+
+
+@override_settings(UBICACIONES_LOTE_ESCRITURA=2, UBICACIONES_LOTE_MAXIMO=10)
+@mock.patch.object(UbicacionBuque, 'insertar_lote', side_effect=_insertar_lote)
+class RegistrarLoteTests(SimpleTestCase):
+    """POST /api/ubicaciones/registrar/lote/ con arreglos JSON y NDJSON, en trozos de 2."""
+
+    def _ubicacion(self, **extra):
+        return {'barco_id': BARCO, 'latitud': 9.0, 'longitud': -79.5, **extra}
+
+    def _post(self, cuerpo, content_type):
+        request = APIRequestFactory().post('/api/ubicaciones/registrar/lote/', cuerpo, content_type=content_type)
+        force_authenticate(request, user=Personal(username='operador', rol=Personal.Roles.OPERADOR_TERMINAL))
+        return views.registrar_ubicaciones_lote(request)
+
+    def _post_json(self, datos):
+        return self._post(json.dumps(datos), 'application/json')
+
+    def _post_ndjson(self, lineas):
+        return self._post('\n'.join(lineas).encode(), 'application/x-ndjson')
+
+    def test_todo_valido(self, insertar):
+        response = self._post_json([self._ubicacion() for _ in range(3)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'success': True, 'recibidas': 3, 'insertadas': 3, 'rechazadas': 0, 'errores': []})
+        self.assertEqual([len(llamada.args[0]) for llamada in insertar.call_args_list], [2, 1])
+
+    def test_indices_globales_entre_trozos(self, insertar):
+        response = self._post_json([
+            self._ubicacion(),
+            self._ubicacion(latitud=100),
+            self._ubicacion(),
+            self._ubicacion(estado='hundido'),
+            self._ubicacion(velocidad=99),
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['recibidas'], response.data['insertadas']), (5, 2))
+        self.assertEqual([error['indice'] for error in response.data['errores']], [1, 3, 4])
+        self.assertIn('latitud', response.data['errores'][0]['errores'])
+        self.assertIn('estado', response.data['errores'][1]['errores'])
+        self.assertEqual(response.data['errores'][2]['errores'], {'non_field_errors': ['E11000 duplicate key']})
+        self.assertEqual(insertar.call_count, 3)
+
+    def test_ndjson_con_linea_invalida(self, insertar):
+        response = self._post_ndjson([
+            json.dumps(self._ubicacion()),
+            '',
+            '{"barco_id": ',
+            json.dumps(self._ubicacion()),
+            json.dumps(self._ubicacion(longitud=200)),
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['recibidas'], response.data['insertadas']), (4, 2))
+        linea, validacion = response.data['errores']
+        # Los índices cuentan ubicaciones (sin líneas vacías); `linea` es la del cuerpo
+        self.assertEqual((linea['indice'], linea['linea']), (1, 3))
+        self.assertTrue(linea['errores']['non_field_errors'][0].startswith('JSON inválido'))
+        self.assertEqual(validacion['indice'], 3)
+        self.assertIn('longitud', validacion['errores'])
+
+    def test_todo_invalido(self, insertar):
+        response = self._post_ndjson(['no es json', json.dumps(self._ubicacion(latitud='x'))])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['insertadas'], response.data['rechazadas']), (0, 2))
+        insertar.assert_not_called()
+
+    def test_cuerpos_rechazados(self, insertar):
+        for cuerpo in ([], self._ubicacion(), [self._ubicacion()] * 11):
+            with self.subTest(cuerpo=cuerpo):
+                self.assertEqual(self._post_json(cuerpo).status_code, 400)
+        self.assertEqual(self._post_ndjson(['', '']).status_code, 400)
+        insertar.assert_not_called()
+
+    def test_serializer_de_lote(self, _):
+        serializer = UbicacionBuqueSerializer(data=[
+            self._ubicacion(), self._ubicacion(rumbo=400), self._ubicacion(velocidad=5),
+        ], many=True)
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.indices_validos, [0, 2])
+        self.assertEqual([error['indice'] for error in serializer.errores_items], [1])
+        self.assertEqual([datos['velocidad'] for datos in serializer.validated_data], [0.0, 5])
+
+
+class SnapshotFlotaTests(SimpleTestCase):
+    """Snapshot de /api/ubicaciones/actuales/: ETag, 304 e invalidación por generación."""
+
+    def setUp(self):
+        self.docs = [{
+            '_id': 'b1', 'barco_id': 'b1', 'ubicacion_id': '65a1b2c3d4e5f6a7b8c9d001',
+            'ubicacion': {'type': 'Point', 'coordinates': [-79.5, 9.0]},
+            'timestamp': datetime(2025, 1, 1, 10), 'velocidad': 12.0,
+        }]
+        self.collection = mock.Mock()
+        self.collection.find.side_effect = lambda *args, **kwargs: [dict(doc) for doc in self.docs]
+        self.snapshot = cache.SnapshotFlota(cache.MemoriaLocalBackend(ttl=60))
+        for objetivo in (
+            mock.patch.object(UbicacionBuque, 'get_collection_actuales', return_value=self.collection),
+            mock.patch.object(cache, '_snapshot_flota', self.snapshot),
+        ):
+            objetivo.start()
+            self.addCleanup(objetivo.stop)
+
+    def _get(self, **headers):
+        request = APIRequestFactory().get('/api/ubicaciones/actuales/', **headers)
+        force_authenticate(request, user=Personal(username='operador', rol=Personal.Roles.OPERADOR_TERMINAL))
+        return views.obtener_ubicaciones_actuales(request)
+
+    def _mover(self, longitud):
+        self.docs[0]['ubicacion'] = {'type': 'Point', 'coordinates': [longitud, 9.0]}
+        ubicaciones_actualizadas.send(sender=UbicacionBuque, docs=self.docs)
+
+    def test_etag_y_304(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(etag, f'"{hashlib.sha1(response.content).hexdigest()}"')
+        self.assertEqual(json.loads(response.content)['data'][0]['longitud'], -79.5)
+
+        for valor in (etag, f'"otro", {etag}', '*'):
+            with self.subTest(if_none_match=valor):
+                response = self._get(HTTP_IF_NONE_MATCH=valor)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH='"otro"').status_code, 200)
+        # Todos los sondeos salieron del snapshot
+        self.assertEqual(self.collection.find.call_count, 1)
+
+    def test_escritura_invalida_el_snapshot(self):
+        etag = self._get()['ETag']
+        self._mover(-79.4)
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['data'][0]['longitud'], -79.4)
+        self.assertEqual(self.collection.find.call_count, 2)
+
+    def test_snapshot_construido_antes_de_invalidar_no_se_guarda(self):
+        # Una escritura llega mientras se consulta la flota
+        consultar = self.collection.find.side_effect
+
+        def consulta_con_escritura(*args, **kwargs):
+            docs = consultar()
+            self._mover(-79.3)
+            return docs
+
+        self.collection.find.side_effect = consulta_con_escritura
+        cuerpo, _ = self.snapshot.obtener()
+        self.assertIn(b'-79.5', cuerpo)
+        self.assertIsNone(self.snapshot.backend.get())
+
+        self.collection.find.side_effect = consultar
+        cuerpo, _ = self.snapshot.obtener()
+        self.assertIn(b'-79.3', cuerpo)
+        self.assertEqual(self.snapshot.backend.get()[0], cuerpo)
+
+    def test_ttl_de_memoria_local(self):
+        self.snapshot.backend.ttl = 0
+        self.snapshot.obtener()
+        self.snapshot.obtener()
+        self.assertEqual(self.collection.find.call_count, 2)
+
+
+class HistorialReducidoTests(SimpleTestCase):
+    """Respuestas del historial con bucket/simplify, que serializan instancias de UbicacionBuque."""
+
+    def _ubicacion(self, indice, **extra):
+        return UbicacionBuque.from_dict({
+            '_id': f'65a1b2c3d4e5f6a7b8c9d0{indice:02d}',
+            'barco_id': 'b1',
+            'ubicacion': {'type': 'Point', 'coordinates': [-70.0 + indice / 100, -33.0]},
+            'timestamp': datetime(2025, 1, 1) + timedelta(minutes=indice),
+            **extra,
+        })
+
+    def test_fields_incluye_id(self):
+        ubicaciones = [self._ubicacion(indice) for indice in range(3)]
+        inicio, fin = datetime(2025, 1, 1), datetime(2025, 1, 2)
+        respuesta = views._respuesta_reducida(ubicaciones, inicio, fin, 60, None, 10.0, ['id', 'latitud'])
+        self.assertEqual(
+            [fila['id'] for fila in respuesta['data']],
+            ['65a1b2c3d4e5f6a7b8c9d000', '65a1b2c3d4e5f6a7b8c9d001', '65a1b2c3d4e5f6a7b8c9d002'],
+        )
+
+    def test_id_de_ubicacion_actual(self):
+        # En ubicaciones_actuales el _id es el barco
+        ubicacion = self._ubicacion(0, _id='b1', ubicacion_id='65a1b2c3d4e5f6a7b8c9d0ff')
+        self.assertEqual(ubicacion.id, '65a1b2c3d4e5f6a7b8c9d0ff')
+
+
+class IniciarSimulacionTests(SimpleTestCase):
+
+    def _post(self, datos):
+        request = APIRequestFactory().post('/api/ubicaciones/simulacion/iniciar/', datos, format='json')
+        force_authenticate(request, user=Personal(username='admin', rol=Personal.Roles.ADMIN))
+        return views.iniciar_simulacion(request)
+
+    @mock.patch('ubicaciones.views.simulador')
+    def test_parametros_invalidos(self, simulador):
+        for datos in ({'barcos_sinteticos': 'mil'}, {'barcos_sinteticos': None},
+                      {'barcos_sinteticos': 100001}, {'intervalo_segundos': 2}):
+            with self.subTest(datos=datos):
+                response = self._post(datos)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(datos)), response.data['errors'])
+        simulador.iniciar.assert_not_called()
+
+    @mock.patch('ubicaciones.views.simulador')
+    def test_valores_por_defecto(self, simulador):
+        response = self._post({'barcos_sinteticos': 10})
+        self.assertEqual(response.status_code, 200)
+        simulador.iniciar.assert_called_once_with(30, 10)
+
+
+class EmisorHTTPTests(SimpleTestCase):
+
+    def test_error_de_conexion_rechaza_el_trozo(self):
+        emisor = EmisorHTTP('http://localhost:9/api/ubicaciones/registrar/lote/', 'token', lote=2)
+        docs = [
+            {'barco_id': 'b1', 'ubicacion': {'type': 'Point', 'coordinates': [-70.0, -33.0]},
+             'velocidad': 12.0, 'rumbo': 90.0, 'timestamp': datetime(2025, 1, 1),
+             'estado': 'en_transito', 'metadata': {}}
+            for _ in range(3)
+        ]
+        errores = [urllib.error.URLError(ConnectionRefusedError()), TimeoutError()]
+        with mock.patch('urllib.request.urlopen', side_effect=errores):
+            self.assertEqual(emisor.enviar(docs), (0, 3))
+
+
+class ParsearCuerpoAsyncTests(SimpleTestCase):
+    """_parsear_cuerpo de las vistas ASGI lee el NDJSON del stream, sin request.body."""
+
+    def _request(self, cuerpo, content_type):
+        return RequestFactory().post('/api/ubicaciones/registrar/lote/', cuerpo, content_type=content_type)
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_ndjson_por_lineas(self):
+        lineas = [f'{{"barco_id": "b1", "indice": {indice}}}' for indice in range(50)]
+        request = self._request('\n'.join(lineas) + '\nno-json\n', 'application/x-ndjson')
+        datos = views_async._parsear_cuerpo(request, ndjson=True)
+        self.assertNotIsInstance(datos, (list, dict))
+        datos = list(datos)
+        self.assertEqual([fila['indice'] for fila in datos[:50]], list(range(50)))
+        self.assertEqual(datos[50].numero, 51)
+
+    def test_cuerpo_vacio(self):
+        self.assertEqual(views_async._parsear_cuerpo(self._request('', 'application/x-ndjson'), ndjson=True), {})
+
+    def test_json(self):
+        request = self._request('[{"barco_id": "b1"}]', 'application/json')
+        self.assertEqual(views_async._parsear_cuerpo(request, ndjson=True), [{'barco_id': 'b1'}])
+
+
+class ClienteMongoAsyncTests(SimpleTestCase):
+
+    def tearDown(self):
+        mongodb._clientes_async.clear()
+
+    @mock.patch('port_control.mongodb.AsyncMongoClient')
+    def test_un_cliente_por_loop_y_cierre_de_loops_terminados(self, AsyncMongoClient):
+        primero, segundo = mock.MagicMock(close=mock.AsyncMock()), mock.MagicMock(close=mock.AsyncMock())
+        AsyncMongoClient.side_effect = [primero, segundo]
+
+        async def pedir_dos_veces():
+            mongodb.get_mongo_db_async()
+            mongodb.get_mongo_db_async()
+
+        async def pedir_y_esperar_cierres():
+            mongodb.get_mongo_db_async()
+            await asyncio.gather(*mongodb._cierres_async)
+
+        asyncio.run(pedir_dos_veces())
+        primero.close.assert_not_called()
+        # Un loop nuevo recibe su propio cliente y el del loop cerrado se cierra
+        asyncio.run(pedir_y_esperar_cierres())
+        self.assertEqual(AsyncMongoClient.call_count, 2)
+        primero.close.assert_awaited_once()
+        segundo.close.assert_not_called()
+        self.assertEqual(list(mongodb._clientes_async.values()), [segundo])
@@ -0,0 +1,152 @@
+"""
+Simplificación de trayectorias de buques.
+
+Los algoritmos trabajan sobre una proyección equirectangular local en metros,
+suficientemente precisa para las distancias de una trayectoria portuaria, de
+modo que la tolerancia se expresa en metros sobre el terreno.
+"""
+import heapq
+import math
+from typing import List, Sequence, Tuple
+
+RADIO_TIERRA_M = 6371000
+
+Punto = Tuple[float, float]
+
+
+def proyectar(ubicaciones: Sequence) -> List[Punto]:
+    """Proyecta las ubicaciones a coordenadas (x, y) en metros."""
+    if not ubicaciones:
+        return []
+
+    latitud_media = sum(u.latitud for u in ubicaciones) / len(ubicaciones)
+    factor_lon = math.cos(math.radians(latitud_media))
+
+    return [
+        (
+            RADIO_TIERRA_M * math.radians(u.longitud) * factor_lon,
+            RADIO_TIERRA_M * math.radians(u.latitud)
+        )
+        for u in ubicaciones
+    ]
+
+
+def _distancia_a_segmento(p: Punto, a: Punto, b: Punto) -> float:
+    """Distancia en metros del punto p al segmento a-b."""
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    if dx == 0 and dy == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+
+    t = ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    return math.hypot(p[0] - (a[0] + t * dx), p[1] - (a[1] + t * dy))
+
+
+def _area_triangulo(a: Punto, b: Punto, c: Punto) -> float:
+    """Área en m² del triángulo a-b-c."""
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def douglas_peucker(puntos: Sequence[Punto], tolerancia: float) -> List[int]:
+    """
+    Simplifica con Douglas-Peucker.
+    Retorna los índices conservados, conservando siempre el primero y el último.
+    Con tolerancia 0 no se elimina ningún punto, como en visvalingam.
+    """
+    n = len(puntos)
+    if n < 3 or tolerancia <= 0:
+        return list(range(n))
+
+    conservar = [False] * n
+    conservar[0] = conservar[-1] = True
+
+    # Versión iterativa para no depender del límite de recursión
+    pila = [(0, n - 1)]
+    while pila:
+        inicio, fin = pila.pop()
+        distancia_max = 0.0
+        indice_max = None
+        for i in range(inicio + 1, fin):
+            distancia = _distancia_a_segmento(puntos[i], puntos[inicio], puntos[fin])
+            if distancia > distancia_max:
+                distancia_max = distancia
+                indice_max = i
+
+        if indice_max is not None and distancia_max > tolerancia:
+            conservar[indice_max] = True
+            pila.append((inicio, indice_max))
+            pila.append((indice_max, fin))
+
+    return [i for i, conservado in enumerate(conservar) if conservado]
+
+
+def visvalingam(puntos: Sequence[Punto], tolerancia: float) -> List[int]:
+    """
+    Simplifica con Visvalingam-Whyatt eliminando los puntos cuyo triángulo
+    efectivo tiene un área menor que tolerancia² (m²).
+    Retorna los índices conservados, conservando siempre el primero y el último.
+    """
+    n = len(puntos)
+    if n < 3:
+        return list(range(n))
+
+    umbral = tolerancia * tolerancia
+    anterior = list(range(-1, n - 1))
+    siguiente = list(range(1, n + 1))
+    areas = [math.inf] * n
+    eliminado = [False] * n
+
+    heap = []
+    for i in range(1, n - 1):
+        areas[i] = _area_triangulo(puntos[i - 1], puntos[i], puntos[i + 1])
+        heap.append((areas[i], i))
+    heapq.heapify(heap)
+
+    while heap:
+        area, i = heapq.heappop(heap)
+        if eliminado[i] or area != areas[i]:
+            # Entrada obsoleta: el área del punto cambió tras eliminar un vecino
+            continue
+        if area >= umbral:
+            break
+
+        eliminado[i] = True
+        a, b = anterior[i], siguiente[i]
+        siguiente[a] = b
+        anterior[b] = a
+
+        for vecino in (a, b):
+            if 0 < vecino < n - 1:
+                # El área efectiva nunca disminuye, para no eliminar puntos
+                # que ya superaron a otros eliminados antes
+                nueva = max(
+                    area,
+                    _area_triangulo(puntos[anterior[vecino]], puntos[vecino], puntos[siguiente[vecino]])
+                )
+                areas[vecino] = nueva
+                heapq.heappush(heap, (nueva, vecino))
+
+    return [i for i in range(n) if not eliminado[i]]
+
+
+ALGORITMOS = {
+    'dp': douglas_peucker,
+    'vw': visvalingam,
+}
+
+
+def simplificar(ubicaciones: Sequence, algoritmo: str, tolerancia: float) -> list:
+    """
+    Simplifica una trayectoria ordenada por tiempo.
+
+    Args:
+        ubicaciones: Lista de UbicacionBuque ordenada por timestamp
+        algoritmo: 'dp' (Douglas-Peucker) o 'vw' (Visvalingam-Whyatt)
+        tolerancia: Tolerancia en metros
+
+    Returns:
+        Subconjunto de las ubicaciones originales
+    """
+    indices = ALGORITMOS[algoritmo](proyectar(ubicaciones), tolerancia)
+    return [ubicaciones[i] for i in indices]
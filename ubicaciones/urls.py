@@ -1,23 +1,34 @@
 """
 URLs para el sistema de ubicación de buques.
 """
+from django.conf import settings
 from django.urls import path
-from ubicaciones import views
+from ubicaciones import views, views_async
+
+# En despliegues ASGI, la ingesta y las consultas usan las vistas asíncronas
+vistas = views_async if settings.UBICACIONES_ASYNC else views
 
 app_name = 'ubicaciones'
 
 urlpatterns = [
     # Prueba de conexión
     path('test/', views.test_mongo_connection, name='test-connection'),
+    path('test/pool/', views.estado_pool_mongo, name='estado-pool-mongo'),
     
     # Registro de ubicaciones
-    path('registrar/', views.registrar_ubicacion, name='registrar-ubicacion'),
+    path('registrar/', vistas.registrar_ubicacion, name='registrar-ubicacion'),
+    path('registrar/lote/', vistas.registrar_ubicaciones_lote, name='registrar-ubicaciones-lote'),
     
     # Consultas
-    path('actuales/', views.obtener_ubicaciones_actuales, name='ubicaciones-actuales'),
-    path('barco/<str:barco_id>/', views.obtener_ultima_ubicacion, name='ultima-ubicacion'),
-    path('barco/<str:barco_id>/historial/', views.obtener_historial, name='historial-ubicaciones'),
-    path('cercanos/', views.buscar_buques_cercanos, name='buques-cercanos'),
+    path('actuales/', vistas.obtener_ubicaciones_actuales, name='ubicaciones-actuales'),
+    path('barco/<str:barco_id>/', vistas.obtener_ultima_ubicacion, name='ultima-ubicacion'),
+    path('barco/<str:barco_id>/historial/', vistas.obtener_historial, name='historial-ubicaciones'),
+    path('cercanos/', vistas.buscar_buques_cercanos, name='buques-cercanos'),
+    path('stream/', vistas.stream_ubicaciones, name='stream-ubicaciones'),
+    
+    # Zonas del puerto (geocercas)
+    path('zonas/punto/', views.obtener_zona_punto, name='zona-punto'),
+    path('zonas/eventos/', views.obtener_eventos_zona, name='eventos-zona'),
     
     # Simulación
     path('simulacion/iniciar/', views.iniciar_simulacion, name='iniciar-simulacion'),
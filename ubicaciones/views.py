@@ -2,21 +2,195 @@
 Vistas para el sistema de ubicación en tiempo real de buques.
 """
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import parse_etags
 from datetime import datetime, timedelta
+from itertools import islice
 
+from ubicaciones.cache import get_snapshot_flota
 from ubicaciones.models import UbicacionBuque
-from ubicaciones.serializers import UbicacionBuqueSerializer, BusquedaCercanosSerializer
+from ubicaciones.paginacion import codificar_cursor
+from ubicaciones.parsers import NDJSONParser, LineaInvalida
+from ubicaciones.serializers import (
+    UbicacionBuqueSerializer, BusquedaCercanosSerializer, HistorialSerializer,
+    SuscripcionStreamSerializer, EventosZonaSerializer, PuntoSerializer, SimulacionSerializer
+)
+from ubicaciones import geocercas
+from ubicaciones.stream import EventStreamRenderer, hub, eventos_sse
+from ubicaciones.trayectorias import simplificar
 from ubicaciones.services import simulador
-from port_control.mongodb import test_connection
+from port_control.mongodb import test_connection, get_pool_options, metricas_pool
+from port_control.renderers import ORJSONParser, ORJSONRenderer
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _construir_ubicacion(datos):
+    """Crea un UbicacionBuque a partir de los datos validados por el serializer."""
+    return UbicacionBuque(
+        barco_id=str(datos['barco_id']),
+        latitud=datos['latitud'],
+        longitud=datos['longitud'],
+        velocidad=datos.get('velocidad', 0.0),
+        rumbo=datos.get('rumbo', 0.0),
+        timestamp=datos.get('timestamp'),
+        estado=datos.get('estado', 'en_transito'),
+        metadata=datos.get('metadata', {})
+    )
+
+
+def _procesar_trozo(trozo):
+    """
+    Valida e inserta un trozo del lote.
+    `trozo` es una lista de tuplas (indice_global, item).
+    Retorna (insertadas, errores) con los índices globales de cada error.
+    """
+    ubicaciones, posiciones, errores = _validar_trozo(trozo)
+    if not ubicaciones:
+        return 0, errores
+    
+    ids, errores_escritura = UbicacionBuque.insertar_lote(ubicaciones)
+    return _resultado_trozo(ids, errores_escritura, posiciones, errores)
+
+
+def _validar_trozo(trozo):
+    """
+    Valida un trozo del lote.
+    Retorna (ubicaciones, posiciones, errores): `posiciones[i]` es el índice
+    global de `ubicaciones[i]` y `errores` los rechazos de validación.
+    """
+    errores = []
+    indices = []
+    items = []
+    for indice, item in trozo:
+        if isinstance(item, LineaInvalida):
+            errores.append({
+                'indice': indice,
+                'linea': item.numero,
+                'errores': {'non_field_errors': [item.mensaje]}
+            })
+        else:
+            indices.append(indice)
+            items.append(item)
+    
+    if not items:
+        return [], [], errores
+    
+    serializer = UbicacionBuqueSerializer(data=items, many=True)
+    serializer.is_valid()
+    
+    for error in serializer.errores_items:
+        errores.append({'indice': indices[error['indice']], 'errores': error['errores']})
+    
+    ubicaciones = [_construir_ubicacion(datos) for datos in serializer.validated_data]
+    posiciones = [indices[indice] for indice in serializer.indices_validos]
+    return ubicaciones, posiciones, errores
+
+
+def _resultado_trozo(ids, errores_escritura, posiciones, errores):
+    """Agrega a `errores` los rechazos de MongoDB y retorna (insertadas, errores)."""
+    for error in errores_escritura:
+        errores.append({
+            'indice': posiciones[error['indice']],
+            'errores': {'non_field_errors': [error['mensaje']]}
+        })
+    
+    insertadas = sum(1 for ubicacion_id in ids if ubicacion_id is not None)
+    return insertadas, errores
+
+
+def _resultado_lote(recibidas, insertadas, errores):
+    """Cuerpo y código de estado de la respuesta del registro en lote."""
+    if not errores:
+        respuesta_status = status.HTTP_201_CREATED
+    elif insertadas:
+        respuesta_status = status.HTTP_207_MULTI_STATUS
+    else:
+        respuesta_status = status.HTTP_400_BAD_REQUEST
+    
+    return {
+        'success': not errores,
+        'recibidas': recibidas,
+        'insertadas': insertadas,
+        'rechazadas': len(errores),
+        'errores': errores
+    }, respuesta_status
+
+
+def _rango_historial(parametros):
+    """Rango (inicio, fin) pedido al historial; por defecto, las últimas 24 horas."""
+    inicio_str = parametros.get('inicio')
+    fin_str = parametros.get('fin')
+    
+    if not inicio_str or not fin_str:
+        # Por defecto, últimas 24 horas
+        fin = timezone.now()
+        inicio = fin - timedelta(hours=24)
+    else:
+        inicio = datetime.fromisoformat(inicio_str.replace('Z', '+00:00'))
+        fin = datetime.fromisoformat(fin_str.replace('Z', '+00:00'))
+    return inicio, fin
+
+
+def _respuesta_resumen(resumenes, inicio, fin, resumen):
+    return {
+        'success': True,
+        'count': len(resumenes),
+        'inicio': inicio.isoformat(),
+        'fin': fin.isoformat(),
+        'resumen': resumen,
+        'data': resumenes
+    }
+
+
+def _respuesta_reducida(ubicaciones, inicio, fin, bucket, simplify, tolerancia, campos):
+    """Simplifica (si se pidió) y arma la respuesta del historial reducido."""
+    total_original = len(ubicaciones)
+    if simplify:
+        ubicaciones = simplificar(ubicaciones, simplify, tolerancia)
+    
+    serializer = UbicacionBuqueSerializer(ubicaciones, many=True)
+    data = serializer.data
+    if campos:
+        data = [{campo: fila.get(campo) for campo in campos} for fila in data]
+    
+    respuesta = {
+        'success': True,
+        'count': len(ubicaciones),
+        'inicio': inicio.isoformat(),
+        'fin': fin.isoformat(),
+    }
+    if bucket:
+        respuesta['bucket'] = bucket
+    if simplify:
+        respuesta['simplify'] = simplify
+        respuesta['tolerancia'] = tolerancia
+        respuesta['count_original'] = total_original
+    respuesta['data'] = data
+    return respuesta
+
+
+def _respuesta_snapshot(request, cuerpo, etag):
+    """Respuesta del snapshot de la flota, o 304 si el cliente ya tiene el ETag vigente."""
+    etags_cliente = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in etags_cliente or '*' in etags_cliente:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(cuerpo, content_type='application/json')
+    
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def test_mongo_connection(request):
@@ -41,6 +215,24 @@ def test_mongo_connection(request):
         }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def estado_pool_mongo(request):
+    """
+    Métricas del pool de conexiones a MongoDB del proceso que atiende la
+    petición (cada worker tiene su propio pool).
+    GET /api/ubicaciones/test/pool/
+    """
+    return Response({
+        'success': True,
+        'data': {
+            'pid': os.getpid(),
+            'opciones': get_pool_options(),
+            'metricas': metricas_pool.como_dict()
+        }
+    })
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def registrar_ubicacion(request):
@@ -51,16 +243,7 @@ def registrar_ubicacion(request):
     try:
         serializer = UbicacionBuqueSerializer(data=request.data)
         if serializer.is_valid():
-            ubicacion = UbicacionBuque(
-                barco_id=str(serializer.validated_data['barco_id']),
-                latitud=serializer.validated_data['latitud'],
-                longitud=serializer.validated_data['longitud'],
-                velocidad=serializer.validated_data.get('velocidad', 0.0),
-                rumbo=serializer.validated_data.get('rumbo', 0.0),
-                timestamp=serializer.validated_data.get('timestamp'),
-                estado=serializer.validated_data.get('estado', 'en_transito'),
-                metadata=serializer.validated_data.get('metadata', {})
-            )
+            ubicacion = _construir_ubicacion(serializer.validated_data)
             
             ubicacion_id = ubicacion.save()
             
@@ -83,6 +266,68 @@ def registrar_ubicacion(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([ORJSONParser, NDJSONParser])
+def registrar_ubicaciones_lote(request):
+    """
+    Registra un lote de ubicaciones en una sola petición.
+    POST /api/ubicaciones/registrar/lote/
+    Body: arreglo JSON de ubicaciones (Content-Type: application/json)
+          o una ubicación por línea (Content-Type: application/x-ndjson)
+    
+    Las ubicaciones válidas se insertan en trozos con insert_many no ordenado;
+    las inválidas se reportan por índice sin rechazar el lote completo.
+    """
+    try:
+        datos = request.data
+        
+        # Un objeto JSON suelto o un cuerpo vacío llegan como diccionario
+        if isinstance(datos, dict):
+            return Response({
+                'success': False,
+                'message': 'Se esperaba un arreglo JSON o un cuerpo NDJSON'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # El arreglo JSON ya está en memoria; el NDJSON es un generador que se
+        # consume trozo a trozo, por lo que solo se limita el tamaño del arreglo
+        if isinstance(datos, list) and len(datos) > settings.UBICACIONES_LOTE_MAXIMO:
+            return Response({
+                'success': False,
+                'message': f'El lote excede el máximo de {settings.UBICACIONES_LOTE_MAXIMO} ubicaciones'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        items = enumerate(datos)
+        recibidas = 0
+        insertadas = 0
+        errores = []
+        
+        while True:
+            trozo = list(islice(items, settings.UBICACIONES_LOTE_ESCRITURA))
+            if not trozo:
+                break
+            recibidas += len(trozo)
+            insertadas_trozo, errores_trozo = _procesar_trozo(trozo)
+            insertadas += insertadas_trozo
+            errores.extend(errores_trozo)
+        
+        if recibidas == 0:
+            return Response({
+                'success': False,
+                'message': 'El lote está vacío'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        respuesta, respuesta_status = _resultado_lote(recibidas, insertadas, errores)
+        return Response(respuesta, status=respuesta_status)
+        
+    except Exception as e:
+        logger.error(f"Error al registrar lote de ubicaciones: {e}")
+        return Response({
+            'success': False,
+            'message': f'Error al registrar lote de ubicaciones: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def obtener_ultima_ubicacion(request, barco_id):
@@ -119,17 +364,13 @@ def obtener_ubicaciones_actuales(request):
     """
     Obtiene la última ubicación de todos los barcos.
     GET /api/ubicaciones/actuales/
+    
+    Sirve el snapshot de la flota ya renderizado desde caché. Si el cliente
+    envía If-None-Match con el ETag vigente, responde 304 sin cuerpo.
     """
     try:
-        ubicaciones = UbicacionBuque.get_todas_ubicaciones_actuales()
-        
-        serializer = UbicacionBuqueSerializer(ubicaciones, many=True)
-        
-        return Response({
-            'success': True,
-            'count': len(ubicaciones),
-            'data': serializer.data
-        })
+        cuerpo, etag = get_snapshot_flota().obtener()
+        return _respuesta_snapshot(request, cuerpo, etag)
         
     except Exception as e:
         logger.error(f"Error al obtener ubicaciones actuales: {e}")
@@ -139,38 +380,99 @@ def obtener_ubicaciones_actuales(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer])
+def stream_ubicaciones(request):
+    """
+    Envía las ubicaciones nuevas en vivo mediante Server-Sent Events.
+    GET /api/ubicaciones/stream/?barco_id=uuid1,uuid2&bbox=min_lon,min_lat,max_lon,max_lat
+    
+    Todos los clientes del proceso comparten un único change stream de MongoDB
+    (requiere replica set). Ambos filtros son opcionales. Acepta el
+    `Accept: text/event-stream` de EventSource; los errores se envían como un
+    evento `error`.
+
+    Cada cliente ocupa un hilo del worker mientras está conectado; con muchos
+    clientes usar la vista asíncrona (UBICACIONES_ASYNC con un servidor ASGI).
+    """
+    serializer = SuscripcionStreamSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    suscripcion = hub.suscribir(
+        barco_ids=serializer.validated_data.get('barco_id'),
+        bbox=serializer.validated_data.get('bbox')
+    )
+    
+    response = StreamingHttpResponse(eventos_sse(suscripcion), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule los eventos en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def obtener_historial(request, barco_id):
     """
     Obtiene el historial de ubicaciones de un barco en un rango de tiempo.
     GET /api/ubicaciones/barco/{barco_id}/historial/?inicio=2024-01-01T00:00:00&fin=2024-01-02T00:00:00
+    
+    Parámetros opcionales para reducir la trayectoria:
+    - bucket: segundos por intervalo; MongoDB devuelve una ubicación por intervalo
+    - simplify: dp (Douglas-Peucker) o vw (Visvalingam-Whyatt)
+    - tolerancia: tolerancia de simplify en metros (default: 10)
+    - resumen: hora o dia; devuelve los resúmenes precalculados del barco
+    
+    Sin reducción, la respuesta se transmite a medida que se lee el cursor:
+    - fields: campos a devolver (y a proyectar en MongoDB), separados por coma
+    - limite / cursor: paginación por clave (timestamp, _id)
+    - formato: json (default) o ndjson
     """
     try:
-        inicio_str = request.query_params.get('inicio')
-        fin_str = request.query_params.get('fin')
+        parametros = HistorialSerializer(data=request.query_params)
+        if not parametros.is_valid():
+            return Response({
+                'success': False,
+                'errors': parametros.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        if not inicio_str or not fin_str:
-            # Por defecto, últimas 24 horas
-            fin = timezone.now()
-            inicio = fin - timedelta(hours=24)
-        else:
-            inicio = datetime.fromisoformat(inicio_str.replace('Z', '+00:00'))
-            fin = datetime.fromisoformat(fin_str.replace('Z', '+00:00'))
+        inicio, fin = _rango_historial(request.query_params)
         
-        ubicaciones = UbicacionBuque.get_ubicaciones_por_rango_tiempo(
-            barco_id, inicio, fin
-        )
+        bucket = parametros.validated_data.get('bucket')
+        simplify = parametros.validated_data.get('simplify')
+        tolerancia = parametros.validated_data['tolerancia']
+        campos = parametros.validated_data.get('fields')
+        resumen = parametros.validated_data.get('resumen')
         
-        serializer = UbicacionBuqueSerializer(ubicaciones, many=True)
+        if resumen:
+            resumenes = UbicacionBuque.get_resumenes(barco_id, inicio, fin, resumen)
+            return Response(_respuesta_resumen(resumenes, inicio, fin, resumen))
         
-        return Response({
-            'success': True,
-            'count': len(ubicaciones),
-            'inicio': inicio.isoformat(),
-            'fin': fin.isoformat(),
-            'data': serializer.data
-        })
+        if not bucket and not simplify:
+            return _historial_streaming(
+                barco_id, inicio, fin, campos,
+                despues_de=parametros.validated_data.get('cursor'),
+                limite=parametros.validated_data.get('limite'),
+                formato=parametros.validated_data['formato']
+            )
+        
+        if bucket:
+            ubicaciones = UbicacionBuque.get_ubicaciones_agrupadas(
+                barco_id, inicio, fin, bucket
+            )
+        else:
+            ubicaciones = UbicacionBuque.get_ubicaciones_por_rango_tiempo(
+                barco_id, inicio, fin
+            )
+        
+        return Response(_respuesta_reducida(
+            ubicaciones, inicio, fin, bucket, simplify, tolerancia, campos
+        ))
         
     except Exception as e:
         logger.error(f"Error al obtener historial: {e}")
@@ -180,6 +482,83 @@ def obtener_historial(request, barco_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _historial_streaming(barco_id, inicio, fin, campos, despues_de, limite, formato):
+    """
+    Responde el historial transmitiendo el cursor de MongoDB por trozos, sin
+    cargar todas las ubicaciones en memoria.
+    
+    En JSON, `count` y `siguiente` (cursor de la próxima página, o null) se
+    escriben al final del objeto. En NDJSON se escribe una ubicación por línea
+    y, si hay más páginas, una última línea {"siguiente": "..."}.
+    """
+    # Se pide una ubicación extra para saber si existe una página siguiente
+    cursor = UbicacionBuque.iterar_historial(
+        barco_id, inicio, fin, campos=campos, despues_de=despues_de,
+        limite=limite + 1 if limite else None,
+        batch_size=settings.UBICACIONES_HISTORIAL_TROZO
+    )
+    representar = UbicacionBuqueSerializer().to_representation
+    renderer = ORJSONRenderer()
+    
+    def trozos():
+        """Genera listas de filas ya representadas y el cursor de la página siguiente."""
+        trozo = []
+        total = 0
+        ultimo = None
+        for doc in cursor:
+            if limite and total == limite:
+                yield trozo, codificar_cursor(ultimo)
+                return
+            fila = representar(doc)
+            if campos:
+                fila = {campo: fila[campo] for campo in campos}
+            trozo.append(fila)
+            total += 1
+            ultimo = doc
+            if len(trozo) == settings.UBICACIONES_HISTORIAL_TROZO:
+                yield trozo, None
+                trozo = []
+        yield trozo, None
+    
+    def generar_json():
+        yield renderer.render({
+            'success': True,
+            'inicio': inicio.isoformat(),
+            'fin': fin.isoformat(),
+        })[:-1] + b',"data":['
+        
+        total = 0
+        siguiente = None
+        try:
+            for trozo, siguiente in trozos():
+                if not trozo:
+                    continue
+                # Se renderiza el trozo completo y se quitan los corchetes
+                if total:
+                    yield b','
+                yield renderer.render(trozo)[1:-1]
+                total += len(trozo)
+        except Exception as e:
+            # Los encabezados ya se enviaron: solo queda registrar y cerrar el JSON
+            logger.error(f"Error al transmitir historial: {e}")
+        
+        yield b'],' + renderer.render({'count': total, 'siguiente': siguiente})[1:]
+    
+    def generar_ndjson():
+        try:
+            for trozo, siguiente in trozos():
+                for fila in trozo:
+                    yield renderer.render(fila) + b'\n'
+                if siguiente:
+                    yield renderer.render({'siguiente': siguiente}) + b'\n'
+        except Exception as e:
+            logger.error(f"Error al transmitir historial: {e}")
+    
+    if formato == 'ndjson':
+        return StreamingHttpResponse(generar_ndjson(), content_type='application/x-ndjson')
+    return StreamingHttpResponse(generar_json(), content_type='application/json')
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def buscar_buques_cercanos(request):
@@ -225,24 +604,96 @@ def buscar_buques_cercanos(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def obtener_zona_punto(request):
+    """
+    Clasifica un punto en la zona del puerto que lo contiene.
+    GET /api/ubicaciones/zonas/punto/?latitud=8.9824&longitud=-79.5199
+    """
+    try:
+        serializer = PuntoSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        zona = geocercas.get_indice().clasificar(
+            serializer.validated_data['longitud'],
+            serializer.validated_data['latitud']
+        )
+        
+        return Response({
+            'success': True,
+            'data': {'id': zona.id, 'nombre': zona.nombre, 'tipo': zona.tipo} if zona else None
+        })
+        
+    except Exception as e:
+        logger.error(f"Error al clasificar punto: {e}")
+        return Response({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def obtener_eventos_zona(request):
+    """
+    Obtiene los eventos de entrada y salida de zonas, más recientes primero.
+    GET /api/ubicaciones/zonas/eventos/?barco_id=<uuid>&zona_id=<uuid>&limite=100
+    """
+    try:
+        serializer = EventosZonaSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        barco_id = serializer.validated_data.get('barco_id')
+        zona_id = serializer.validated_data.get('zona_id')
+        eventos = geocercas.get_eventos(
+            barco_id=str(barco_id) if barco_id else None,
+            zona_id=str(zona_id) if zona_id else None,
+            limite=serializer.validated_data['limite']
+        )
+        
+        return Response({
+            'success': True,
+            'count': len(eventos),
+            'data': eventos
+        })
+        
+    except Exception as e:
+        logger.error(f"Error al obtener eventos de zona: {e}")
+        return Response({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def iniciar_simulacion(request):
     """
     Inicia la simulación de ubicaciones en tiempo real.
     POST /api/ubicaciones/simulacion/iniciar/
-    Body opcional: {"intervalo_segundos": 30}
+    Body opcional: {"intervalo_segundos": 30, "barcos_sinteticos": 0}
     """
     try:
-        intervalo = request.data.get('intervalo_segundos', 30)
-        
-        if intervalo < 5:
+        serializer = SimulacionSerializer(data=request.data)
+        if not serializer.is_valid():
             return Response({
                 'success': False,
-                'message': 'El intervalo mínimo es 5 segundos'
+                'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        simulador.iniciar(intervalo)
+        intervalo = serializer.validated_data['intervalo_segundos']
+        barcos_sinteticos = serializer.validated_data['barcos_sinteticos']
+        
+        simulador.iniciar(intervalo, barcos_sinteticos)
         
         return Response({
             'success': True,
@@ -290,6 +741,7 @@ def estado_simulacion(request):
     return Response({
         'success': True,
         'activa': simulador.activo,
-        'intervalo_segundos': simulador.intervalo_segundos if simulador.activo else None
+        'intervalo_segundos': simulador.intervalo_segundos if simulador.activo else None,
+        'rendimiento': simulador.estadisticas()
     })
 
@@ -0,0 +1,479 @@
+"""
+Vistas asíncronas (ASGI) para el sistema de ubicación en tiempo real de buques.
+
+Variantes de las consultas y la ingesta de `views.py` con las mismas URLs y
+respuestas, pero usando el cliente asíncrono de PyMongo: mientras MongoDB
+responde, el worker atiende otras peticiones en lugar de bloquear un hilo.
+Se activan con UBICACIONES_ASYNC=True al servir el proyecto con un servidor
+ASGI (uvicorn, daphne, gunicorn -k uvicorn.workers.UvicornWorker).
+
+DRF no admite vistas asíncronas, por lo que la autenticación JWT, el parseo
+del cuerpo y el renderizado se hacen aquí con las mismas clases de DRF.
+"""
+from functools import wraps
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, UnsupportedMediaType
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from port_control.autenticacion import JWTSinEstadoAuthentication
+from port_control.exception_handlers import custom_exception_handler
+from port_control.renderers import ORJSONParser, ORJSONRenderer
+from ubicaciones.cache import get_snapshot_flota
+from ubicaciones.models import UbicacionBuque
+from ubicaciones.paginacion import codificar_cursor
+from ubicaciones.parsers import NDJSONParser
+from ubicaciones.serializers import (
+    UbicacionBuqueSerializer, BusquedaCercanosSerializer, HistorialSerializer,
+    SuscripcionStreamSerializer
+)
+from ubicaciones.stream import EventStreamRenderer, aeventos_sse, hub
+from ubicaciones.views import (
+    _construir_ubicacion, _validar_trozo, _resultado_trozo, _resultado_lote,
+    _rango_historial, _respuesta_resumen, _respuesta_reducida, _respuesta_snapshot
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+_autenticacion = JWTSinEstadoAuthentication() if settings.JWT_SIN_ESTADO else JWTAuthentication()
+_renderer = ORJSONRenderer()
+
+
+def _respuesta(data, status_code=status.HTTP_200_OK):
+    """Renderiza `data` como JSON con el mismo renderer que las vistas de DRF."""
+    return HttpResponse(_renderer.render(data), content_type='application/json', status=status_code)
+
+
+def _respuesta_error(exc, request):
+    """Respuesta de una excepción de DRF con el formato del manejador del proyecto."""
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        exc.auth_header = _autenticacion.authenticate_header(request)
+
+    respuesta = custom_exception_handler(exc, {'request': request})
+    response = _respuesta(respuesta.data, respuesta.status_code)
+    if 'WWW-Authenticate' in respuesta:
+        response['WWW-Authenticate'] = respuesta['WWW-Authenticate']
+    return response
+
+
+def autenticado(vista):
+    """
+    Equivalente asíncrono de @permission_classes([IsAuthenticated]): valida el
+    JWT (la carga del usuario desde PostgreSQL corre en un hilo) y deja el
+    usuario en `request.user`. Como en DRF, la vista queda exenta de CSRF.
+    """
+    @csrf_exempt
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        try:
+            resultado = await sync_to_async(_autenticacion.authenticate)(request)
+        except APIException as exc:
+            return _respuesta_error(exc, request)
+
+        if resultado is None:
+            return _respuesta_error(NotAuthenticated(), request)
+
+        request.user, request.auth = resultado
+        return await vista(request, *args, **kwargs)
+
+    return envoltura
+
+
+def _parsear_cuerpo(request, ndjson=False):
+    """
+    Parsea el cuerpo como JSON (o NDJSON si `ndjson`), igual que los parsers
+    de las vistas de DRF. Un cuerpo vacío se interpreta como {}.
+
+    No usa `request.body`: el NDJSON se decodifica línea a línea desde el
+    stream de la petición (que Django ya guardó en un archivo temporal que
+    pasa a disco al superar FILE_UPLOAD_MAX_MEMORY_SIZE), así que la memoria
+    no depende del tamaño del lote.
+    """
+    # Como DRF: sin Content-Length (o con 0) el cuerpo se considera vacío
+    try:
+        longitud = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        longitud = 0
+    if longitud <= 0:
+        return {}
+
+    parser_context = {'encoding': request.encoding or settings.DEFAULT_CHARSET}
+    if ndjson and request.content_type == NDJSONParser.media_type:
+        return NDJSONParser().parse(request, parser_context=parser_context)
+    if request.content_type != ORJSONParser.media_type:
+        raise UnsupportedMediaType(request.content_type)
+    return ORJSONParser().parse(request, parser_context=parser_context)
+
+
+@require_http_methods(['POST'])
+@autenticado
+async def registrar_ubicacion(request):
+    """
+    Registra una nueva ubicación de un buque.
+    POST /api/ubicaciones/registrar/
+    """
+    try:
+        serializer = UbicacionBuqueSerializer(data=_parsear_cuerpo(request))
+        if serializer.is_valid():
+            ubicacion = _construir_ubicacion(serializer.validated_data)
+
+            ubicacion_id = await ubicacion.asave()
+
+            return _respuesta({
+                'success': True,
+                'message': 'Ubicación registrada exitosamente',
+                'id': ubicacion_id
+            }, status.HTTP_201_CREATED)
+        else:
+            return _respuesta({
+                'success': False,
+                'errors': serializer.errors
+            }, status.HTTP_400_BAD_REQUEST)
+
+    except APIException as exc:
+        return _respuesta_error(exc, request)
+    except Exception as e:
+        logger.error(f"Error al registrar ubicación: {e}")
+        return _respuesta({
+            'success': False,
+            'message': f'Error al registrar ubicación: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_http_methods(['POST'])
+@autenticado
+async def registrar_ubicaciones_lote(request):
+    """
+    Registra un lote de ubicaciones en una sola petición.
+    POST /api/ubicaciones/registrar/lote/
+    Body: arreglo JSON de ubicaciones (Content-Type: application/json)
+          o una ubicación por línea (Content-Type: application/x-ndjson)
+    """
+    try:
+        datos = _parsear_cuerpo(request, ndjson=True)
+
+        # Un objeto JSON suelto o un cuerpo vacío llegan como diccionario
+        if isinstance(datos, dict):
+            return _respuesta({
+                'success': False,
+                'message': 'Se esperaba un arreglo JSON o un cuerpo NDJSON'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        if isinstance(datos, list) and len(datos) > settings.UBICACIONES_LOTE_MAXIMO:
+            return _respuesta({
+                'success': False,
+                'message': f'El lote excede el máximo de {settings.UBICACIONES_LOTE_MAXIMO} ubicaciones'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        items = enumerate(datos)
+        recibidas = 0
+        insertadas = 0
+        errores = []
+
+        while True:
+            trozo = list(islice(items, settings.UBICACIONES_LOTE_ESCRITURA))
+            if not trozo:
+                break
+            recibidas += len(trozo)
+
+            ubicaciones, posiciones, errores_trozo = _validar_trozo(trozo)
+            if ubicaciones:
+                ids, errores_escritura = await UbicacionBuque.ainsertar_documentos(
+                    [ubicacion.to_dict() for ubicacion in ubicaciones]
+                )
+                insertadas_trozo, errores_trozo = _resultado_trozo(
+                    ids, errores_escritura, posiciones, errores_trozo
+                )
+                insertadas += insertadas_trozo
+            errores.extend(errores_trozo)
+
+        if recibidas == 0:
+            return _respuesta({
+                'success': False,
+                'message': 'El lote está vacío'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        respuesta, respuesta_status = _resultado_lote(recibidas, insertadas, errores)
+        return _respuesta(respuesta, respuesta_status)
+
+    except APIException as exc:
+        return _respuesta_error(exc, request)
+    except Exception as e:
+        logger.error(f"Error al registrar lote de ubicaciones: {e}")
+        return _respuesta({
+            'success': False,
+            'message': f'Error al registrar lote de ubicaciones: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_http_methods(['GET'])
+@autenticado
+async def obtener_ultima_ubicacion(request, barco_id):
+    """
+    Obtiene la última ubicación registrada de un barco.
+    GET /api/ubicaciones/barco/{barco_id}/
+    """
+    try:
+        ubicacion = await UbicacionBuque.aget_ultima_ubicacion(barco_id)
+
+        if ubicacion:
+            serializer = UbicacionBuqueSerializer(ubicacion)
+            return _respuesta({
+                'success': True,
+                'data': serializer.data
+            })
+        else:
+            return _respuesta({
+                'success': False,
+                'message': 'No se encontró ubicación para este barco'
+            }, status.HTTP_404_NOT_FOUND)
+
+    except Exception as e:
+        logger.error(f"Error al obtener ubicación: {e}")
+        return _respuesta({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_http_methods(['GET'])
+@autenticado
+async def obtener_ubicaciones_actuales(request):
+    """
+    Obtiene la última ubicación de todos los barcos.
+    GET /api/ubicaciones/actuales/
+
+    El snapshot en caché se comparte con las vistas síncronas; solo su
+    reconstrucción (tras un cambio) consulta MongoDB, en un hilo aparte.
+    """
+    try:
+        cuerpo, etag = await sync_to_async(get_snapshot_flota().obtener, thread_sensitive=False)()
+        return _respuesta_snapshot(request, cuerpo, etag)
+
+    except Exception as e:
+        logger.error(f"Error al obtener ubicaciones actuales: {e}")
+        return _respuesta({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_http_methods(['GET'])
+@autenticado
+async def obtener_historial(request, barco_id):
+    """
+    Obtiene el historial de ubicaciones de un barco en un rango de tiempo.
+    GET /api/ubicaciones/barco/{barco_id}/historial/?inicio=2024-01-01T00:00:00&fin=2024-01-02T00:00:00
+
+    Admite los mismos parámetros que la vista síncrona (bucket, simplify,
+    tolerancia, resumen, fields, limite, cursor, formato).
+    """
+    try:
+        parametros = HistorialSerializer(data=request.GET)
+        if not parametros.is_valid():
+            return _respuesta({
+                'success': False,
+                'errors': parametros.errors
+            }, status.HTTP_400_BAD_REQUEST)
+
+        inicio, fin = _rango_historial(request.GET)
+
+        bucket = parametros.validated_data.get('bucket')
+        simplify = parametros.validated_data.get('simplify')
+        tolerancia = parametros.validated_data['tolerancia']
+        campos = parametros.validated_data.get('fields')
+        resumen = parametros.validated_data.get('resumen')
+
+        if resumen:
+            resumenes = await UbicacionBuque.aget_resumenes(barco_id, inicio, fin, resumen)
+            return _respuesta(_respuesta_resumen(resumenes, inicio, fin, resumen))
+
+        if not bucket and not simplify:
+            return _historial_streaming(
+                barco_id, inicio, fin, campos,
+                despues_de=parametros.validated_data.get('cursor'),
+                limite=parametros.validated_data.get('limite'),
+                formato=parametros.validated_data['formato']
+            )
+
+        if bucket:
+            ubicaciones = await UbicacionBuque.aget_ubicaciones_agrupadas(
+                barco_id, inicio, fin, bucket
+            )
+        else:
+            ubicaciones = await UbicacionBuque.aget_ubicaciones_por_rango_tiempo(
+                barco_id, inicio, fin
+            )
+
+        return _respuesta(_respuesta_reducida(
+            ubicaciones, inicio, fin, bucket, simplify, tolerancia, campos
+        ))
+
+    except Exception as e:
+        logger.error(f"Error al obtener historial: {e}")
+        return _respuesta({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _historial_streaming(barco_id, inicio, fin, campos, despues_de, limite, formato):
+    """
+    Igual que el historial transmitido de las vistas síncronas, pero leyendo el
+    cursor asíncrono: el cuerpo se genera con un generador asíncrono que Django
+    sirve sin ocupar un hilo.
+    """
+    # Se pide una ubicación extra para saber si existe una página siguiente
+    cursor = UbicacionBuque.aiterar_historial(
+        barco_id, inicio, fin, campos=campos, despues_de=despues_de,
+        limite=limite + 1 if limite else None,
+        batch_size=settings.UBICACIONES_HISTORIAL_TROZO
+    )
+    representar = UbicacionBuqueSerializer().to_representation
+
+    async def trozos():
+        """Genera listas de filas ya representadas y el cursor de la página siguiente."""
+        trozo = []
+        total = 0
+        ultimo = None
+        async for doc in cursor:
+            if limite and total == limite:
+                yield trozo, codificar_cursor(ultimo)
+                return
+            fila = representar(doc)
+            if campos:
+                fila = {campo: fila[campo] for campo in campos}
+            trozo.append(fila)
+            total += 1
+            ultimo = doc
+            if len(trozo) == settings.UBICACIONES_HISTORIAL_TROZO:
+                yield trozo, None
+                trozo = []
+        yield trozo, None
+
+    async def generar_json():
+        yield _renderer.render({
+            'success': True,
+            'inicio': inicio.isoformat(),
+            'fin': fin.isoformat(),
+        })[:-1] + b',"data":['
+
+        total = 0
+        siguiente = None
+        try:
+            async for trozo, siguiente in trozos():
+                if not trozo:
+                    continue
+                # Se renderiza el trozo completo y se quitan los corchetes
+                if total:
+                    yield b','
+                yield _renderer.render(trozo)[1:-1]
+                total += len(trozo)
+        except Exception as e:
+            # Los encabezados ya se enviaron: solo queda registrar y cerrar el JSON
+            logger.error(f"Error al transmitir historial: {e}")
+
+        yield b'],' + _renderer.render({'count': total, 'siguiente': siguiente})[1:]
+
+    async def generar_ndjson():
+        try:
+            async for trozo, siguiente in trozos():
+                for fila in trozo:
+                    yield _renderer.render(fila) + b'\n'
+                if siguiente:
+                    yield _renderer.render({'siguiente': siguiente}) + b'\n'
+        except Exception as e:
+            logger.error(f"Error al transmitir historial: {e}")
+
+    if formato == 'ndjson':
+        return StreamingHttpResponse(generar_ndjson(), content_type='application/x-ndjson')
+    return StreamingHttpResponse(generar_json(), content_type='application/json')
+
+
+@require_http_methods(['POST'])
+@autenticado
+async def buscar_buques_cercanos(request):
+    """
+    Busca buques cercanos a un punto geográfico.
+    POST /api/ubicaciones/cercanos/
+    Body: {"latitud": 8.9824, "longitud": -79.5199, "radio_km": 10.0}
+    """
+    try:
+        serializer = BusquedaCercanosSerializer(data=_parsear_cuerpo(request))
+        if serializer.is_valid():
+            latitud = serializer.validated_data['latitud']
+            longitud = serializer.validated_data['longitud']
+            radio_km = serializer.validated_data.get('radio_km', 10.0)
+
+            ubicaciones = await UbicacionBuque.aget_buques_cercanos(
+                latitud, longitud, radio_km
+            )
+
+            serializer_ubicaciones = UbicacionBuqueSerializer(ubicaciones, many=True)
+
+            return _respuesta({
+                'success': True,
+                'count': len(ubicaciones),
+                'punto_central': {
+                    'latitud': latitud,
+                    'longitud': longitud
+                },
+                'radio_km': radio_km,
+                'data': serializer_ubicaciones.data
+            })
+        else:
+            return _respuesta({
+                'success': False,
+                'errors': serializer.errors
+            }, status.HTTP_400_BAD_REQUEST)
+
+    except APIException as exc:
+        return _respuesta_error(exc, request)
+    except Exception as e:
+        logger.error(f"Error al buscar buques cercanos: {e}")
+        return _respuesta({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_http_methods(['GET'])
+@autenticado
+async def stream_ubicaciones(request):
+    """
+    Envía las ubicaciones nuevas en vivo mediante Server-Sent Events.
+    GET /api/ubicaciones/stream/?barco_id=uuid1,uuid2&bbox=min_lon,min_lat,max_lon,max_lat
+
+    Igual que la vista síncrona, pero cada cliente espera sus eventos en el
+    loop de asyncio: las conexiones abiertas no ocupan hilos ni workers.
+    """
+    serializer = SuscripcionStreamSerializer(data=request.GET)
+    if not serializer.is_valid():
+        datos = {'success': False, 'errors': serializer.errors}
+        if EventStreamRenderer.media_type in request.headers.get('Accept', ''):
+            # EventSource recibe el error como un evento, como en la vista síncrona
+            return HttpResponse(
+                EventStreamRenderer().render(datos),
+                content_type=EventStreamRenderer.media_type,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return _respuesta(datos, status.HTTP_400_BAD_REQUEST)
+
+    suscripcion = hub.suscribir(
+        barco_ids=serializer.validated_data.get('barco_id'),
+        bbox=serializer.validated_data.get('bbox')
+    )
+    suscripcion.vincular_loop()
+
+    response = StreamingHttpResponse(aeventos_sse(suscripcion), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule los eventos en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from zonas_puerto.models import ZonaPuerto
 
-# Register your models here.
+
+@admin.register(ZonaPuerto)
+class ZonaPuertoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'tipo')
+    list_filter = ('tipo',)
+    search_fields = ('nombre',)
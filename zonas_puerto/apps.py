@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ZonasPuertoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "zonas_puerto"
+
+    def ready(self):
+        """Versiona la caché de respuestas del listado con cada cambio."""
+        from zonas_puerto.models import ZonaPuerto
+        from port_control.cache_respuestas import registrar_modelo
+
+        registrar_modelo(ZonaPuerto)
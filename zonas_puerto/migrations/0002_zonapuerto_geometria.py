@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("zonas_puerto", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="zonapuerto",
+            name="geometria",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
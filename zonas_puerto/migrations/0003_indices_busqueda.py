@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2025-11-27 12:49
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("zonas_puerto", "0002_zonapuerto_geometria"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="zonapuerto",
+            index=models.Index(fields=["nombre"], name="zonas_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="zonapuerto",
+            index=models.Index(fields=["tipo", "nombre"], name="zonas_tipo_nombre_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="zonapuerto",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("nombre"), name="gin_trgm_ops"), name="zonas_nombre_trgm"),
+        ),
+        AddIndexConcurrently(
+            model_name="zonapuerto",
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("tipo"), name="gin_trgm_ops"), name="zonas_tipo_trgm"),
+        ),
+    ]
@@ -1,13 +1,30 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 
 class ZonaPuerto(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     nombre = models.CharField(max_length=100)
     tipo = models.CharField(max_length=50)
+    # Polígono GeoJSON ({"type": "Polygon", "coordinates": [[[lon, lat], ...]]})
+    geometria = models.JSONField(null=True, blank=True)
+    # Última modificación: validador de las peticiones condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "zonas_puerto"
+        indexes = [
+            # MAX(fecha_actualizacion) de los listados y detalles condicionales
+            models.Index(fields=['fecha_actualizacion'], name='zonas_actualizacion_idx'),
+            # Orden de los listados
+            models.Index(fields=['nombre'], name='zonas_nombre_idx'),
+            # Filtros combinados con el orden por defecto
+            models.Index(fields=['tipo', 'nombre'], name='zonas_tipo_nombre_idx'),
+            # Búsqueda por texto (SearchFilter: UPPER(campo) LIKE '%...%')
+            GinIndex(OpClass(Upper('nombre'), name='gin_trgm_ops'), name='zonas_nombre_trgm'),
+            GinIndex(OpClass(Upper('tipo'), name='gin_trgm_ops'), name='zonas_tipo_trgm'),
+        ]
 
     def __str__(self):
         return self.nombre
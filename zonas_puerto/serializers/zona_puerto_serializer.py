@@ -5,3 +5,29 @@ class ZonaPuertoSerializer(serializers.ModelSerializer):
     class Meta:
         model = ZonaPuerto
         fields = '__all__'
+
+    def validate_geometria(self, value):
+        """Valida que la geometría sea un Polygon GeoJSON con anillos cerrados."""
+        if value is None:
+            return value
+        if not isinstance(value, dict) or value.get('type') != 'Polygon':
+            raise serializers.ValidationError('La geometría debe ser un Polygon GeoJSON')
+
+        anillos = value.get('coordinates')
+        if not isinstance(anillos, list) or not anillos:
+            raise serializers.ValidationError('El polígono debe tener al menos un anillo')
+
+        for anillo in anillos:
+            if not isinstance(anillo, list) or len(anillo) < 4:
+                raise serializers.ValidationError('Cada anillo debe tener al menos 4 posiciones')
+            for posicion in anillo:
+                if (not isinstance(posicion, list) or len(posicion) != 2
+                        or not all(isinstance(v, (int, float)) for v in posicion)):
+                    raise serializers.ValidationError('Cada posición debe ser [longitud, latitud]')
+                longitud, latitud = posicion
+                if not (-180 <= longitud <= 180 and -90 <= latitud <= 90):
+                    raise serializers.ValidationError('Coordenadas fuera de rango')
+            if anillo[0] != anillo[-1]:
+                raise serializers.ValidationError('Cada anillo debe cerrarse en su primera posición')
+
+        return {'type': 'Polygon', 'coordinates': anillos}
@@ -3,10 +3,12 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from zonas_puerto.models import ZonaPuerto
 from zonas_puerto.serializers import ZonaPuertoSerializer
+from port_control.cache_respuestas import CacheListadoMixin
+from port_control.condicional import RespuestaCondicionalMixin
 from port_control.permissions import ZonaPuertoPermission
 
 
-class ZonaPuertoViewSet(viewsets.ModelViewSet):
+class ZonaPuertoViewSet(CacheListadoMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestión de Zonas del Puerto
     